@@ -1,6 +1,7 @@
+import os
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, event, pool
 
 from alembic import context
 
@@ -13,6 +14,11 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# allow the database url to be overwritten through the same env var used by the application
+# (e.g. SIP_DATABASE_URL=sqlite:////var/lib/sip/sip.db alembic upgrade head)
+if os.environ.get("SIP_DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["SIP_DATABASE_URL"].replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -43,6 +49,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -62,9 +69,16 @@ def run_migrations_online():
         poolclass=pool.NullPool,
     )
 
+    # SQLite cannot ALTER constraints in place -> use batch mode and the application pragmas
+    is_sqlite = connectable.dialect.name == "sqlite"
+    if is_sqlite:
+        from db.sqlite import set_sqlite_pragmas
+
+        event.listen(connectable, "connect", set_sqlite_pragmas)
+
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, render_as_batch=is_sqlite
         )
 
         with context.begin_transaction():
@@ -17,10 +17,12 @@ depends_on = None
 
 
 def upgrade():
+    # SQLite only auto increments a lone 'INTEGER PRIMARY KEY' column, so steam_id can't be part of the key there
+    is_sqlite = op.get_context().dialect.name == "sqlite"
     op.create_table(
         "list",
         sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
-        sa.Column("steam_id", sa.Integer, primary_key=True),
+        sa.Column("steam_id", sa.Integer, primary_key=not is_sqlite, nullable=False),
         sa.Column("created_at", sa.Date, nullable=False),
         sa.Column("updated_at", sa.Date, nullable=False),
         sa.Column("name", sa.String(length=100), nullable=False),
@@ -24,24 +24,24 @@ def upgrade():
         sa.Column("date", sa.Date, nullable=False),
         sa.Column("price_usd", sa.Float, nullable=False),
     )
-    op.create_foreign_key(
-        constraint_name="fk__item_price__item",
-        source_table="item_price",
-        referent_table="item",
-        local_cols=["item_id"],
-        remote_cols=["market_hash_name"],
-        ondelete="CASCADE",
-    )
+    # batch mode emits plain ALTER statements on MySQL and recreates the table on SQLite
+    with op.batch_alter_table("item_price") as batch_op:
+        batch_op.create_foreign_key(
+            constraint_name="fk__item_price__item",
+            referent_table="item",
+            local_cols=["item_id"],
+            remote_cols=["market_hash_name"],
+            ondelete="CASCADE",
+        )
+        batch_op.create_unique_constraint(
+            constraint_name="unique__item_price__date__item_id",
+            columns=["item_id", "date"],
+        )
     op.create_index(
         index_name="idx__item_price__date",
         table_name="item_price",
         columns=["date"],
     )
-    op.create_unique_constraint(
-        constraint_name="unique__item_price__date__item_id",
-        table_name="item_price",
-        columns=["item_id", "date"],
-    )
 
 def downgrade():
     op.drop_table("item_price")
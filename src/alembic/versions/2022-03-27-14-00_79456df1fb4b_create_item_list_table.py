@@ -24,32 +24,31 @@ def upgrade():
         sa.Column("list_id", sa.Integer, nullable=False),
         sa.Column("quantity", sa.Integer, nullable=False),
     )
-    op.create_foreign_key(
-        constraint_name="fk__item_list__list",
-        source_table="item_list",
-        referent_table="list",
-        local_cols=["list_id"],
-        remote_cols=["id"],
-        ondelete="CASCADE",
-    )
-    op.create_foreign_key(
-        constraint_name="fk__item_list__item",
-        source_table="item_list",
-        referent_table="item",
-        local_cols=["item_id"],
-        remote_cols=["market_hash_name"],
-        ondelete="CASCADE",
-    )
+    # batch mode emits plain ALTER statements on MySQL and recreates the table on SQLite
+    with op.batch_alter_table("item_list") as batch_op:
+        batch_op.create_foreign_key(
+            constraint_name="fk__item_list__list",
+            referent_table="list",
+            local_cols=["list_id"],
+            remote_cols=["id"],
+            ondelete="CASCADE",
+        )
+        batch_op.create_foreign_key(
+            constraint_name="fk__item_list__item",
+            referent_table="item",
+            local_cols=["item_id"],
+            remote_cols=["market_hash_name"],
+            ondelete="CASCADE",
+        )
+        batch_op.create_unique_constraint(
+            constraint_name="unique__item_list__list_id__item_id",
+            columns=["item_id", "list_id"],
+        )
     op.create_index(
         index_name="idx__item_list__list_id",
         table_name="item_list",
         columns=["list_id"],
     )
-    op.create_unique_constraint(
-        constraint_name="unique__item_list__list_id__item_id",
-        table_name="item_list",
-        columns=["item_id", "list_id"],
-    )
 
 
 def downgrade():
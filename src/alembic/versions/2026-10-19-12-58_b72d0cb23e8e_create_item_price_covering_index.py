@@ -0,0 +1,32 @@
+"""Create 'item_price' covering index
+
+Revision ID: b72d0cb23e8e
+Revises: 79456df1fb4b
+Create Date: 2026-10-19 12:58:46.575488
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b72d0cb23e8e"
+down_revision = "79456df1fb4b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # list valuation queries read (item_id, date, price_usd) only -> answer them from the index alone
+    op.create_index(
+        index_name="idx__item_price__item_id__date__price_usd",
+        table_name="item_price",
+        columns=["item_id", "date", "price_usd"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        index_name="idx__item_price__item_id__date__price_usd",
+        table_name="item_price",
+    )
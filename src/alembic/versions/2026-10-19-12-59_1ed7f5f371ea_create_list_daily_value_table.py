@@ -0,0 +1,39 @@
+"""Create 'list_daily_value' table
+
+Revision ID: 1ed7f5f371ea
+Revises: b72d0cb23e8e
+Create Date: 2026-10-19 12:59:31.289304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "1ed7f5f371ea"
+down_revision = "b72d0cb23e8e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "list_daily_value",
+        sa.Column("list_id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("date", sa.Date, primary_key=True),
+        sa.Column("price_total", sa.Float, nullable=False),
+        sa.Column("items_priced", sa.Integer, nullable=False),
+    )
+    # batch mode emits plain ALTER statements on MySQL and recreates the table on SQLite
+    with op.batch_alter_table("list_daily_value") as batch_op:
+        batch_op.create_foreign_key(
+            constraint_name="fk__list_daily_value__list",
+            referent_table="list",
+            local_cols=["list_id"],
+            remote_cols=["id"],
+            ondelete="CASCADE",
+        )
+
+
+def downgrade():
+    op.drop_table("list_daily_value")
@@ -0,0 +1,52 @@
+"""Partition 'item_price' table by date
+
+Revision ID: 0e485035dffa
+Revises: 1ed7f5f371ea
+Create Date: 2026-10-19 13:01:07.922087
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0e485035dffa"
+down_revision = "1ed7f5f371ea"
+branch_labels = None
+depends_on = None
+
+
+# yearly partitions created by this migration. newer years are split from 'pmax' by
+# db.retention.add_item_price_partitions
+PARTITION_YEARS = range(2022, 2027)
+
+
+def upgrade():
+    # only MySQL supports range partitioning
+    if op.get_context().dialect.name != "mysql":
+        return
+
+    # MySQL requires the partitioning column on every unique key (primary key included)
+    # and doesn't support foreign keys on partitioned tables
+    # NOTE: item price deletion on item deletion is still handled by the ORM relationship cascade
+    op.drop_constraint("fk__item_price__item", "item_price", type_="foreignkey")
+    op.execute("ALTER TABLE item_price DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)")
+    partitions = [f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')" for year in PARTITION_YEARS]
+    partitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    op.execute(f"ALTER TABLE item_price PARTITION BY RANGE COLUMNS(date) ({', '.join(partitions)})")
+
+
+def downgrade():
+    if op.get_context().dialect.name != "mysql":
+        return
+
+    op.execute("ALTER TABLE item_price REMOVE PARTITIONING")
+    op.execute("ALTER TABLE item_price DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+    op.create_foreign_key(
+        constraint_name="fk__item_price__item",
+        source_table="item_price",
+        referent_table="item",
+        local_cols=["item_id"],
+        remote_cols=["market_hash_name"],
+        ondelete="CASCADE",
+    )
@@ -0,0 +1,54 @@
+"""Create 'pricing_job' table
+
+Revision ID: 5c1f0e7a9d24
+Revises: 0e485035dffa
+Create Date: 2026-10-19 15:20:42.518904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5c1f0e7a9d24"
+down_revision = "0e485035dffa"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "pricing_job",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("app_id", sa.Integer, nullable=False),
+        sa.Column("market_hash_name", sa.String(length=150), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("status", sa.String(length=10), nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False),
+        sa.Column("claim_token", sa.String(length=32), nullable=True),
+        sa.Column("claim_expires_at", sa.Integer, nullable=True),
+        sa.Column("created_at", sa.Integer, nullable=False),
+        sa.Column("finished_at", sa.Integer, nullable=True),
+    )
+    # workers look up claimable jobs (pending or with an expired claim) in id order
+    op.create_index(
+        index_name="idx__pricing_job__status__claim_expires_at",
+        table_name="pricing_job",
+        columns=["status", "claim_expires_at"],
+    )
+    # workers read back the jobs they claimed by their claim token
+    op.create_index(
+        index_name="idx__pricing_job__claim_token",
+        table_name="pricing_job",
+        columns=["claim_token"],
+    )
+    # producers skip items that already have an open job
+    op.create_index(
+        index_name="idx__pricing_job__market_hash_name__currency",
+        table_name="pricing_job",
+        columns=["market_hash_name", "currency"],
+    )
+
+
+def downgrade():
+    op.drop_table("pricing_job")
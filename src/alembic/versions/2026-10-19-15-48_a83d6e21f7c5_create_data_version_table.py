@@ -0,0 +1,33 @@
+"""Create 'data_version' table
+
+Revision ID: a83d6e21f7c5
+Revises: 5c1f0e7a9d24
+Create Date: 2026-10-19 15:48:13.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a83d6e21f7c5"
+down_revision = "5c1f0e7a9d24"
+branch_labels = None
+depends_on = None
+
+
+# rows bumped by db.utils writers (see db.constants.DATA_VERSION_NAMES)
+DATA_VERSION_NAMES = ["item_price", "list"]
+
+
+def upgrade():
+    data_version_table = op.create_table(
+        "data_version",
+        sa.Column("name", sa.String(length=50), primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False),
+    )
+    op.bulk_insert(data_version_table, [{"name": name, "version": 0} for name in DATA_VERSION_NAMES])
+
+
+def downgrade():
+    op.drop_table("data_version")
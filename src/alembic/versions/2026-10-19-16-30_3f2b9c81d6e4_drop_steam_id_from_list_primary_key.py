@@ -0,0 +1,31 @@
+"""Drop 'steam_id' from 'list' primary key
+
+Revision ID: 3f2b9c81d6e4
+Revises: a83d6e21f7c5
+Create Date: 2026-10-19 16:30:42.187353
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f2b9c81d6e4"
+down_revision = "a83d6e21f7c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite lists were already created keyed by id only (see 632649756bb6), so both backends match db.models.List
+    if op.get_context().dialect.name != "mysql":
+        return
+
+    op.execute("ALTER TABLE list DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+
+
+def downgrade():
+    if op.get_context().dialect.name != "mysql":
+        return
+
+    op.execute("ALTER TABLE list DROP PRIMARY KEY, ADD PRIMARY KEY (id, steam_id)")
@@ -0,0 +1,3 @@
+"""
+Benchmarks to compare performance between commits
+"""
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+# directory with the project packages (src)
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> python arguments. the last ones import what a full command run imports, for comparison
+STARTUP_CASES = {
+    "sip --help": ["-m", "cli", "--help"],
+    "sip update-prices --help": ["-m", "cli", "update-prices", "--help"],
+    "sip status": ["-m", "cli", "status", "--port", "1"],
+    "import update prices script": ["-c", "import scripts.update_prices_spreadsheet"],
+    "import database utils": ["-c", "import db.utils"],
+}
+
+
+def time_command(python_arguments: list[str], runs: int) -> list[float]:
+    """
+    Run a python command many times in new processes
+
+    :param python_arguments: python interpreter arguments
+    :param runs: amount of runs
+
+    :returns: each run wall time, in seconds
+    """
+    env = os.environ | {"PYTHONPATH": SRC_DIR}
+    durations = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run([sys.executable, *python_arguments], cwd=SRC_DIR, env=env, capture_output=True, check=True)
+        durations.append(perf_counter() - start)
+    return durations
+
+
+def main(runs: int, output: str | None):
+    results = {}
+    for name, python_arguments in STARTUP_CASES.items():
+        durations = time_command(python_arguments, runs)
+        results[name] = {"min_seconds": round(min(durations), 4), "median_seconds": round(median(durations), 4)}
+        print(f"{name:<30} min {min(durations):.3f}s  median {median(durations):.3f}s")
+
+    if output:
+        with open(output, "w") as output_file:
+            json.dump({"runs": runs, "python": sys.version.split()[0], "results": results}, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description="Measure the sip cli startup time (each case runs in a new process)")
+    parser.add_argument(
+        "--runs",
+        dest="runs",
+        help="Amount of runs of each case. 10 is the default value",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        help="Json file to save results to",
+        type=str,
+        default=None,
+    )
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    main(args.runs, args.output)
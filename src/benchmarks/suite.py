@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+from typing import Callable
+
+from benchmarks.synthetic import generate_inventory, generate_item_batch, generate_items, generate_workbook
+
+# directory with the project packages (src)
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = [1_000, 10_000, 100_000]
+
+# a case setup gets the amount of items and a scratch directory, and returns the function to be timed
+# and, optionally, a function to run (untimed) before each timed run
+CaseSetup = Callable[[int, str], tuple[Callable[[], object], Callable[[], object] | None]]
+
+
+def setup_inventory_validate(size: int, workdir: str):
+    from external_apis.steam.models import Inventory
+
+    inventory_json = generate_inventory(size)
+    return lambda: Inventory.model_validate(inventory_json), None
+
+
+def setup_inventory_format(size: int, workdir: str):
+    from external_apis.steam.inventory import SteamInventoryAPI
+    from external_apis.steam.models import Inventory
+
+    inventory = Inventory.model_validate(generate_inventory(size))
+    inventory_api = SteamInventoryAPI()
+    return lambda: inventory_api.index_marketable_items(inventory), None
+
+
+def setup_export_today_items(size: int, workdir: str):
+    from benchmarks.synthetic import WORKBOOK_LAST_DATE
+    from data_exporters.pandas_excel_exporter import PandasExcelExporter
+
+    items_with_price = generate_item_batch(generate_items(size), WORKBOOK_LAST_DATE)
+    path = os.path.join(workdir, f"export_{size}.xlsx")
+
+    def before_each():
+        if os.path.exists(path):
+            os.remove(path)
+
+    return lambda: PandasExcelExporter(path).export_today_items(items_with_price), before_each
+
+
+def setup_excel_reader_get_items(size: int, workdir: str):
+    from data_readers.excel_reader import ExcelReader
+
+    path = os.path.join(workdir, f"workbook_{size}.xlsx")
+    generate_workbook(path, size)
+    return lambda: ExcelReader(path).get_items(), None
+
+
+def create_migrated_database(workdir: str) -> str:
+    """
+    Create a SQLite database with the current schema (once per suite run), to be copied by database cases
+
+    :param workdir: scratch directory
+
+    :returns: database file path
+    """
+    path = os.path.join(workdir, "template.db")
+    if not os.path.exists(path):
+        env = os.environ | {"PYTHONPATH": SRC_DIR, "SIP_DATABASE_URL": f"sqlite:///{path}"}
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=SRC_DIR, env=env, capture_output=True, check=True
+        )
+    return path
+
+
+def get_database_session(workdir: str, name: str):
+    """
+    Copy the migrated database and open a session on the copy
+
+    :param workdir: scratch directory
+    :param name: database copy name
+
+    :returns: session
+    """
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import NullPool
+
+    from db.metadata import create_sip_engine
+
+    path = os.path.join(workdir, f"{name}.db")
+    shutil.copyfile(create_migrated_database(workdir), path)
+    return sessionmaker(create_sip_engine(f"sqlite:///{path}", poolclass=NullPool))()
+
+
+def setup_create_items(size: int, workdir: str):
+    from db.utils import create_items
+
+    items_input = [
+        {"market_hash_name": item.market_hash_name, "app_id": item.app_id, "name_en": item.name}
+        for item in generate_items(size)
+    ]
+    state = {}
+
+    def before_each():
+        state["session"] = get_database_session(workdir, f"create_items_{size}")
+
+    def run():
+        create_items(items_input, state["session"])
+        state["session"].commit()
+        state["session"].close()
+
+    return run, before_each
+
+
+def setup_update_list_items(size: int, workdir: str):
+    from db.utils import create_items, create_list, update_list_items
+
+    items = generate_items(size)
+    items_input = [
+        {"market_hash_name": item.market_hash_name, "app_id": item.app_id, "name_en": item.name} for item in items
+    ]
+    # the list has the first 90% of the items. the update removes 10%, changes the amount of 10% and adds 10%
+    tenth = size // 10
+    list_items = [{"id": item.market_hash_name, "quantity": item.amount} for item in items[: size - tenth]]
+    updated_list_items = [
+        {"id": item.market_hash_name, "quantity": item.amount + 1} for item in items[tenth : 2 * tenth]
+    ] + [{"id": item.market_hash_name, "quantity": item.amount} for item in items[2 * tenth :]]
+    state = {}
+
+    def before_each():
+        session = get_database_session(workdir, f"update_list_items_{size}")
+        create_items(items_input, session)
+        state["list_id"] = create_list(1, "benchmark", session).id
+        update_list_items(state["list_id"], list_items, session)
+        session.commit()
+        state["session"] = session
+
+    def run():
+        update_list_items(state["list_id"], updated_list_items, state["session"])
+        state["session"].commit()
+        state["session"].close()
+
+    return run, before_each
+
+
+# name -> (setup, max amount of items it runs with)
+# database utils compare items pairwise (quadratic), so they are not run with the largest size
+BENCHMARK_CASES: dict[str, tuple[CaseSetup, int | None]] = {
+    "Inventory.model_validate": (setup_inventory_validate, None),
+    "SteamInventoryAPI.index_marketable_items": (setup_inventory_format, None),
+    "PandasExcelExporter.export_today_items": (setup_export_today_items, None),
+    "ExcelReader.get_items": (setup_excel_reader_get_items, None),
+    "db.utils.create_items": (setup_create_items, 10_000),
+    "db.utils.update_list_items": (setup_update_list_items, 10_000),
+}
+
+
+def time_case(setup: CaseSetup, size: int, runs: int, workdir: str) -> list[float]:
+    """
+    Set a case up and time it many times
+
+    :param setup: case setup
+    :param size: amount of items
+    :param runs: amount of timed runs
+    :param workdir: scratch directory
+
+    :returns: each run wall time, in seconds
+    """
+    run, before_each = setup(size, workdir)
+    durations = []
+    for _ in range(runs):
+        if before_each is not None:
+            before_each()
+        start = perf_counter()
+        run()
+        durations.append(perf_counter() - start)
+    return durations
+
+
+def get_git_commit() -> str | None:
+    """
+    Get the current git commit, so results can be told apart
+
+    :returns: commit hash, or None if it is not available
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare_results(results: dict, baseline_file: str):
+    """
+    Print how each result compares to the same case and size on a previous results file
+
+    :param results: current results
+    :param baseline_file: previous results json file
+
+    :returns: nothing
+    """
+    with open(baseline_file) as baseline:
+        baseline_results = json.load(baseline)["results"]
+    for name, size_results in results.items():
+        for size, result in size_results.items():
+            baseline_result = baseline_results.get(name, {}).get(size)
+            if baseline_result:
+                ratio = result["median_seconds"] / baseline_result["median_seconds"]
+                print(f"{name:<42} {size:>7}  {ratio:.2f}x the baseline median")
+
+
+def main(cases: list[str], sizes: list[int], runs: int, output: str | None, baseline: str | None):
+    workdir = tempfile.mkdtemp(prefix="sip-benchmarks-")
+    results: dict[str, dict[str, dict]] = {}
+    try:
+        for name in cases:
+            setup, max_size = BENCHMARK_CASES[name]
+            for size in sizes:
+                if max_size is not None and size > max_size:
+                    print(f"{name:<42} {size:>7}  skipped (runs with up to {max_size} items)")
+                    continue
+                durations = time_case(setup, size, runs, workdir)
+                results.setdefault(name, {})[str(size)] = {
+                    "min_seconds": round(min(durations), 4),
+                    "median_seconds": round(median(durations), 4),
+                }
+                print(f"{name:<42} {size:>7}  min {min(durations):.3f}s  median {median(durations):.3f}s")
+    finally:
+        shutil.rmtree(workdir)
+
+    if baseline:
+        compare_results(results, baseline)
+
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(
+                {"commit": get_git_commit(), "runs": runs, "python": sys.version.split()[0], "results": results},
+                output_file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(
+        description="Measure parsing, export and database utils with synthetic data (the same data on every run)"
+    )
+    parser.add_argument(
+        "--cases",
+        dest="cases",
+        help=f"Cases to run (all by default): {', '.join(BENCHMARK_CASES)}",
+        nargs="+",
+        choices=list(BENCHMARK_CASES),
+        default=list(BENCHMARK_CASES),
+    )
+    parser.add_argument(
+        "--sizes",
+        dest="sizes",
+        help=f"Amounts of items to run each case with. {' '.join(map(str, SIZES))} is the default value",
+        nargs="+",
+        type=int,
+        default=SIZES,
+    )
+    parser.add_argument(
+        "--runs",
+        dest="runs",
+        help="Amount of timed runs of each case and size. 3 is the default value",
+        type=int,
+        default=3,
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        help="Json file to save results to",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--baseline",
+        dest="baseline",
+        help="Results json file of a previous run (e.g. of another commit) to compare results with",
+        type=str,
+        default=None,
+    )
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    main(args.cases, args.sizes, args.runs, args.output, args.baseline)
@@ -0,0 +1,171 @@
+"""
+Deterministic synthetic data: the same arguments always generate the same data, so results are comparable
+"""
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+from models.batch import ItemBatch
+from models.items import Item
+
+WEAPONS = ["AK-47", "M4A4", "AWP", "Glock-18", "USP-S", "Desert Eagle", "P250", "MP9", "FAMAS", "Galil AR"]
+SKINS = ["Redline", "Asiimov", "Vulcan", "Fade", "Case Hardened", "Hyper Beast", "Neo-Noir", "Slate", "Printstream"]
+WEARS = ["Factory New", "Minimal Wear", "Field-Tested", "Well-Worn", "Battle-Scarred"]
+
+# workbooks have this many date sheets, evenly spread over WORKBOOK_DAYS until WORKBOOK_LAST_DATE
+WORKBOOK_SHEETS = 4
+WORKBOOK_DAYS = 730
+WORKBOOK_LAST_DATE = date(2024, 1, 1)
+
+
+def generate_item_names(items_amount: int, seed: int = 0) -> list[str]:
+    """
+    Generate distinct market_hash_names
+
+    :param items_amount: amount of names
+    :param seed: random seed
+
+    :returns: item names
+    """
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(WEAPONS)} | {rng.choice(SKINS)} ({rng.choice(WEARS)}) #{index}" for index in range(items_amount)
+    ]
+
+
+def generate_inventory(items_amount: int, app_id: int = 730, seed: int = 0) -> dict:
+    """
+    Generate a Steam inventory response (see external_apis.steam.models.Inventory).
+    About 90% of the items are marketable and 20% are commodities, which are held in larger amounts
+
+    :param items_amount: amount of distinct items (descriptions)
+    :param app_id: app id of the items
+    :param seed: random seed
+
+    :returns: inventory response json
+    """
+    rng = random.Random(seed)
+    assets = []
+    descriptions = []
+    for index, name in enumerate(generate_item_names(items_amount, seed)):
+        class_id = str(1_000_000 + index)
+        commodity = rng.random() < 0.2
+        descriptions.append(
+            {
+                "appid": app_id,
+                "classid": class_id,
+                "instanceid": "0",
+                "currency": 0,
+                "background_color": "",
+                "icon_url": "icon",
+                "descriptions": [{"type": "html", "value": "Exterior"}],
+                "tradable": 1,
+                "name": name,
+                "name_color": "D2D2D2",
+                "type": "Rifle",
+                "market_name": name,
+                "market_hash_name": name,
+                "commodity": int(commodity),
+                "market_tradable_restriction": 7,
+                "marketable": int(rng.random() < 0.9),
+                "tags": [
+                    {
+                        "category": "Type",
+                        "internal_name": "CSGO_Type_Rifle",
+                        "localized_category_name": "Type",
+                        "localized_tag_name": "Rifle",
+                    }
+                ],
+            }
+        )
+        for _ in range(rng.randint(1, 10) if commodity else 1):
+            assets.append(
+                {
+                    "appid": app_id,
+                    "contextid": "2",
+                    "assetid": str(20_000_000_000 + len(assets)),
+                    "classid": class_id,
+                    "instanceid": "0",
+                    "amount": "1",
+                }
+            )
+    return {
+        "assets": assets,
+        "descriptions": descriptions,
+        "total_inventory_count": len(assets),
+        "success": 1,
+        "rwgrsn": -2,
+    }
+
+
+def generate_items(items_amount: int, app_id: int = 730, seed: int = 0) -> list[Item]:
+    """
+    Generate items with amount
+
+    :param items_amount: amount of items
+    :param app_id: app id of the items
+    :param seed: random seed
+
+    :returns: items
+    """
+    rng = random.Random(seed)
+    return [
+        Item(app_id=app_id, name=name, amount=rng.randint(1, 5), market_hash_name=name)
+        for name in generate_item_names(items_amount, seed)
+    ]
+
+
+def generate_item_batch(items: list[Item], price_date: date, seed: int = 0) -> ItemBatch:
+    """
+    Price items on a date (about 2% of them with api errors)
+
+    :param items: items to be priced
+    :param price_date: date of the prices
+    :param seed: random seed (the same seed and date always give the same prices)
+
+    :returns: items with price
+    """
+    rng = random.Random(f"{seed}-{price_date.isoformat()}")
+    prices = [None if rng.random() < 0.02 else round(rng.lognormvariate(0, 1.5), 2) for _ in items]
+    return ItemBatch.from_columns(
+        {
+            "app_id": [item.app_id for item in items],
+            "name": [item.name for item in items],
+            "price_unitary": prices,
+            "amount": [item.amount for item in items],
+            "api_error": ["yes" if price is None else "no" for price in prices],
+            "price_date": [price_date.isoformat()] * len(items),
+            "price_date_timestamp": [int(datetime.combine(price_date, time(), timezone.utc).timestamp())] * len(items),
+            "market_hash_name": [item.market_hash_name for item in items],
+        }
+    )
+
+
+def get_workbook_dates(sheets: int = WORKBOOK_SHEETS) -> list[date]:
+    """
+    Get the dates of a synthetic workbook sheets
+
+    :param sheets: amount of date sheets
+
+    :returns: dates, from oldest to most recent
+    """
+    interval = WORKBOOK_DAYS // max(sheets - 1, 1)
+    return [WORKBOOK_LAST_DATE - timedelta(days=interval * index) for index in reversed(range(sheets))]
+
+
+def generate_workbook(path: str, items_amount: int, sheets: int = WORKBOOK_SHEETS, seed: int = 0):
+    """
+    Write a multi-year workbook, with one sheet per date (and the summary sheet)
+
+    :param path: workbook file path
+    :param items_amount: amount of items on each sheet
+    :param sheets: amount of date sheets
+    :param seed: random seed
+
+    :returns: nothing
+    """
+    # NOTE: imported here, so generating other data doesn't import pandas
+    from data_exporters.pandas_excel_exporter import PandasExcelExporter
+
+    items = generate_items(items_amount, seed=seed)
+    items_by_date = {day.isoformat(): generate_item_batch(items, day, seed) for day in get_workbook_dates(sheets)}
+    PandasExcelExporter(path).export_dated_items(items_by_date)
@@ -0,0 +1,112 @@
+"""
+sip command line: a single entry point for all scripts (run 'sip --help' to list them).
+
+A command's module (and its heavy dependencies: pandas, httpx, sqlalchemy...) is only imported
+when that command runs, so '--help' and quick commands like 'sip status' start fast.
+"""
+import argparse
+import importlib
+
+from scripts import arguments
+
+# command -> (module with a run(args) function, description, function adding the command arguments)
+COMMANDS = {
+    "generate": (
+        "scripts.generate_spreadsheet",
+        arguments.GENERATE_DESCRIPTION,
+        arguments.add_generate_arguments,
+    ),
+    "generate-batch": (
+        "scripts.generate_spreadsheets_batch",
+        arguments.GENERATE_BATCH_DESCRIPTION,
+        arguments.add_generate_batch_arguments,
+    ),
+    "update-prices": (
+        "scripts.update_prices_spreadsheet",
+        arguments.UPDATE_PRICES_DESCRIPTION,
+        arguments.add_update_prices_arguments,
+    ),
+    "retry-errors": (
+        "scripts.retry_api_errors_spreadsheet",
+        arguments.RETRY_ERRORS_DESCRIPTION,
+        arguments.add_retry_errors_arguments,
+    ),
+    "update-amount": (
+        "scripts.update_amount_spreadsheet",
+        arguments.UPDATE_AMOUNT_DESCRIPTION,
+        arguments.add_update_amount_arguments,
+    ),
+    "backfill": (
+        "scripts.backfill_item_prices",
+        arguments.BACKFILL_DESCRIPTION,
+        arguments.add_backfill_arguments,
+    ),
+    "build-index": (
+        "scripts.build_price_history_index",
+        arguments.BUILD_INDEX_DESCRIPTION,
+        arguments.add_build_index_arguments,
+    ),
+    "backdate": (
+        "scripts.backdate_spreadsheet",
+        arguments.BACKDATE_DESCRIPTION,
+        arguments.add_backdate_arguments,
+    ),
+    "daemon": (
+        "scripts.run_price_daemon",
+        arguments.DAEMON_DESCRIPTION,
+        arguments.add_daemon_arguments,
+    ),
+    "enqueue": (
+        "scripts.enqueue_pricing_jobs",
+        arguments.ENQUEUE_DESCRIPTION,
+        arguments.add_enqueue_arguments,
+    ),
+    "worker": (
+        "scripts.run_pricing_worker",
+        arguments.WORKER_DESCRIPTION,
+        arguments.add_worker_arguments,
+    ),
+    "compact": (
+        "scripts.compact_item_prices",
+        arguments.COMPACT_DESCRIPTION,
+        arguments.add_compact_arguments,
+    ),
+    "serve": (
+        "scripts.run_read_api",
+        arguments.SERVE_DESCRIPTION,
+        arguments.add_serve_arguments,
+    ),
+    "status": (
+        "scripts.status",
+        arguments.STATUS_DESCRIPTION,
+        arguments.add_status_arguments,
+    ),
+}
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Build the sip command line parser, with one sub parser per command
+
+    :returns: parser
+    """
+    parser = argparse.ArgumentParser(prog="sip", description="Steam Inventory Prices")
+    subparsers = parser.add_subparsers(dest="command", metavar="command", required=True)
+    for command, (_, description, add_arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=description, description=description)
+        add_arguments(subparser)
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = get_parser().parse_args(argv)
+
+    # import the command module only now
+    module_name = COMMANDS[args.command][0]
+    importlib.import_module(module_name).run(args)
+
+
+if __name__ == "__main__":
+    main()
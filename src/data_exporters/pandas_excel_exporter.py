@@ -3,18 +3,23 @@ from time import time
 
 import pandas as pd
 from openpyxl import Workbook
+from openpyxl.packaging.custom import StringProperty
 
 from data_exporters.workbook_stylish import WorkbookStylish
+from data_readers.excel_reader import CURRENCY_PROPERTY
+from diagnostics.profiler import profile_stage
+from models.batch import ItemBatch
 from models.items import ItemWithPrice
-from models.utils import convert_model_to_list
 
 
 class PandasExcelExporter:
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, currency: str | None = None):
         self.filename = filename
+        self.currency = currency
 
         self.today_date = datetime.utcnow().strftime("%Y-%m-%d")
-        self.excel_writer: pd.ExcelWriter = self._create_writter()
+        with profile_stage("excel.open"):
+            self.excel_writer: pd.ExcelWriter = self._create_writter()
         self.workbook: Workbook = self._get_workbook()
         self.workbook_stylish = WorkbookStylish(self.workbook)
 
@@ -39,6 +44,23 @@ class PandasExcelExporter:
         """
         return self.excel_writer.book
 
+    def _set_currency(self):
+        """
+        Record the currency of the exported prices on the workbook, if it was provided
+
+        :returns: nothing
+        :raises ValueError: if the workbook prices are in another currency
+        """
+        if self.currency is None:
+            return
+        custom_doc_props = self.workbook.custom_doc_props
+        if CURRENCY_PROPERTY in custom_doc_props.names:
+            workbook_currency = custom_doc_props[CURRENCY_PROPERTY].value
+            if workbook_currency != self.currency:
+                raise ValueError(f"{self.filename} is priced in {workbook_currency}, not in {self.currency}")
+            return
+        custom_doc_props.append(StringProperty(name=CURRENCY_PROPERTY, value=self.currency))
+
     def _get_sheet_data(self, sheet_name: str) -> pd.DataFrame:
         """
         Returns a sheet data given its name
@@ -67,14 +89,22 @@ class PandasExcelExporter:
             worksheet = self.workbook.get_sheet_by_name(sheet_name)
             self.workbook.remove(worksheet)
 
-    def _format_items_today_df_column_order(self, items_today_df: pd.DataFrame) -> pd.DataFrame:
+    def _format_items_today_df_column_order(
+        self, items_today_df: pd.DataFrame, currencies: list[str] | None = None
+    ) -> pd.DataFrame:
         """
         Set the desired order of columns to write to an excel spreadsheet on items dataframes
 
         :param items_today_df: today items dataframe to have its column order set
+        :param currencies: converted currencies, which columns are added at the end
 
         :returns: new df with the desired column order
         """
+        currency_columns = [
+            f"{column}_{currency.lower()}"
+            for currency in currencies or []
+            for column in ["price_unitary", "price_total"]
+        ]
         return items_today_df[
             [
                 "app_id",
@@ -83,12 +113,34 @@ class PandasExcelExporter:
                 "amount",
                 "price_total",
                 "api_error",
+                "price_stale",
                 "price_date",
                 "price_date_timestamp",
                 "market_hash_name",
+                "price_median_24h",
+                "price_vwap_7d",
+                "price_vwap_30d",
+                "volume_24h",
+                *currency_columns,
             ]
         ]
 
+    def _add_currency_columns(self, items_today_df: pd.DataFrame, currency_rates: dict[str, float]) -> pd.DataFrame:
+        """
+        Add price columns converted to each currency (e.g. price_unitary_brl and price_total_brl)
+        Columns are converted as a whole, instead of item by item
+
+        :param items_today_df: today items dataframe, with prices in the workbook currency
+        :param currency_rates: map of currency to its rate (amount of currency that one unit of the prices currency buys)
+
+        :returns: new df with converted price columns
+        """
+        converted_columns = {}
+        for currency, rate in currency_rates.items():
+            converted_columns[f"price_unitary_{currency.lower()}"] = items_today_df["price_unitary"] * rate
+            converted_columns[f"price_total_{currency.lower()}"] = items_today_df["price_total"] * rate
+        return items_today_df.assign(**converted_columns)
+
     def _format_summary_df_column_order(self, summary_df: pd.DataFrame) -> pd.DataFrame:
         """
         Set the desired order of columns to write to an excel spreadsheet on summary dataframes
@@ -99,16 +151,21 @@ class PandasExcelExporter:
         """
         return summary_df[["price_date", "price_total", "api_error"]]
 
-    def _get_items_today_sum(self, items_today_df: pd.DataFrame) -> dict:
+    def _get_items_today_sum(
+        self, items_today_df: pd.DataFrame, currencies: list[str] | None = None, price_date: str | None = None
+    ) -> dict:
         """
         Get a report of all items in today's items
 
         :param items_df: today's item dataframe
+        :param currencies: converted currencies, which totals are also summed
+        :param price_date: date of the items prices. today, if not provided
 
         :returns: dict with sum of today's items data
         """
         today_price_total = items_today_df["price_total"].sum()
         api_error_amount = items_today_df[items_today_df["api_error"] == "yes"].shape[0]
+        price_stale_amount = items_today_df[items_today_df["price_stale"] == "yes"].shape[0]
         today_sum = {
             "amount": items_today_df["amount"].sum(),
             "app_id": "---",
@@ -116,10 +173,14 @@ class PandasExcelExporter:
             "name": "Sum of all items",
             "price_unitary": "---",
             "price_total": today_price_total,
-            "price_date": self.today_date,
-            "price_date_timestamp": int(time()),
+            "price_date": price_date or self.today_date,
+            "price_date_timestamp": int(time()) if price_date is None else items_today_df["price_date_timestamp"].max(),
             "api_error": "yes" if api_error_amount > 0 else "no",
+            "price_stale": "yes" if price_stale_amount > 0 else "no",
         }
+        for currency in currencies or []:
+            today_sum[f"price_unitary_{currency.lower()}"] = "---"
+            today_sum[f"price_total_{currency.lower()}"] = items_today_df[f"price_total_{currency.lower()}"].sum()
         return today_sum
 
     def _get_today_summary(self, today_sum: dict) -> dict:
@@ -149,40 +210,111 @@ class PandasExcelExporter:
         new_row = pd.DataFrame([data])
         return pd.concat([df, new_row], ignore_index=True)
 
-    def export_today_items(self, items_today: list[ItemWithPrice]):
+    def _get_items_df(
+        self,
+        items: list[ItemWithPrice] | ItemBatch,
+        currency_rates: dict[str, float] | None = None,
+        price_date: str | None = None,
+    ) -> tuple[pd.DataFrame, dict]:
+        """
+        Build a day's sheet dataframe: items with their total price, followed by the sum of all items
+
+        :param items: items of the day
+        :param currency_rates: map of currency to its rate. if provided, prices are also exported in each currency
+        :param price_date: date of the items prices. today, if not provided
+
+        :returns: sheet dataframe and the sum of all items
+        """
+        # set items as a dataframe and compute total price of each iten
+        if not isinstance(items, ItemBatch):
+            items = ItemBatch.from_items(items)
+        items_df = items.to_dataframe()
+        items_df["price_total"] = items_df["price_unitary"] * items_df["amount"]
+        currencies = list(currency_rates or {})
+        if currency_rates:
+            items_df = self._add_currency_columns(items_df, currency_rates)
+
+        # add prices sum to dataframe
+        items_sum = self._get_items_today_sum(items_df, currencies, price_date)
+        items_df = self._append_data_to_df(items_df, items_sum)
+        items_df = self._format_items_today_df_column_order(items_df, currencies)
+        return items_df, items_sum
+
+    def export_today_items(
+        self,
+        items_today: list[ItemWithPrice] | ItemBatch,
+        summary: list[dict] | None = None,
+        currency_rates: dict[str, float] | None = None,
+    ):
         """
         Add provided items to today's sheet
         Also, add today to summary sheet
 
-        :param items_today: list of items to be added to today's sheet
+        :param items_today: items to be added to today's sheet (an ItemBatch avoids converting item by item)
+        :param summary: precomputed summary rows (e.g. db.queries.get_list_summary). if provided, they replace the
+            summary sheet rows of the same dates. today's row is always today's items sum
+        :param currency_rates: map of currency to its rate. if provided, prices are also exported in each currency
 
         :returns: nothing
         """
-        # set items as a dataframe and compute total price of each iten
-        items_today_list = convert_model_to_list(items_today)
-        items_today_df = pd.DataFrame(items_today_list)
-        items_today_df["price_total"] = items_today_df["price_unitary"] * items_today_df["amount"]
-
-        # add today's prices sum to dataframe
-        today_sum = self._get_items_today_sum(items_today_df)
-        items_today_df = self._append_data_to_df(items_today_df, today_sum)
-        items_today_df = self._format_items_today_df_column_order(items_today_df)
+        with profile_stage("excel.build_dataframe"):
+            items_today_df, today_sum = self._get_items_df(items_today, currency_rates)
 
         # get summary sheet and add today's summary (or overwrite, if it exists)
         # NOTE: for some reason, the price_date column values are starting with a '
         summary_df = self._get_sheet_data("Summary")
-        if self.today_date in summary_df["price_date"].values:
+        if summary is not None:
+            summary_rows = [row for row in summary if row["price_date"] != self.today_date]
+            summary_dates = [row["price_date"] for row in summary_rows] + [self.today_date]
+            summary_df = summary_df[~summary_df["price_date"].isin(summary_dates)]
+            summary_df = pd.concat([summary_df, pd.DataFrame(summary_rows, columns=summary_df.columns)])
+            summary_df = summary_df.sort_values("price_date", ignore_index=True)
+        elif self.today_date in summary_df["price_date"].values:
             summary_df = summary_df.drop(summary_df.index[-1])
         today_summary = self._get_today_summary(today_sum)
         summary_df = self._append_data_to_df(summary_df, today_summary)
         summary_df = self._format_summary_df_column_order(summary_df)
 
         # remove summary and today's prices sheets
+        self._set_currency()
         self._delete_sheet("Summary")
         self._delete_sheet(self.today_date)
 
         # add new sheets
-        items_today_df.to_excel(self.excel_writer, index=False, sheet_name=self.today_date)
+        with profile_stage("excel.write_sheets"):
+            items_today_df.to_excel(self.excel_writer, index=False, sheet_name=self.today_date)
+            summary_df.to_excel(self.excel_writer, index=False, sheet_name="Summary")
+        with profile_stage("excel.style"):
+            self.workbook_stylish.style_workbook()
+        with profile_stage("excel.save"):
+            self.excel_writer.close()
+
+    def export_dated_items(self, items_by_date: dict[str, ItemBatch]):
+        """
+        Add (or overwrite) one sheet per date, e.g. back-dated sheets priced from a price history index
+        Also, add each date to summary sheet. The workbook is written only once, whatever the amount of dates
+
+        :param items_by_date: map of date (YYYY-MM-DD) to the items priced on that date
+
+        :returns: nothing
+        """
+        self._set_currency()
+        summary_df = self._get_sheet_data("Summary")
+        summary_df = summary_df[~summary_df["price_date"].isin(items_by_date)]
+        summary_rows = []
+        for price_date, items in items_by_date.items():
+            with profile_stage("excel.build_dataframe"):
+                items_df, items_sum = self._get_items_df(items, price_date=price_date)
+            summary_rows.append(self._get_today_summary(items_sum))
+            self._delete_sheet(price_date)
+            with profile_stage("excel.write_sheets"):
+                items_df.to_excel(self.excel_writer, index=False, sheet_name=price_date)
+
+        summary_df = pd.concat([summary_df, pd.DataFrame(summary_rows)], ignore_index=True)
+        summary_df = self._format_summary_df_column_order(summary_df.sort_values("price_date", ignore_index=True))
+        self._delete_sheet("Summary")
         summary_df.to_excel(self.excel_writer, index=False, sheet_name="Summary")
-        self.workbook_stylish.style_workbook()
-        self.excel_writer.close()
+        with profile_stage("excel.style"):
+            self.workbook_stylish.style_workbook()
+        with profile_stage("excel.save"):
+            self.excel_writer.close()
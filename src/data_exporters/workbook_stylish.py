@@ -1,5 +1,6 @@
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font
+from openpyxl.utils import get_column_letter
 
 
 class WorkbookStylish:
@@ -24,9 +25,10 @@ class WorkbookStylish:
             ["D", 10, self.column_font, self.column_alignment],
             ["E", 15, self.column_font, self.column_alignment],
             ["F", 11, self.column_font, self.column_alignment],
-            ["G", 14, self.column_font, self.column_alignment],
-            ["H", 24, self.column_font, self.column_alignment],
-            ["I", 55, self.column_font, self.column_alignment],
+            ["G", 12, self.column_font, self.column_alignment],
+            ["H", 14, self.column_font, self.column_alignment],
+            ["I", 24, self.column_font, self.column_alignment],
+            ["J", 55, self.column_font, self.column_alignment],
         ]
 
         # update each date worksheet
@@ -35,8 +37,12 @@ class WorkbookStylish:
             if worksheet.title == "Summary":
                 continue
 
-            # format date worksheet
-            for name, width, font, alignment in columns_style:
+            # format date worksheet (extra columns, like converted currencies, share the same style)
+            extra_columns_style = [
+                [get_column_letter(index), 18, self.column_font, self.column_alignment]
+                for index in range(len(columns_style) + 1, worksheet.max_column + 1)
+            ]
+            for name, width, font, alignment in columns_style + extra_columns_style:
                 worksheet.column_dimensions[name].font = font
                 worksheet.column_dimensions[name].alignment = alignment
                 worksheet.column_dimensions[name].width = width
@@ -1,14 +1,19 @@
 import pandas as pd
 
+from diagnostics.profiler import profile_stage
+from models.batch import ItemBatch
 from models.items import ItemWithPrice
-from models.utils import convert_list_to_model
+
+# workbook custom property holding the currency its prices are in
+CURRENCY_PROPERTY = "currency"
 
 
 class ExcelReader:
     def __init__(self, filename: str):
         self.filename = filename
 
-        self.excel_file = pd.ExcelFile(self.filename)
+        with profile_stage("excel.open"):
+            self.excel_file = pd.ExcelFile(self.filename)
 
     def get_most_recent_date_sheet_name(self) -> str:
         """
@@ -20,14 +25,53 @@ class ExcelReader:
         sheet_names = sorted(self.excel_file.sheet_names)
         return sheet_names[-2]
 
-    def get_items(self) -> list[ItemWithPrice]:
+    def get_currency(self) -> str | None:
         """
-        Get the most recent date sheet items excluding the sum line
+        Returns the currency the workbook prices are in
+
+        :returns: recorded currency, or None if the workbook has none recorded
+        """
+        custom_doc_props = self.excel_file.book.custom_doc_props
+        if CURRENCY_PROPERTY not in custom_doc_props.names:
+            return None
+        return custom_doc_props[CURRENCY_PROPERTY].value
+
+    def get_item_batch(self) -> ItemBatch:
+        """
+        Get the most recent date sheet items excluding the sum line, validated column by column
 
         :returns: the most recent date sheet items
         """
         sheet_name = self.get_most_recent_date_sheet_name()
-        items_df = self.excel_file.parse(sheet_name)
+        with profile_stage("excel.read_sheet"):
+            items_df = self.excel_file.parse(sheet_name)
         items_df = items_df.drop(items_df.index[-1])
-        items = items_df.to_dict("records")
-        return convert_list_to_model(ItemWithPrice, items)
+        with profile_stage("excel.validate_items"):
+            return ItemBatch.from_dataframe(items_df)
+
+    def get_items(self) -> list[ItemWithPrice]:
+        """
+        Get the most recent date sheet items excluding the sum line
+
+        :returns: the most recent date sheet items
+        """
+        return self.get_item_batch().to_items()
+
+    def get_items_price_history(self, sheets_amount: int) -> dict[str, list[float]]:
+        """
+        Get each item's unitary prices on the most recent date sheets (skipping api errors)
+
+        :param sheets_amount: amount of most recent date sheets to read
+
+        :returns: map of item market_hash_name to its prices, from oldest to most recent
+        """
+        date_sheet_names = sorted(sheet_name for sheet_name in self.excel_file.sheet_names if sheet_name != "Summary")
+        items_price_history: dict[str, list[float]] = {}
+        for sheet_name in date_sheet_names[-sheets_amount:]:
+            with profile_stage("excel.read_sheet"):
+                items_df = self.excel_file.parse(sheet_name, usecols=["market_hash_name", "price_unitary"])
+            items_df = items_df.drop(items_df.index[-1])
+            items_df = items_df[pd.to_numeric(items_df["price_unitary"], errors="coerce").notna()]
+            for market_hash_name, price_unitary in zip(items_df["market_hash_name"], items_df["price_unitary"]):
+                items_price_history.setdefault(market_hash_name, []).append(float(price_unitary))
+        return items_price_history
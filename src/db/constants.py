@@ -0,0 +1,35 @@
+# NOTE: this module must stay free of heavy imports, since the sip cli reads it to build its arguments
+
+# prices newer than this keep one row per day
+FULL_RESOLUTION_DAYS = 90
+
+# prices older than FULL_RESOLUTION_DAYS but newer than this keep one row per week, older ones one row per month
+WEEKLY_RESOLUTION_DAYS = 730
+
+# item table column holding the item name in each language (sip --item_names_language values)
+ITEM_NAME_COLUMNS = {"english": "name_en", "portuguese": "name_pt"}
+
+# max market_hash_names per IN clause when reading or writing item names
+ITEM_NAMES_CHUNK_SIZE = 500
+
+# pricing_job status values: "pending" jobs wait for a worker, "claimed" ones are being priced by one
+PRICING_JOB_STATUSES = ["pending", "claimed", "done", "failed"]
+
+# amount of jobs a worker claims at once
+PRICING_JOB_BATCH_SIZE = 20
+
+# seconds a worker holds its claimed jobs. jobs of workers that crashed are claimed again once it expires,
+# so it must be longer than a worker takes to price a whole batch
+PRICING_JOB_LEASE_SECONDS = 600
+
+# amount of claims after which a job that could not be priced is given up (flagged as failed)
+PRICING_JOB_MAX_ATTEMPTS = 3
+
+# data versioned on the data_version table: "item_price" (prices) and "list" (lists and their items)
+DATA_VERSION_NAMES = ["item_price", "list"]
+
+# read api (local http api serving lists, prices and valuations from the database)
+READ_API_PORT = 8788
+
+# seconds read api responses are served from memory before checking if the data changed
+READ_API_VERSION_CHECK_SECONDS = 1.0
@@ -0,0 +1,21 @@
+#
+# data versions
+# bumped along with data changes, so readers caching that data know when to drop their cache
+#
+from sqlalchemy import update
+from sqlalchemy.orm.session import Session as SessionT
+
+from db.models import DataVersion
+
+
+def bump_data_version(name: str, session: SessionT):
+    """
+    Increase a data version on the session's transaction, so it commits along with the data change.
+    Readers caching that data (e.g. the read api) compare versions to know when to drop their cache
+
+    :param name: versioned data (one of DATA_VERSION_NAMES)
+    :param session: session changing the data
+
+    :returns: nothing
+    """
+    session.execute(update(DataVersion).where(DataVersion.name == name).values(version=DataVersion.version + 1))
@@ -0,0 +1,235 @@
+#
+# pricing jobs queue
+# producers enqueue items to be priced, and any number of workers (on any number of hosts) claim them in batches.
+# workers coordinate only through the pricing_job table: a claim holds jobs for a lease, and claims of workers
+# that crashed are taken over once their lease expires
+#
+from datetime import date
+from time import time
+from typing import List as ListT
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.orm.session import Session as SessionT
+
+from db import metadata
+from db.constants import ITEM_NAMES_CHUNK_SIZE, PRICING_JOB_LEASE_SECONDS, PRICING_JOB_MAX_ATTEMPTS
+from db.models import PricingJob
+from db.utils import create_items, upsert_item_prices
+
+
+def enqueue_pricing_jobs(
+    jobs: ListT[dict],
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Enqueue pricing jobs, skipping items that already have an open (pending or claimed) job in the same currency
+
+    :param jobs: list with dict of jobs, where each dict must have
+        :property app_id: app id of the app (game) that the item belongs to
+        :property market_hash_name: item market_hash_name
+        :property currency: currency to price the item in (one of CURRENCIES)
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of enqueued jobs
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # search for open jobs of the same items
+    market_hash_names = list({job["market_hash_name"] for job in jobs})
+    open_jobs = set()
+    for index in range(0, len(market_hash_names), ITEM_NAMES_CHUNK_SIZE):
+        query = select(PricingJob.market_hash_name, PricingJob.currency).where(
+            PricingJob.market_hash_name.in_(market_hash_names[index : index + ITEM_NAMES_CHUNK_SIZE]),
+            PricingJob.status.in_(["pending", "claimed"]),
+        )
+        open_jobs.update(tuple(row) for row in session.execute(query))
+
+    # insert jobs only for items without an open job (once per item, even if provided more than once)
+    created_at = int(time())
+    new_jobs = []
+    for job in jobs:
+        key = (job["market_hash_name"], job["currency"])
+        if key not in open_jobs:
+            open_jobs.add(key)
+            new_jobs.append(job | {"status": "pending", "attempts": 0, "created_at": created_at})
+    if new_jobs:
+        session.execute(insert(PricingJob), new_jobs)
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.commit()
+        session.close()
+
+    return len(new_jobs)
+
+
+def claim_pricing_jobs(
+    batch_size: int,
+    lease_seconds: int = PRICING_JOB_LEASE_SECONDS,
+    max_attempts: int = PRICING_JOB_MAX_ATTEMPTS,
+) -> tuple[str, ListT[dict]]:
+    """
+    Claim a batch of pending jobs (or jobs whose claim expired), oldest first.
+    On MySQL, rows are selected with 'FOR UPDATE SKIP LOCKED', so concurrent workers skip each other's rows
+    instead of waiting for them. SQLite has no row locks, but it serializes writers: jobs are claimed by a single
+    conditional UPDATE that sets this claim's token, and then read back by that token.
+    Jobs whose claim expired after max_attempts claims are flagged as failed instead of claimed again.
+    The claim is always commited, so other workers see it right away.
+
+    :param batch_size: max amount of jobs to claim
+    :param lease_seconds: seconds the jobs are held by this claim
+    :param max_attempts: max amount of claims of a job
+
+    :returns: claim token and claimed jobs, where each job dict has
+        :property id: job id
+        :property app_id: app id of the app (game) that the item belongs to
+        :property market_hash_name: item market_hash_name
+        :property currency: currency to price the item in
+    """
+    session = metadata.sip_sessionmaker()
+    now = int(time())
+    claim_token = uuid4().hex
+    expired = (PricingJob.status == "claimed") & (PricingJob.claim_expires_at < now)
+
+    # give up jobs claimed too many times (e.g. items that make workers crash)
+    session.execute(
+        update(PricingJob)
+        .where(expired, PricingJob.attempts >= max_attempts)
+        .values(status="failed", claim_token=None, claim_expires_at=None, finished_at=now)
+    )
+
+    claimable = select(PricingJob.id).where(or_(PricingJob.status == "pending", expired)).order_by(PricingJob.id)
+    claim = dict(
+        status="claimed",
+        attempts=PricingJob.attempts + 1,
+        claim_token=claim_token,
+        claim_expires_at=now + lease_seconds,
+    )
+    if session.get_bind().dialect.name == "sqlite":
+        claimable_ids = claimable.limit(batch_size).scalar_subquery()
+        session.execute(update(PricingJob).where(PricingJob.id.in_(claimable_ids)).values(**claim))
+    else:
+        claimable_ids = session.execute(claimable.limit(batch_size).with_for_update(skip_locked=True)).scalars().all()
+        if claimable_ids:
+            session.execute(update(PricingJob).where(PricingJob.id.in_(claimable_ids)).values(**claim))
+    session.commit()
+
+    query = select(PricingJob.id, PricingJob.app_id, PricingJob.market_hash_name, PricingJob.currency).where(
+        PricingJob.claim_token == claim_token
+    )
+    jobs = [row._asdict() for row in session.execute(query)]
+    session.close()
+
+    return claim_token, jobs
+
+
+def complete_pricing_jobs(
+    claim_token: str,
+    job_prices: ListT[dict],
+    price_date: date,
+    max_attempts: int = PRICING_JOB_MAX_ATTEMPTS,
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Save the prices of claimed jobs and finish them. Jobs without a price go back to pending,
+    unless they reached max_attempts claims (then they are flagged as failed).
+    Jobs no longer held by the claim (its lease expired and another worker claimed them) are left untouched,
+    but their prices are saved anyway.
+
+    :param claim_token: token of the claim holding the jobs
+    :param job_prices: list with dict of job results, where each dict must have
+        :property id: job id
+        :property app_id: app id of the app (game) that the item belongs to
+        :property market_hash_name: item market_hash_name
+        :property price_usd: item price in USD, or None if it could not be priced
+    :param price_date: price date
+    :param max_attempts: max amount of claims of a job
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of saved prices
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # save prices (items are created without names, which are filled in once the item is on an inventory)
+    priced_jobs = [job for job in job_prices if job["price_usd"] is not None]
+    create_items(
+        [
+            {"market_hash_name": job["market_hash_name"], "app_id": job["app_id"], "name_en": None}
+            for job in priced_jobs
+        ],
+        session,
+    )
+    upsert_item_prices(
+        [
+            {"item_id": job["market_hash_name"], "date": price_date, "price_usd": job["price_usd"]}
+            for job in {job["market_hash_name"]: job for job in priced_jobs}.values()
+        ],
+        session,
+    )
+
+    # finish priced jobs and release the others
+    now = int(time())
+    held = PricingJob.claim_token == claim_token
+    if priced_jobs:
+        session.execute(
+            update(PricingJob)
+            .where(held, PricingJob.id.in_([job["id"] for job in priced_jobs]))
+            .values(status="done", claim_token=None, claim_expires_at=None, finished_at=now)
+        )
+    failed_job_ids = [job["id"] for job in job_prices if job["price_usd"] is None]
+    if failed_job_ids:
+        given_up = PricingJob.attempts >= max_attempts
+        session.execute(
+            update(PricingJob)
+            .where(held, PricingJob.id.in_(failed_job_ids))
+            .values(
+                status=case((given_up, "failed"), else_="pending"),
+                claim_token=None,
+                claim_expires_at=None,
+                finished_at=case((given_up, now), else_=None),
+            )
+        )
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.commit()
+        session.close()
+
+    return len(priced_jobs)
+
+
+def get_pricing_jobs_count(session_external: Optional[SessionT] = None) -> dict[str, int]:
+    """
+    Count jobs by status
+
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: map of each status (with jobs) to its amount of jobs
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    query = select(PricingJob.status, func.count()).group_by(PricingJob.status)
+    jobs_count = {status: count for status, count in session.execute(query)}
+
+    if not session_external:
+        session.close()
+
+    return jobs_count
@@ -0,0 +1,223 @@
+#
+# list_daily_value materialization
+# keeps each list's daily total value precomputed, so reads don't join list items against prices
+#
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, Optional
+from typing import List as ListT
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm.session import Session as SessionT
+
+from db import metadata
+from db.data_version import bump_data_version
+from db.models import ItemList, ItemPrice, ListDailyValue
+
+# max amount of bound values per IN clause
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+def _chunks(values: list, size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterable[list]:
+    """
+    Split a list into chunks of at most 'size' values
+
+    :param values: values to be split
+    :param size: max chunk size
+
+    :returns: chunks generator
+    """
+    for index in range(0, len(values), size):
+        yield values[index : index + size]
+
+
+def _aggregate_list_daily_values_query(list_id: int | None = None, dates: list[date] | None = None):
+    """
+    Build the aggregate select that computes list_daily_value rows
+
+    :param list_id: restrict the aggregation to this list. if not provided, aggregate all lists
+    :param dates: restrict the aggregation to these dates. if not provided, aggregate all dates
+
+    :returns: select statement with list_id, date, price_total and items_priced columns
+    """
+    query = (
+        select(
+            ItemList.list_id,
+            ItemPrice.date,
+            func.sum(ItemPrice.price_usd * ItemList.quantity),
+            func.count(),
+        )
+        .select_from(ItemList)
+        .join(ItemPrice, ItemPrice.item_id == ItemList.item_id)
+        .group_by(ItemList.list_id, ItemPrice.date)
+    )
+    if list_id is not None:
+        query = query.where(ItemList.list_id == list_id)
+    if dates is not None:
+        query = query.where(ItemPrice.date.in_(dates))
+    return query
+
+
+def _refresh_list_dates(session: SessionT, list_id: int, dates: list[date]):
+    """
+    Recompute list_daily_value rows of a single list on the given dates
+
+    :param session: session to run statements on
+    :param list_id: list id
+    :param dates: dates to be recomputed
+
+    :returns: nothing
+    """
+    columns = ["list_id", "date", "price_total", "items_priced"]
+    for dates_chunk in _chunks(sorted(dates)):
+        session.execute(
+            delete(ListDailyValue).where(ListDailyValue.list_id == list_id, ListDailyValue.date.in_(dates_chunk))
+        )
+        session.execute(
+            insert(ListDailyValue).from_select(columns, _aggregate_list_daily_values_query(list_id, dates_chunk))
+        )
+
+
+def refresh_list_daily_values(
+    list_dates: Iterable[tuple[int, date]],
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Recompute only the provided (list, date) rows of list_daily_value
+
+    :param list_dates: (list_id, date) pairs to be recomputed
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of (list, date) pairs recomputed
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # group dates by list, to recompute each list with a single statement per dates chunk
+    list_id_to_dates: dict[int, set[date]] = defaultdict(set)
+    for list_id, list_date in list_dates:
+        list_id_to_dates[list_id].add(list_date)
+
+    session.flush()
+    for list_id, dates in list_id_to_dates.items():
+        _refresh_list_dates(session, list_id, list(dates))
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.commit()
+        session.close()
+
+    return sum(len(dates) for dates in list_id_to_dates.values())
+
+
+def refresh_list_daily_values_for_prices(
+    item_prices: ListT[dict],
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Recompute list_daily_value rows affected by new (or updated) item prices
+
+    :param item_prices: list with dict of item prices, where each dict must have
+        :property item_id: item id (market_hash_name)
+        :property date: price date
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of (list, date) pairs recomputed
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # map each priced item to the lists that hold it
+    item_id_to_dates: dict[str, set[date]] = defaultdict(set)
+    for item_price in item_prices:
+        item_id_to_dates[item_price["item_id"]].add(item_price["date"])
+    list_dates = set()
+    for item_ids_chunk in _chunks(list(item_id_to_dates)):
+        list_items = session.execute(
+            select(ItemList.list_id, ItemList.item_id).where(ItemList.item_id.in_(item_ids_chunk))
+        )
+        for list_id, item_id in list_items:
+            list_dates.update((list_id, item_date) for item_date in item_id_to_dates[item_id])
+
+    refreshed_amount = refresh_list_daily_values(list_dates, session)
+
+    # persist changes
+    if not session_external:
+        session.commit()
+        session.close()
+
+    return refreshed_amount
+
+
+def refresh_list_daily_values_for_list_items(
+    list_id: int,
+    item_ids: ListT[str],
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Recompute list_daily_value rows affected by items added, removed or with quantity changed on a list.
+    Only the dates where those items have a price are recomputed.
+
+    :param list_id: list id which items changed
+    :param item_ids: changed items ids (market_hash_name)
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of (list, date) pairs recomputed
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    dates = set()
+    for item_ids_chunk in _chunks(list(item_ids)):
+        dates.update(session.scalars(select(ItemPrice.date).where(ItemPrice.item_id.in_(item_ids_chunk)).distinct()))
+
+    refreshed_amount = refresh_list_daily_values([(list_id, item_date) for item_date in dates], session)
+
+    # persist changes
+    if not session_external:
+        session.commit()
+        session.close()
+
+    return refreshed_amount
+
+
+def rebuild_list_daily_values(session_external: Optional[SessionT] = None):
+    """
+    Drop and recompute every list_daily_value row (e.g. to repair the table)
+
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: nothing
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    session.flush()
+    session.execute(delete(ListDailyValue))
+    session.execute(
+        insert(ListDailyValue).from_select(
+            ["list_id", "date", "price_total", "items_priced"], _aggregate_list_daily_values_query()
+        )
+    )
+    bump_data_version("list", session)
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.commit()
+        session.close()
@@ -16,12 +16,13 @@ class List(Base):
     __tablename__ = "list"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    steam_id = Column(Integer, primary_key=True)
+    steam_id = Column(Integer, nullable=False)
     name = Column(String(length=100), nullable=False)
     created_at = Column(Date, nullable=False)
     updated_at = Column(Date, nullable=False)
 
     list_items = relationship("ItemList", back_populates="list", cascade="all, delete-orphan")
+    list_daily_values = relationship("ListDailyValue", back_populates="list", cascade="all, delete-orphan")
 
 
 class Item(Base):
@@ -72,3 +73,39 @@ class ItemList(Base):
 
     list = relationship("List", back_populates="list_items", uselist=False)
     item = relationship("Item", back_populates="item_lists", uselist=False)
+
+
+class ListDailyValue(Base):
+    __bind_key__ = "sip"
+    __tablename__ = "list_daily_value"
+
+    list_id = Column(Integer, ForeignKey("list.id"), primary_key=True, autoincrement=False)
+    date = Column(Date, primary_key=True)
+    price_total = Column(Float, nullable=False)
+    items_priced = Column(Integer, nullable=False)
+
+    list = relationship("List", back_populates="list_daily_values", uselist=False)
+
+
+class PricingJob(Base):
+    __bind_key__ = "sip"
+    __tablename__ = "pricing_job"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    app_id = Column(Integer, nullable=False)
+    market_hash_name = Column(String(length=150), nullable=False)
+    currency = Column(String(length=3), nullable=False)
+    status = Column(String(length=10), nullable=False)  # one of PRICING_JOB_STATUSES
+    attempts = Column(Integer, nullable=False)
+    claim_token = Column(String(length=32), nullable=True)  # set by the worker holding the job
+    claim_expires_at = Column(Integer, nullable=True)  # timestamp after which a claimed job can be claimed again
+    created_at = Column(Integer, nullable=False)
+    finished_at = Column(Integer, nullable=True)
+
+
+class DataVersion(Base):
+    __bind_key__ = "sip"
+    __tablename__ = "data_version"
+
+    name = Column(String(length=50), primary_key=True)  # one of DATA_VERSION_NAMES
+    version = Column(Integer, nullable=False)  # increased by every transaction that changes that data
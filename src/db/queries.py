@@ -0,0 +1,370 @@
+#
+# database read queries
+#
+from datetime import date
+from typing import List as ListT
+from typing import Optional
+
+from sqlalchemy import Select, Subquery, func, select
+from sqlalchemy.orm.session import Session as SessionT
+
+from db import metadata
+from db.constants import ITEM_NAME_COLUMNS, ITEM_NAMES_CHUNK_SIZE
+from db.models import DataVersion, Item, ItemList, ItemPrice, List, ListDailyValue
+
+
+def get_list_daily_values(
+    list_id: int,
+    start_date: date,
+    end_date: date,
+    session_external: Optional[SessionT] = None,
+) -> ListT[dict]:
+    """
+    Get a list's total value of each day in a date range with a single aggregate query.
+    Each item price is multiplied by the item quantity currently in the list.
+    The item_price side is answered by idx__item_price__item_id__date__price_usd only (covering index).
+
+    :param list_id: list id to be valued
+    :param start_date: first date of the range (inclusive)
+    :param end_date: last date of the range (inclusive)
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: list of dicts ordered by date, where each dict has
+        :property date: price date
+        :property price_total: sum of each item price times its quantity on the list
+        :property items_priced: amount of list items with a price on the date
+        :property items_total: amount of items on the list
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # count list items on the same statement, to flag days with missing prices
+    items_total = select(func.count()).where(ItemList.list_id == list_id).scalar_subquery()
+    query = (
+        select(
+            ItemPrice.date,
+            func.sum(ItemPrice.price_usd * ItemList.quantity).label("price_total"),
+            func.count().label("items_priced"),
+            items_total.label("items_total"),
+        )
+        .select_from(ItemList)
+        .join(ItemPrice, ItemPrice.item_id == ItemList.item_id)
+        .where(ItemList.list_id == list_id, ItemPrice.date.between(start_date, end_date))
+        .group_by(ItemPrice.date)
+        .order_by(ItemPrice.date)
+    )
+    daily_values = [row._asdict() for row in session.execute(query)]
+
+    if not session_external:
+        session.close()
+
+    return daily_values
+
+
+def get_list_materialized_daily_values(
+    list_id: int,
+    start_date: date | None,
+    end_date: date,
+    session_external: Optional[SessionT] = None,
+) -> ListT[dict]:
+    """
+    Same as get_list_daily_values, but reading the precomputed list_daily_value rows
+
+    :param list_id: list id to be valued
+    :param start_date: first date of the range (inclusive). if None, the range starts at the list first value
+    :param end_date: last date of the range (inclusive)
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: list of dicts ordered by date, with the same properties as get_list_daily_values
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    items_total = select(func.count()).where(ItemList.list_id == list_id).scalar_subquery()
+    query = (
+        select(
+            ListDailyValue.date,
+            ListDailyValue.price_total,
+            ListDailyValue.items_priced,
+            items_total.label("items_total"),
+        )
+        .where(
+            ListDailyValue.list_id == list_id,
+            ListDailyValue.date <= end_date
+            if start_date is None
+            else ListDailyValue.date.between(start_date, end_date),
+        )
+        .order_by(ListDailyValue.date)
+    )
+    daily_values = [row._asdict() for row in session.execute(query)]
+
+    if not session_external:
+        session.close()
+
+    return daily_values
+
+
+def get_list_summary(
+    list_id: int,
+    start_date: date | None,
+    end_date: date,
+    usd_rate: float = 1.0,
+    session_external: Optional[SessionT] = None,
+) -> ListT[dict]:
+    """
+    Get a list's daily values formatted as the rows of the spreadsheets 'Summary' sheet.
+    Values are read from list_daily_value, so no aggregation runs on each request.
+
+    :param list_id: list id to be valued
+    :param start_date: first date of the range (inclusive). if None, the range starts at the list first value
+    :param end_date: last date of the range (inclusive)
+    :param usd_rate: amount of the summary currency that one USD buys (values are saved in USD)
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: list of dicts with price_date, price_total and api_error, ordered by date
+    """
+    daily_values = get_list_materialized_daily_values(list_id, start_date, end_date, session_external)
+    return [
+        {
+            "price_date": daily_value["date"].strftime("%Y-%m-%d"),
+            "price_total": daily_value["price_total"] * usd_rate,
+            "api_error": "yes" if daily_value["items_priced"] < daily_value["items_total"] else "no",
+        }
+        for daily_value in daily_values
+    ]
+
+
+def get_item_names(
+    market_hash_names: ListT[str],
+    language: str,
+    session_external: Optional[SessionT] = None,
+) -> dict[str, str]:
+    """
+    Get the known names of items in a language, in chunks of ITEM_NAMES_CHUNK_SIZE items
+
+    :param market_hash_names: items market_hash_name
+    :param language: names language (one of ITEM_NAME_COLUMNS)
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: map of market_hash_name to name, only for items with a name in that language
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    name_column = getattr(Item, ITEM_NAME_COLUMNS[language])
+    names = {}
+    for index in range(0, len(market_hash_names), ITEM_NAMES_CHUNK_SIZE):
+        query = select(Item.market_hash_name, name_column).where(
+            Item.market_hash_name.in_(market_hash_names[index : index + ITEM_NAMES_CHUNK_SIZE]),
+            name_column.is_not(None),
+        )
+        names.update({market_hash_name: name for market_hash_name, name in session.execute(query)})
+
+    if not session_external:
+        session.close()
+
+    return names
+
+
+def get_data_versions(session_external: Optional[SessionT] = None) -> dict[str, int]:
+    """
+    Get the current version of each versioned data (see db.data_version.bump_data_version)
+
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: map of versioned data name to its version
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    data_versions = {name: version for name, version in session.execute(select(DataVersion.name, DataVersion.version))}
+
+    if not session_external:
+        session.close()
+
+    return data_versions
+
+
+def _lists_query():
+    """
+    Build the query of lists with their amount of items
+
+    :returns: select statement, ordered by list id
+    """
+    return (
+        select(
+            List.id,
+            List.steam_id,
+            List.name,
+            List.created_at,
+            List.updated_at,
+            func.count(ItemList.id).label("items_total"),
+        )
+        .outerjoin(ItemList, ItemList.list_id == List.id)
+        .group_by(List.id, List.steam_id, List.name, List.created_at, List.updated_at)
+        .order_by(List.id)
+    )
+
+
+def get_lists(session_external: Optional[SessionT] = None) -> ListT[dict]:
+    """
+    Get all lists with their amount of items
+
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: list of dicts ordered by id, where each dict has
+        :property id: list id
+        :property steam_id: steam identifier that holds the list
+        :property name: list name
+        :property created_at: list creation date
+        :property updated_at: list last update date
+        :property items_total: amount of items on the list
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    lists = [row._asdict() for row in session.execute(_lists_query())]
+
+    if not session_external:
+        session.close()
+
+    return lists
+
+
+def get_list(list_id: int, session_external: Optional[SessionT] = None) -> dict | None:
+    """
+    Get a list with its amount of items
+
+    :param list_id: list id
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: list dict (see get_lists), or None if the list doesn't exist
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    row = session.execute(_lists_query().where(List.id == list_id)).first()
+
+    if not session_external:
+        session.close()
+
+    return row._asdict() if row is not None else None
+
+
+def _get_items_latest_price_query(item_ids: ListT[str] | Select) -> Subquery:
+    """
+    Build the query of items latest price (item id, date and price), answered by the item_price covering index
+
+    :param item_ids: item ids (market_hash_name), as a list or a select of item ids
+
+    :returns: subquery with item_id, date and price_usd columns
+    """
+    latest_dates = (
+        select(ItemPrice.item_id, func.max(ItemPrice.date).label("date"))
+        .where(ItemPrice.item_id.in_(item_ids))
+        .group_by(ItemPrice.item_id)
+        .subquery()
+    )
+    return (
+        select(ItemPrice.item_id, ItemPrice.date, ItemPrice.price_usd)
+        .join(latest_dates, (ItemPrice.item_id == latest_dates.c.item_id) & (ItemPrice.date == latest_dates.c.date))
+        .subquery()
+    )
+
+
+def get_list_items_latest_price(
+    list_id: int,
+    session_external: Optional[SessionT] = None,
+) -> ListT[dict]:
+    """
+    Get a list's items with their quantity and latest price
+
+    :param list_id: list id
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: list of dicts ordered by app id and market_hash_name, where each dict has
+        :property market_hash_name: item market_hash_name
+        :property app_id: app id of the app (game) that the item belongs to
+        :property name_en: item name in english (None if unknown)
+        :property name_pt: item name in portuguese (None if unknown)
+        :property quantity: amount of item in the list
+        :property price_usd: item latest price in USD (None if it has no price)
+        :property price_date: date of the latest price (None if it has no price)
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    latest_prices = _get_items_latest_price_query(select(ItemList.item_id).where(ItemList.list_id == list_id))
+    query = (
+        select(
+            Item.market_hash_name,
+            Item.app_id,
+            Item.name_en,
+            Item.name_pt,
+            ItemList.quantity,
+            latest_prices.c.price_usd,
+            latest_prices.c.date.label("price_date"),
+        )
+        .select_from(ItemList)
+        .join(Item, Item.market_hash_name == ItemList.item_id)
+        .outerjoin(latest_prices, latest_prices.c.item_id == ItemList.item_id)
+        .where(ItemList.list_id == list_id)
+        .order_by(Item.app_id, Item.market_hash_name)
+    )
+    list_items = [row._asdict() for row in session.execute(query)]
+
+    if not session_external:
+        session.close()
+
+    return list_items
+
+
+def get_items_latest_price(
+    market_hash_names: ListT[str],
+    session_external: Optional[SessionT] = None,
+) -> dict[str, dict]:
+    """
+    Get items latest price, in chunks of ITEM_NAMES_CHUNK_SIZE items
+
+    :param market_hash_names: items market_hash_name
+    :param session_external: input session. if provided, it is not closed
+
+    :returns: map of market_hash_name to a dict with price_usd and price_date, only for items with a price
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    latest_prices = {}
+    for index in range(0, len(market_hash_names), ITEM_NAMES_CHUNK_SIZE):
+        subquery = _get_items_latest_price_query(market_hash_names[index : index + ITEM_NAMES_CHUNK_SIZE])
+        for item_id, price_date, price_usd in session.execute(select(subquery)):
+            latest_prices[item_id] = {"price_usd": price_usd, "price_date": price_date}
+
+    if not session_external:
+        session.close()
+
+    return latest_prices
@@ -0,0 +1,230 @@
+#
+# item_price retention
+# keep full resolution for recent prices and downsample older ones to weekly/monthly medians
+#
+from collections import defaultdict
+from datetime import date, timedelta
+from statistics import median
+from typing import List as ListT
+from typing import Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm.session import Session as SessionT
+
+from db import metadata
+from db.constants import FULL_RESOLUTION_DAYS, WEEKLY_RESOLUTION_DAYS
+from db.data_version import bump_data_version
+from db.list_daily_value import refresh_list_daily_values_for_prices
+from db.models import ItemPrice
+from db.utils import upsert_item_prices
+
+# amount of items downsampled (and commited) at once
+DOWNSAMPLE_ITEMS_CHUNK_SIZE = 200
+
+# first year with prices. item_price partitions start at it (MySQL only)
+FIRST_PARTITION_YEAR = 2022
+
+
+def get_period_start(price_date: date, granularity: str) -> date:
+    """
+    Get the first date of the period that contains a date
+
+    :param price_date: date to get its period
+    :param granularity: period size. Either "week" (starting on monday) or "month"
+
+    :returns: first date of the period
+    """
+    if granularity == "week":
+        return price_date - timedelta(days=price_date.weekday())
+    if granularity == "month":
+        return price_date.replace(day=1)
+    raise ValueError(f"Invalid granularity {granularity}. Choose either 'week' or 'month'")
+
+
+def _downsample_items_prices(
+    item_prices: ListT[ItemPrice], granularity: str, start_date: date | None = None
+) -> tuple[list[dict], list[dict]]:
+    """
+    Group item prices by item and period, keeping one price (the median) per period
+
+    :param item_prices: item prices ORM objects
+    :param granularity: period size. Either "week" or "month"
+    :param start_date: periods starting before this date are truncated to start on it
+
+    :returns: prices to be dropped and prices to be inserted (as dicts with id, item_id, date, price_usd)
+    """
+    periods: dict[tuple[str, date], list[ItemPrice]] = defaultdict(list)
+    for item_price in item_prices:
+        period_start = get_period_start(item_price.date, granularity)
+        if start_date is not None:
+            period_start = max(period_start, start_date)
+        periods[(item_price.item_id, period_start)].append(item_price)
+
+    dropped_prices, downsampled_prices = [], []
+    for (item_id, period_start), period_prices in periods.items():
+        # period already downsampled -> nothing to do
+        if len(period_prices) == 1 and period_prices[0].date == period_start:
+            continue
+        dropped_prices.extend(
+            {"id": price.id, "item_id": price.item_id, "date": price.date, "price_usd": price.price_usd}
+            for price in period_prices
+        )
+        downsampled_prices.append(
+            {
+                "item_id": item_id,
+                "date": period_start,
+                "price_usd": median(price.price_usd for price in period_prices),
+            }
+        )
+    return dropped_prices, downsampled_prices
+
+
+def downsample_item_prices(
+    start_date: date | None,
+    end_date: date,
+    granularity: str,
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Replace item prices in a date range by one row per item and period, dated on the period's first day.
+    The range end is aligned to whole periods, so the most recent period is never half downsampled.
+    A period that starts before the range start is truncated (and dated) to the range start, so the rows
+    before it are left untouched.
+    Items are processed (and commited, if no session is provided) in chunks, to keep memory bounded.
+
+    :param start_date: first date of the range (inclusive). if not provided, start from the oldest price
+    :param end_date: last date of the range (exclusive)
+    :param granularity: period size. Either "week" or "month"
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of dropped item price rows
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # align range end to whole periods
+    end_date = get_period_start(end_date, granularity)
+    date_filters = [ItemPrice.date < end_date]
+    if start_date is not None:
+        date_filters.append(ItemPrice.date >= start_date)
+
+    item_ids = list(session.scalars(select(ItemPrice.item_id).where(*date_filters).distinct()))
+    dropped_amount = 0
+    for index in range(0, len(item_ids), DOWNSAMPLE_ITEMS_CHUNK_SIZE):
+        item_ids_chunk = item_ids[index : index + DOWNSAMPLE_ITEMS_CHUNK_SIZE]
+        item_prices = session.scalars(select(ItemPrice).where(ItemPrice.item_id.in_(item_ids_chunk), *date_filters))
+        dropped_prices, downsampled_prices = _downsample_items_prices(list(item_prices), granularity, start_date)
+        if not dropped_prices:
+            continue
+
+        # replace prices and refresh list values of the dropped dates
+        # (the downsampled dates are refreshed by upsert_item_prices)
+        dropped_ids = [price["id"] for price in dropped_prices]
+        for ids_index in range(0, len(dropped_ids), DOWNSAMPLE_ITEMS_CHUNK_SIZE):
+            session.execute(
+                delete(ItemPrice).where(
+                    ItemPrice.id.in_(dropped_ids[ids_index : ids_index + DOWNSAMPLE_ITEMS_CHUNK_SIZE])
+                )
+            )
+        upsert_item_prices(downsampled_prices, session)
+        refresh_list_daily_values_for_prices(dropped_prices, session)
+        bump_data_version("item_price", session)
+        bump_data_version("list", session)
+        session.expunge_all()
+        dropped_amount += len(dropped_prices)
+
+        # persist changes of each chunk
+        if not session_external:
+            session.commit()
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.close()
+
+    return dropped_amount
+
+
+def apply_retention_policy(
+    today: date | None = None,
+    full_resolution_days: int = FULL_RESOLUTION_DAYS,
+    weekly_resolution_days: int = WEEKLY_RESOLUTION_DAYS,
+) -> dict[str, int]:
+    """
+    Apply the item_price retention policy:
+    - prices from the last full_resolution_days are kept untouched
+    - prices up to weekly_resolution_days old are downsampled to weekly medians
+    - older prices are downsampled to monthly medians
+
+    :param today: reference date. defaults to today
+    :param full_resolution_days: amount of days with full resolution prices
+    :param weekly_resolution_days: amount of days with at least weekly resolution prices
+
+    :returns: amount of dropped rows by granularity
+    """
+    # NOTE: the weekly range starts on the (month aligned) end of the monthly range, so no date is left behind
+    #       and no weekly row is dated inside the monthly range
+    today = today or date.today()
+    weekly_end_date = today - timedelta(days=full_resolution_days)
+    monthly_end_date = get_period_start(today - timedelta(days=weekly_resolution_days), "month")
+    return {
+        "month": downsample_item_prices(None, monthly_end_date, "month"),
+        "week": downsample_item_prices(monthly_end_date, weekly_end_date, "week"),
+    }
+
+
+def add_item_price_partitions(until_year: int):
+    """
+    Split item_price's catch-all partition (pmax) into yearly partitions up to the given year.
+    Only MySQL supports range partitioning, so it does nothing on other backends.
+
+    :param until_year: last year to have its own partition
+
+    :returns: nothing
+    """
+    if metadata.sip_engine.dialect.name != "mysql":
+        return
+
+    with metadata.sip_engine.connect() as connection:
+        existing_partitions = set(
+            connection.scalars(
+                text(
+                    "SELECT partition_name FROM information_schema.partitions "
+                    "WHERE table_schema = DATABASE() AND table_name = 'item_price'"
+                )
+            )
+        )
+        new_partitions = [
+            f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')"
+            for year in range(FIRST_PARTITION_YEAR, until_year + 1)
+            if f"p{year}" not in existing_partitions
+        ]
+        if new_partitions:
+            connection.execute(
+                text(
+                    "ALTER TABLE item_price REORGANIZE PARTITION pmax INTO "
+                    f"({', '.join(new_partitions)}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+                )
+            )
+
+
+def compact_item_prices(until_year: int):
+    """
+    Reclaim the space freed by downsampling.
+    On MySQL, rebuild each yearly partition up to the given year (recent partitions are left alone).
+    On SQLite, vacuum the database file.
+
+    :param until_year: last year to have its partition rebuilt (MySQL only)
+
+    :returns: nothing
+    """
+    with metadata.sip_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if metadata.sip_engine.dialect.name == "mysql":
+            partitions = ", ".join(f"p{year}" for year in range(FIRST_PARTITION_YEAR, until_year + 1))
+            connection.execute(text(f"ALTER TABLE item_price REBUILD PARTITION {partitions}"))
+        elif metadata.sip_engine.dialect.name == "sqlite":
+            connection.execute(text("VACUUM"))
@@ -0,0 +1,43 @@
+#
+# sqlite backend settings
+#
+
+# pragmas applied to every new SQLite connection
+# - WAL lets readers run while a writer is active and turns each commit into a sequential append
+# - NORMAL synchronous is durable in WAL mode (only the last commits may be lost on power failure)
+# - foreign_keys is off by default on SQLite, and migrations rely on 'ON DELETE CASCADE'
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": -64000,  # negative values are KiB -> 64MB page cache
+    "mmap_size": 268435456,  # 256MB
+    "busy_timeout": 5000,  # ms to wait on a locked database before failing
+}
+
+
+def is_sqlite_url(url: str) -> bool:
+    """
+    Check if a database url points to a SQLite database
+
+    :param url: database url
+
+    :returns: True if it is a SQLite url
+    """
+    return url.startswith("sqlite")
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply SQLITE_PRAGMAS to a freshly opened SQLite connection
+
+    :param dbapi_connection: raw sqlite3 connection
+    :param connection_record: pool connection record (unused)
+
+    :returns: nothing
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
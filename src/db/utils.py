@@ -5,10 +5,15 @@ from datetime import date
 from typing import List as ListT
 from typing import Optional
 
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm.session import Session as SessionT
 
-from db.metadata import sip_sessionmaker
-from db.models import Item, ItemList, List
+from db import metadata
+from db.constants import ITEM_NAME_COLUMNS, ITEM_NAMES_CHUNK_SIZE
+from db.data_version import bump_data_version
+from db.list_daily_value import refresh_list_daily_values_for_list_items, refresh_list_daily_values_for_prices
+from db.models import Item, ItemList, ItemPrice, List
 
 
 def create_list(
@@ -29,11 +34,12 @@ def create_list(
     if session_external:
         session = session_external
     else:
-        session = sip_sessionmaker()
+        session = metadata.sip_sessionmaker()
 
     # create list ORM
     list = List(name=name, steam_id=steam_id, created_at=date.today(), updated_at=date.today())
     session.add(list)
+    bump_data_version("list", session)
 
     # persist changes
     if session_external:
@@ -64,7 +70,7 @@ def create_items(
     if session_external:
         session = session_external
     else:
-        session = sip_sessionmaker()
+        session = metadata.sip_sessionmaker()
 
     # search for existent item names
     item_input_names = [item["market_hash_name"] for item in items_input]
@@ -95,6 +101,64 @@ def create_items(
     return items
 
 
+def save_item_names(
+    items_input: ListT[dict],
+    language: str,
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Set the name of items in a language, creating the items that don't exist yet.
+    Items that already have that name are left untouched.
+
+    :param items_input: list with dict of items, where each dict must have
+        :property market_hash_name: item name, which is its id
+        :property app_id: app id of the app (game) that the item belongs to
+        :property name: item name in the given language
+    :param language: names language (one of ITEM_NAME_COLUMNS)
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of created or updated items
+    """
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # search for existent items, in chunks to keep the IN clauses small
+    name_column = ITEM_NAME_COLUMNS[language]
+    item_input_names = list({item["market_hash_name"] for item in items_input})
+    existing_items: dict[str, Item] = {}
+    for index in range(0, len(item_input_names), ITEM_NAMES_CHUNK_SIZE):
+        chunk = item_input_names[index : index + ITEM_NAMES_CHUNK_SIZE]
+        existing_items.update(
+            {item.market_hash_name: item for item in session.query(Item).filter(Item.market_hash_name.in_(chunk))}
+        )
+
+    # update names that changed (or were never set) and create new items
+    saved_items = 0
+    for item_input in items_input:
+        item = existing_items.get(item_input["market_hash_name"])
+        if item is None:
+            item = Item(market_hash_name=item_input["market_hash_name"], app_id=item_input["app_id"])
+            existing_items[item.market_hash_name] = item
+            session.add(item)
+        elif getattr(item, name_column) == item_input["name"]:
+            continue
+        # NOTE: names will be updated by calling session.commit() call
+        setattr(item, name_column, item_input["name"])
+        saved_items += 1
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.commit()
+        session.close()
+
+    return saved_items
+
+
 def update_list_items(
     list_id: int,
     items: ListT[dict],
@@ -105,6 +169,7 @@ def update_list_items(
     Skip items alredy binded to list.
     Remvoe items on the list but not provided as input.
     Update items quantity on item already on list but with input amount different from list
+    Refresh list_daily_value rows of the dates where added, removed or updated items have prices
 
     :param list_id: list id which items should be added to
     :param items: items list of dict to be binded to the provided list id
@@ -118,13 +183,14 @@ def update_list_items(
     if session_external:
         session = session_external
     else:
-        session = sip_sessionmaker()
+        session = metadata.sip_sessionmaker()
 
     # search for existent, updated and removed items from list
     # NOTE: we could sort items (db and input) and traverse with two pointers
     #       to make this O(n log(n)) instead of O(n^2)
-    list_items = session.query(ItemList.item_id).filter(ItemList.list_id == list_id)
+    list_items = session.query(ItemList).filter(ItemList.list_id == list_id).all()
     final_db_items = []
+    changed_item_ids = []
     for list_item in list_items:
         # check if list_item (db) exists in items (input) and check if quantity is updated
         existent_or_updated_item = False
@@ -133,6 +199,7 @@ def update_list_items(
                 if list_item.quantity != item["quantity"]:
                     # NOTE: quantity will be updated by calling session.commit() call
                     list_item.quantity = item["quantity"]
+                    changed_item_ids.append(list_item.item_id)
                 existent_or_updated_item = True
                 final_db_items.append(list_item)
                 break
@@ -140,6 +207,7 @@ def update_list_items(
         # list_item (db) not found in items (input) -> drop list_item
         if not existent_or_updated_item:
             session.delete(list_item)
+            changed_item_ids.append(list_item.item_id)
 
     # create list items ORM only for new list items
     existing_item_ids = [list_item.item_id for list_item in list_items]
@@ -152,6 +220,12 @@ def update_list_items(
             )
             session.add(list_item)
             final_db_items.append(list_item)
+            changed_item_ids.append(list_item.item_id)
+
+    # keep the materialized list values in sync with the list changes
+    refresh_list_daily_values_for_list_items(list_id, changed_item_ids, session)
+    if changed_item_ids:
+        bump_data_version("list", session)
 
     # persist changes
     if session_external:
@@ -161,3 +235,56 @@ def update_list_items(
         session.close()
 
     return final_db_items
+
+
+def upsert_item_prices(
+    item_prices: ListT[dict],
+    session_external: Optional[SessionT] = None,
+) -> int:
+    """
+    Bulk insert item prices, overwriting the price of (item, date) pairs that already exist.
+    All rows are sent as a single executemany statement, instead of one ORM object per price.
+    Also refresh the list_daily_value rows of the lists holding the priced items on the priced dates.
+
+    :param item_prices: list with dict of item prices, where each dict must have
+        :property item_id: item id (market_hash_name)
+        :property date: price date
+        :property price_usd: item price in USD
+    :param session_external: input session. if provided, session is flushed, and not commited
+
+    :returns: amount of provided prices
+    """
+    if not item_prices:
+        return 0
+
+    # set session based if external sessions has been provided or not
+    if session_external:
+        session = session_external
+    else:
+        session = metadata.sip_sessionmaker()
+
+    # build the upsert statement of the session's backend
+    item_price_table = ItemPrice.__table__
+    if session.get_bind().dialect.name == "sqlite":
+        statement = sqlite_insert(item_price_table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["item_id", "date"],
+            set_={"price_usd": statement.excluded.price_usd},
+        )
+    else:
+        statement = mysql_insert(item_price_table)
+        statement = statement.on_duplicate_key_update(price_usd=statement.inserted.price_usd)
+    session.execute(statement, item_prices)
+
+    # keep the materialized list values in sync with the new prices
+    refresh_list_daily_values_for_prices(item_prices, session)
+    bump_data_version("item_price", session)
+
+    # persist changes
+    if session_external:
+        session.flush()
+    else:
+        session.commit()
+        session.close()
+
+    return len(item_prices)
@@ -0,0 +1,3 @@
+"""
+Run diagnostics (e.g. stage profiling), enabled from the command line
+"""
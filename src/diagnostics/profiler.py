@@ -0,0 +1,188 @@
+import argparse
+import cProfile
+import functools
+import json
+import sys
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from time import perf_counter, process_time
+from typing import Callable, ContextManager, Iterator
+
+# profiler of the current run, if profiling is enabled (see profiled)
+_active_profiler: "StageProfiler | None" = None
+
+
+class StageCall:
+    def __init__(self, name: str, memory: int):
+        self.name = name
+        self.start_wall = perf_counter()
+        self.start_cpu = process_time()
+        self.start_memory = memory
+        self.peak_memory = memory
+
+
+class StageProfiler:
+    """
+    Record wall time, CPU time and (optionally) peak traced memory of each run stage.
+    Stages may be nested or, in async code, overlap: each one is measured while it is open, so the time of
+    concurrent calls of a stage is summed (and the CPU time of overlapping stages is counted on each of them).
+    """
+
+    def __init__(self, trace_memory: bool = False, cprofile_file: str | None = None):
+        self.trace_memory = trace_memory
+        self.cprofile_file = cprofile_file
+        self.cprofile = cProfile.Profile() if cprofile_file else None
+        self.stages: dict[str, dict] = {}
+        self.open_calls: list[StageCall] = []
+        self.started_at = datetime.now()
+        self.start_wall = perf_counter()
+        self.start_cpu = process_time()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory = 0
+
+    def start(self):
+        """
+        Start measuring the run
+
+        :returns: nothing
+        """
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        self.start_wall = perf_counter()
+        self.start_cpu = process_time()
+
+    def stop(self):
+        """
+        Stop measuring the run, writing the cProfile dump (if enabled)
+
+        :returns: nothing
+        """
+        self.wall_seconds = perf_counter() - self.start_wall
+        self.cpu_seconds = process_time() - self.start_cpu
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_file)
+        if self.trace_memory:
+            self._fold_peak_memory()
+            tracemalloc.stop()
+
+    def _fold_peak_memory(self) -> int:
+        """
+        Add the traced memory peak since the last call to every open stage, and restart the peak
+
+        :returns: current traced memory
+        """
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        for call in self.open_calls:
+            call.peak_memory = max(call.peak_memory, peak_memory)
+        self.peak_memory = max(self.peak_memory, peak_memory)
+        tracemalloc.reset_peak()
+        return current_memory
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Measure a stage of the run
+
+        :param name: stage name (e.g. "steam.inventory.request")
+
+        :returns: context manager
+        """
+        call = StageCall(name, self._fold_peak_memory() if self.trace_memory else 0)
+        self.open_calls.append(call)
+        try:
+            yield
+        finally:
+            if self.trace_memory:
+                self._fold_peak_memory()
+            self.open_calls.remove(call)
+            stage = self.stages.setdefault(
+                name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_mb": None}
+            )
+            stage["calls"] += 1
+            stage["wall_seconds"] += perf_counter() - call.start_wall
+            stage["cpu_seconds"] += process_time() - call.start_cpu
+            if self.trace_memory:
+                stage["peak_memory_mb"] = max(stage["peak_memory_mb"] or 0, call.peak_memory / 2**20)
+
+    def get_report(self) -> dict:
+        """
+        Get the run report: totals and each stage measures, slowest stages first
+
+        :returns: report
+        """
+        stages = sorted(self.stages.items(), key=lambda stage: stage[1]["wall_seconds"], reverse=True)
+        return {
+            "argv": sys.argv,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "peak_memory_mb": round(self.peak_memory / 2**20, 2) if self.trace_memory else None,
+            "cprofile_file": self.cprofile_file,
+            "stages": {
+                name: stage
+                | {
+                    "wall_seconds": round(stage["wall_seconds"], 4),
+                    "cpu_seconds": round(stage["cpu_seconds"], 4),
+                    "peak_memory_mb": round(stage["peak_memory_mb"], 2) if self.trace_memory else None,
+                }
+                for name, stage in stages
+            },
+        }
+
+    def write_report(self, path: str):
+        """
+        Write the run report to a json file
+
+        :param path: report file path
+
+        :returns: nothing
+        """
+        with open(path, "w") as report_file:
+            json.dump(self.get_report(), report_file, indent=2)
+
+
+def profile_stage(name: str) -> ContextManager[None]:
+    """
+    Measure a stage of the run, if profiling is enabled (otherwise, it does nothing)
+
+    :param name: stage name
+
+    :returns: context manager
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.stage(name)
+
+
+def profiled(run: Callable[[argparse.Namespace], None]) -> Callable[[argparse.Namespace], None]:
+    """
+    Decorate a script run function, so it is profiled when the --profile argument is provided
+    (see scripts.arguments.add_profile_arguments)
+
+    :param run: script run function
+
+    :returns: decorated run function
+    """
+
+    @functools.wraps(run)
+    def profiled_run(args: argparse.Namespace):
+        global _active_profiler
+        if not getattr(args, "profile", None):
+            return run(args)
+
+        _active_profiler = StageProfiler(args.profile_memory, args.profile_cprofile)
+        _active_profiler.start()
+        try:
+            return run(args)
+        finally:
+            _active_profiler.stop()
+            _active_profiler.write_report(args.profile)
+            print(f"Profile report written to {args.profile}")
+            _active_profiler = None
+
+    return profiled_run
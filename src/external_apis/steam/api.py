@@ -1,12 +1,108 @@
-from httpx import AsyncClient, Timeout
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
-from external_apis.steam.constants import REQUEST_TIMEOUT
+from httpx import AsyncClient, Limits
+
+from external_apis.steam.constants import ITEM_NAMEIDS_FILE, REQUEST_AWAIT_INTERVAL
+from external_apis.steam.egress import EgressConfig, EgressPool, load_egress_configs
 from external_apis.steam.inventory import SteamInventoryAPI
+from external_apis.steam.item_nameids import ItemNameIdIndex
 from external_apis.steam.items import SteamItemsAPI
+from external_apis.steam.transport import TransportMetrics, create_steam_client
+
+# json file with a list of egresses (see EgressConfig) to spread requests across. if not set, one client is used
+SIP_STEAM_EGRESSES_FILE = os.environ.get("SIP_STEAM_EGRESSES_FILE")
+
+# json file where item_nameids are recorded (see ItemNameIdIndex)
+SIP_STEAM_ITEM_NAMEIDS_FILE = os.environ.get("SIP_STEAM_ITEM_NAMEIDS_FILE", ITEM_NAMEIDS_FILE)
+
+# pool to parse listing pages on: "process" (scales with cores), "thread" or not set (parsed on the event loop)
+SIP_STEAM_PARSE_POOL = os.environ.get("SIP_STEAM_PARSE_POOL")
+SIP_STEAM_PARSE_WORKERS = int(os.environ.get("SIP_STEAM_PARSE_WORKERS", 0)) or None  # default: one per core
+
+
+def create_parse_executor(pool: str | None, workers: int | None = None) -> Executor | None:
+    """
+    Create the pool listing pages are parsed on
+
+    :param pool: "process", "thread" or None (no pool)
+    :param workers: amount of workers. if None, one per core
+
+    :returns: pool, or None if no pool is used
+    """
+    if pool is None:
+        return None
+    if pool == "process":
+        return ProcessPoolExecutor(workers)
+    if pool == "thread":
+        return ThreadPoolExecutor(workers or os.cpu_count())
+    raise ValueError(f"Invalid parse pool '{pool}', choose either 'process' or 'thread'")
 
 
 class SteamAPI:
-    def __init__(self, session: AsyncClient | None = None):
-        self.session = session or AsyncClient(timeout=Timeout(REQUEST_TIMEOUT))
+    """
+    Steam inventory and items APIs sharing one http session. Use it as an async context manager
+    (or call aclose) so pooled connections are closed:
+
+        async with SteamAPI() as steam_api:
+            ...
+    """
+
+    def __init__(
+        self,
+        session: AsyncClient | None = None,
+        egresses: list[EgressConfig] | None = None,
+        limits: Limits | None = None,
+        http2: bool = True,
+        item_nameids: ItemNameIdIndex | None = None,
+        parse_executor: Executor | None = None,
+    ):
+        if egresses is None and session is None and SIP_STEAM_EGRESSES_FILE:
+            egresses = load_egress_configs(SIP_STEAM_EGRESSES_FILE)
+
+        # metrics are only collected on sessions created here
+        self.metrics = TransportMetrics()
+        if egresses:
+            self.session = EgressPool(egresses, limits, http2, self.metrics)
+            self.request_interval = self.session.request_interval
+            self.concurrency = len(egresses)
+        else:
+            self.session = session or create_steam_client(limits=limits, http2=http2, metrics=self.metrics)
+            self.request_interval = REQUEST_AWAIT_INTERVAL
+            self.concurrency = 1
+
         self.inventory = SteamInventoryAPI(self.session)
-        self.items = SteamItemsAPI(self.session)
+        if item_nameids is None:
+            item_nameids = ItemNameIdIndex.load(SIP_STEAM_ITEM_NAMEIDS_FILE)
+        self.item_nameids = item_nameids
+        # pools created here are shut down on aclose
+        self.owns_parse_executor = parse_executor is None
+        if parse_executor is None:
+            parse_executor = create_parse_executor(SIP_STEAM_PARSE_POOL, SIP_STEAM_PARSE_WORKERS)
+        self.parse_executor = parse_executor
+        self.items = SteamItemsAPI(self.session, self.request_interval, self.item_nameids, self.parse_executor)
+
+    async def __aenter__(self) -> "SteamAPI":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def get_egresses_status(self) -> list[dict]:
+        """
+        Get each egress status (requests, throttles, errors and whether it is ejected)
+
+        :returns: list of status dicts. empty if egresses are not used
+        """
+        return self.session.get_status() if isinstance(self.session, EgressPool) else []
+
+    async def aclose(self):
+        """
+        Close the http session (and its open connections) and the parse pool, saving new item_nameids
+
+        :returns: nothing
+        """
+        self.item_nameids.save()
+        await self.session.aclose()
+        if self.parse_executor is not None and self.owns_parse_executor:
+            self.parse_executor.shutdown(wait=False, cancel_futures=True)
@@ -9,13 +9,38 @@ ITEM_PRICE_HISTORY_URL = (
     BASE_URL + "/market/pricehistory/?appid={app_id}&currency={currency}&market_hash_name={market_hash_name}"
 )
 ITEM_PRICE_MARKET_HMTL_URL = BASE_URL + "/market/listings/{app_id}/{market_hash_name}"
+ITEM_ORDERS_HISTOGRAM_URL = (
+    BASE_URL + "/market/itemordershistogram?country=US&language=english&currency={currency}&item_nameid={item_nameid}"
+)
+MARKET_SEARCH_URL = (
+    BASE_URL
+    + "/market/search/render/?appid={app_id}&query={query}&start={start}&count={count}&currency={currency}"
+    + "&search_descriptions=0&sort_column=name&sort_dir=asc&norender=1"
+)
+
+# max amount of items (and their prices) per market search page
+MARKET_SEARCH_PAGE_SIZE = 100
 
 CURRENCIES = {
+    "AUD": 21,
     "BRL": 7,
+    "CAD": 20,
+    "CHF": 4,
+    "CNY": 23,
     "EUR": 3,
+    "GBP": 2,
+    "JPY": 8,
     "USD": 1,
 }
 
+# market_hash_name -> item_nameid index, filled in whenever an item listing page is requested
+ITEM_NAMEIDS_FILE = "item_nameids.json"
+# new item_nameids recorded between two saves of the index (it is also saved when the steam api is closed)
+ITEM_NAMEIDS_SAVE_EVERY = 50
+
+# each user app inventory snapshot (asset by asset) is stored here, to diff inventories between runs
+INVENTORY_SNAPSHOTS_DIR = "inventory_snapshots"
+
 REQUEST_TIMEOUT = 30
 
 REQUEST_AWAIT_INTERVAL = 12
@@ -16,3 +16,17 @@ class SteamItemsAPIException(Exception):
 
     def log(self):
         print(self.message)
+
+
+class SteamMarketSearchAPIException(Exception):
+    def __init__(self, app_id: int, query: str, status_code: str):
+        self.app_id = app_id
+        self.query = query
+        self.status_code = status_code
+        self.message = (
+            f"Error searching market prices of app {self.app_id} (query '{self.query}') - Status: {self.status_code}"
+        )
+        super().__init__(self.message)
+
+    def log(self):
+        print(self.message)
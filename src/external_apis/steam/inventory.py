@@ -1,9 +1,13 @@
 from copy import deepcopy
+from time import time
+from typing import Callable
 
 from httpx import AsyncClient
 
+from diagnostics.profiler import profile_stage
 from external_apis.steam.constants import USER_INVENTOR_URL
 from external_apis.steam.models import Inventory, InventoryAsset, InventoryDescription
+from external_apis.steam.snapshots import InventorySnapshot, SnapshotAsset, SnapshotItem
 from models.items import Item
 
 
@@ -38,6 +42,7 @@ class SteamInventoryAPI:
                 app_id=item.app_id,  # game code that has the item
                 market_hash_name=item.market_hash_name,  # item 'id' to requst price later
                 name=item.market_name,  # item human friendly name
+                commodity=item.commodity == 1,  # commodity items are priced alike (e.g. with orders histogram)
             )
         return formatted_items
 
@@ -76,8 +81,59 @@ class SteamInventoryAPI:
                 items_with_amount[market_hash_hame].amount += int(inventory_asset.amount)
         return items_with_amount
 
-    async def get_user_app_indexed_items(
+    async def _get_user_app_inventory(self, steam_user_id: int, app_id: int, language: str) -> Inventory:
+        """
+        Request a user's app inventory
+
+        :param steam_user_id: steam user id
+        :param app_id: app id
+        :param language: which language we should display the item names in the output sheet
+
+        :returns: user's app inventory
+        """
+        url = USER_INVENTOR_URL.format(steam_user_id=steam_user_id, app_id=app_id, language=language)
+        with profile_stage("steam.inventory.request"):
+            response = await self.session.get(url)
+        assert response.status_code == 200
+        with profile_stage("steam.inventory.validate"):
+            return Inventory.model_validate(response.json())
+
+    async def get_user_app_snapshot(
         self, steam_user_id: int, app_id: int, language: str = "english"
+    ) -> InventorySnapshot:
+        """
+        Get a snapshot of a user's marketable assets for a given app, to be diffed against later snapshots
+
+        :param steam_user_id: steam user id
+        :param app_id: app id
+        :param language: which language we should display the item names in the output sheet
+
+        :returns: user's app inventory snapshot
+        """
+        user_inventory = await self._get_user_app_inventory(steam_user_id, app_id, language)
+        marketable_items = self._filter_marketable_items(user_inventory.descriptions)
+        class_id_to_item = {
+            item.class_id: SnapshotItem(market_hash_name=item.market_hash_name, name=item.market_name)
+            for item in marketable_items
+        }
+        return InventorySnapshot(
+            steam_id=steam_user_id,
+            app_id=app_id,
+            taken_at=int(time()),
+            assets=[
+                SnapshotAsset(asset_id=asset.asset_id, class_id=asset.class_id, amount=asset.amount)
+                for asset in user_inventory.assets
+                if asset.class_id in class_id_to_item
+            ],
+            class_id_to_item=class_id_to_item,
+        )
+
+    async def get_user_app_indexed_items(
+        self,
+        steam_user_id: int,
+        app_id: int,
+        language: str = "english",
+        description_filter: Callable[[InventoryDescription], bool] | None = None,
     ) -> dict[str, Item]:
         """
         Get all user's marketable items for a given app indexed by its hash name
@@ -85,17 +141,27 @@ class SteamInventoryAPI:
         :param steam_user_id: steam user id
         :param app_id: app id
         :param language: which language we should display the item names in the output sheet
+        :param description_filter: if provided, only items it accepts are kept (e.g. SelectionRules.is_selected)
 
         :returns: user's marketable app's items indexed by its hash name
         """
-        # request items
-        url = USER_INVENTOR_URL.format(steam_user_id=steam_user_id, app_id=app_id, language=language)
-        response = await self.session.get(url)
-        assert response.status_code == 200
-        user_inventory = Inventory.model_validate(response.json())
+        user_inventory = await self._get_user_app_inventory(steam_user_id, app_id, language)
+        return self.index_marketable_items(user_inventory, description_filter)
+
+    def index_marketable_items(
+        self, user_inventory: Inventory, description_filter: Callable[[InventoryDescription], bool] | None = None
+    ) -> dict[str, Item]:
+        """
+        Get an inventory marketable items (with their amount) indexed by its hash name
+
+        :param user_inventory: user's app inventory
+        :param description_filter: if provided, only items it accepts are kept (e.g. SelectionRules.is_selected)
 
-        # format items
+        :returns: marketable items indexed by its hash name
+        """
         marketable_items = self._filter_marketable_items(user_inventory.descriptions)
+        if description_filter is not None:
+            marketable_items = list(filter(description_filter, marketable_items))
         item_class_id_to_market_hash_name = self._map_item_class_id_to_market_hash_name(marketable_items)
         formatted_marketable_items = self._format_marketable_items(marketable_items)
         items_with_amount = self._compute_items_amount(
@@ -104,15 +170,22 @@ class SteamInventoryAPI:
 
         return items_with_amount
 
-    async def get_user_app_items(self, steam_user_id: int, app_id: int, language: str = "english") -> list[Item]:
+    async def get_user_app_items(
+        self,
+        steam_user_id: int,
+        app_id: int,
+        language: str = "english",
+        description_filter: Callable[[InventoryDescription], bool] | None = None,
+    ) -> list[Item]:
         """
         Get all user's marketable items for a given app
 
         :param steam_user_id: steam user id
         :param app_id: app id
         :param language: which language we should display the item names in the output sheet
+        :param description_filter: if provided, only items it accepts are kept (e.g. SelectionRules.is_selected)
 
         :returns: user's marketable app's items
         """
-        items = await self.get_user_app_indexed_items(steam_user_id, app_id, language)
+        items = await self.get_user_app_indexed_items(steam_user_id, app_id, language, description_filter)
         return list(items.values())
@@ -0,0 +1,104 @@
+import json
+import os
+
+from external_apis.steam.constants import ITEM_NAMEIDS_SAVE_EVERY
+
+
+class ItemNameIdIndex:
+    """
+    Persistent map of each item (app_id, market_hash_name) to its Steam item_nameid.
+    Item listing pages are the only place item_nameids are found, so they are recorded whenever a listing
+    page is requested, and the (much lighter) orders histogram can be requested from then on.
+    New item_nameids are saved in batches (every save_every new ones, and when the steam api is closed), merged
+    with the ones other processes saved to the same file meanwhile.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        item_nameids: dict[str, dict[str, int]] | None = None,
+        save_every: int = ITEM_NAMEIDS_SAVE_EVERY,
+    ):
+        self.path = path
+        self.item_nameids = item_nameids or {}  # app id (as str, like in json) -> market_hash_name -> item_nameid
+        self.save_every = save_every
+        self.unsaved: dict[str, dict[str, int]] = {}  # item_nameids recorded since the last save
+
+    @staticmethod
+    def _read(path: str) -> dict[str, dict[str, int]]:
+        """
+        Read item_nameids from a json file
+
+        :param path: index file path
+
+        :returns: item_nameids (empty if the file doesn't exist yet)
+        """
+        try:
+            with open(path) as index_file:
+                return json.load(index_file)
+        except FileNotFoundError:
+            return {}
+
+    @classmethod
+    def load(cls, path: str, save_every: int = ITEM_NAMEIDS_SAVE_EVERY) -> "ItemNameIdIndex":
+        """
+        Load the index from a json file. Changes are saved back to that file
+
+        :param path: index file path
+        :param save_every: new item_nameids recorded between two saves
+
+        :returns: index (empty if the file doesn't exist yet)
+        """
+        return cls(path, cls._read(path), save_every)
+
+    def save(self):
+        """
+        Save new item_nameids to the index json file, merged with the ones already on it (e.g. saved by another
+        process), replacing it atomically. Indexes without a file are kept in memory only
+
+        :returns: nothing
+        """
+        if self.path is None or not self.unsaved:
+            return
+        item_nameids = self._read(self.path)
+        for app_id, app_item_nameids in self.unsaved.items():
+            item_nameids.setdefault(app_id, {}).update(app_item_nameids)
+        # a temporary file per process, so processes saving at the same time don't write over each other's
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as index_file:
+            json.dump(item_nameids, index_file, indent=2, ensure_ascii=False)
+        os.replace(temporary_path, self.path)
+        for app_id, app_item_nameids in item_nameids.items():
+            self.item_nameids.setdefault(app_id, {}).update(app_item_nameids)
+        self.unsaved = {}
+
+    def get(self, app_id: int, market_hash_name: str) -> int | None:
+        """
+        Get an item's item_nameid
+
+        :param app_id: item app id
+        :param market_hash_name: item market_hash_name
+
+        :returns: item_nameid, or None if it was never recorded
+        """
+        return self.item_nameids.get(str(app_id), {}).get(market_hash_name)
+
+    def set(self, app_id: int, market_hash_name: str, item_nameid: int):
+        """
+        Record an item's item_nameid, saving the index once enough new ones were recorded
+
+        :param app_id: item app id
+        :param market_hash_name: item market_hash_name
+        :param item_nameid: item_nameid found on the item listing page
+
+        :returns: nothing
+        """
+        if self.get(app_id, market_hash_name) == item_nameid:
+            return
+        self.item_nameids.setdefault(str(app_id), {})[market_hash_name] = item_nameid
+        self.unsaved.setdefault(str(app_id), {})[market_hash_name] = item_nameid
+        if sum(len(app_item_nameids) for app_item_nameids in self.unsaved.values()) >= self.save_every:
+            self.save()
+
+    def __len__(self) -> int:
+        return sum(len(app_item_nameids) for app_item_nameids in self.item_nameids.values())
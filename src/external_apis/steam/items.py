@@ -1,28 +1,145 @@
 import asyncio
 import json
+import math
 import re
-from datetime import datetime
+from concurrent.futures import Executor
+from datetime import datetime, timezone
 from time import time
 from typing import Callable
+from urllib.parse import quote
 
+import numpy as np
 from httpx import AsyncClient, RequestError
 
+from diagnostics.profiler import profile_stage
 from external_apis.steam.constants import (
     CURRENCIES,
+    ITEM_ORDERS_HISTOGRAM_URL,
     ITEM_PRICE_HISTORY_URL,
     ITEM_PRICE_MARKET_HMTL_URL,
     ITEM_PRICE_OVERVIEW_URL,
+    MARKET_SEARCH_PAGE_SIZE,
+    MARKET_SEARCH_URL,
     REQUEST_AWAIT_INTERVAL,
 )
-from external_apis.steam.exceptions import SteamItemsAPIException
-from models.items import AnyItem, ItemWithPrice
+from external_apis.steam.exceptions import SteamItemsAPIException, SteamMarketSearchAPIException
+from external_apis.steam.item_nameids import ItemNameIdIndex
+from models.items import AnyItem, Item, ItemWithPrice, PriceMetrics
+
+
+def parse_price_text(price_text: str) -> float:
+    """
+    Parse a Steam formatted price (e.g. "$1,234.56", "R$ 1.234,56", "1,23€") into a float.
+    Steam always displays prices with 2 decimal places, so a separator followed by 2 digits is the decimal one.
+
+    :param price_text: Steam formatted price
+
+    :returns: price as float
+    """
+    digits_and_separators = re.sub(r"[^\d.,]", "", price_text)
+    match = re.fullmatch(r"([\d.,]*?)[.,](\d{2})", digits_and_separators)
+    if match:
+        return float(re.sub(r"[.,]", "", match.group(1)) + "." + match.group(2))
+    return float(re.sub(r"[.,]", "", digits_and_separators))
+
+
+def parse_price_history_date(price_date: str) -> int:
+    """
+    Parse a Steam price history date (e.g. "Nov 26 2013 01: +0", always UTC) into a timestamp
+
+    :param price_date: Steam price history date
+
+    :returns: timestamp
+    """
+    return int(datetime.strptime(price_date[:14], "%b %d %Y %H").replace(tzinfo=timezone.utc).timestamp())
+
+
+# item listing page parts. patterns are matched on the raw response bytes, so the whole page is never decoded
+ITEM_NAMEID_PATTERN = re.compile(rb"Market_LoadOrderSpread\(\s*(\d+)\s*\)")
+PRICE_HISTORY_PATTERN = re.compile(rb"var line1=(.*?);")
+COMMODITY_PATTERN = re.compile(rb'"commodity":\s*(\d)')
+
+
+def parse_price_history(entries: list[list]) -> list[tuple[int, float, int]]:
+    """
+    Parse Steam price history entries (e.g. ["Nov 26 2013 01: +0", 12.345, "67"], from oldest to most recent)
+
+    :param entries: Steam price history entries
+
+    :returns: list of (timestamp, median price, amount sold)
+    """
+    return [(parse_price_history_date(price_date), price, int(volume)) for price_date, price, volume in entries]
+
+
+def parse_market_html(content: bytes) -> tuple[int | None, bool, list[tuple[int, float, int]] | None]:
+    """
+    Extract the item_nameid, whether the item is a commodity and the price history from a raw item listing page.
+    It is CPU bound (the page is hundreds of KB), so it may run on a thread or process pool (see SteamItemsAPI)
+
+    :param content: raw listing page
+
+    :returns: item_nameid, commodity flag (False if the page has no listed asset) and list of
+        (timestamp, price, volume), from oldest to most recent. item_nameid and price history are None if not found
+    """
+    item_nameid_match = ITEM_NAMEID_PATTERN.search(content)
+    item_nameid = int(item_nameid_match.group(1)) if item_nameid_match else None
+
+    commodity_match = COMMODITY_PATTERN.search(content)
+    commodity = commodity_match is not None and commodity_match.group(1) == b"1"
+
+    price_history_match = PRICE_HISTORY_PATTERN.search(content)
+    price_history = parse_price_history(json.loads(price_history_match.group(1))) if price_history_match else None
+    return item_nameid, commodity, price_history
+
+
+def get_price_metrics(price_history: list[tuple[int, float, int]], now: float | None = None) -> PriceMetrics:
+    """
+    Compute an item's price metrics from its price history, with vectorized operations over the whole series.
+    Volume weighted averages of every window come from the same cumulative sums, so each one is a subtraction.
+
+    :param price_history: list of (timestamp, median price, amount sold), from oldest to most recent
+    :param now: timestamp the metrics windows end at. current time, if not provided
+
+    :returns: price metrics
+    """
+    timestamps, prices, volumes = np.array(price_history, dtype=float).T
+    now = time() if now is None else now
+
+    # first entry of each window (timestamps are sorted)
+    day_start, week_start, month_start = np.searchsorted(timestamps, [now - 86400, now - 7 * 86400, now - 30 * 86400])
+
+    # cumulative traded value and volume, prefixed by 0 so sums since any entry are last - cumulative[entry]
+    traded_values = np.concatenate(([0.0], np.cumsum(prices * volumes)))
+    traded_volumes = np.concatenate(([0.0], np.cumsum(volumes)))
+
+    def get_vwap(start: int) -> float | None:
+        volume = traded_volumes[-1] - traded_volumes[start]
+        return float((traded_values[-1] - traded_values[start]) / volume) if volume > 0 else None
+
+    return PriceMetrics(
+        price_last=float(prices[-1]),
+        price_median_24h=float(np.median(prices[day_start:])) if day_start < len(prices) else None,
+        price_vwap_7d=get_vwap(week_start),
+        price_vwap_30d=get_vwap(month_start),
+        volume_24h=int(traded_volumes[-1] - traded_volumes[day_start]),
+    )
 
 
 class SteamItemsAPI:
-    def __init__(self, session: AsyncClient | None = None):
+    def __init__(
+        self,
+        session: AsyncClient | None = None,
+        request_interval: float = REQUEST_AWAIT_INTERVAL,
+        item_nameids: ItemNameIdIndex | None = None,
+        parse_executor: Executor | None = None,
+    ):
         self.session = session or AsyncClient()
+        self.request_interval = request_interval
+        self.item_nameids = item_nameids if item_nameids is not None else ItemNameIdIndex()
+        # listing pages are parsed on this pool, if provided, so the event loop only handles I/O
+        self.parse_executor = parse_executor
 
-    async def _get_price_from_history(self, item: AnyItem, currency: str) -> float:
+    async def _get_price_from_history(self, item: AnyItem, currency: str) -> PriceMetrics:
         """
         Request Steam API item price through history API.
         This API provides the median sold value of each day for old days and median sold value per hour
@@ -34,7 +151,7 @@ class SteamItemsAPI:
         :param item: item dict.
         :param currency: currency to retrieve the price.
 
-        :returns: item's price.
+        :returns: item's price metrics.
         """
         # set item price url
         url = ITEM_PRICE_HISTORY_URL.format(
@@ -52,8 +169,8 @@ class SteamItemsAPI:
 
         # extract item price
         response_data: dict = response.json()
-        if response_data and response_data.get("success"):
-            return response_data["prices"][-1][1]
+        if response_data and response_data.get("success") and response_data.get("prices"):
+            return get_price_metrics(parse_price_history(response_data["prices"]))
         raise SteamItemsAPIException(item.name, item.market_hash_name, response.status_code)
 
     async def _get_price_from_overview(self, item: AnyItem, currency: str) -> float:
@@ -84,17 +201,17 @@ class SteamItemsAPI:
         # extract item price
         response_data: dict = response.json()
         if response_data and response_data.get("success"):
-            return float(response_data["median_price"].split()[1])
+            return parse_price_text(response_data["median_price"])
         raise SteamItemsAPIException(item.name, item.market_hash_name, response.status_code)
 
-    async def _get_price_from_market_html(self, item: AnyItem, **kwargs) -> float:
+    async def get_item_price_volume_history(self, item: AnyItem) -> list[tuple[int, float, int]]:
         """
-        Request Steam web market item listing.
-        There, we can extract the price history from the html.
+        Request Steam web market item listing and extract the item's whole price history from the html.
+        Old entries are daily median prices, recent ones (last ~30 days) are hourly median prices.
 
         :param item: item dictionary
 
-        :returns: item price
+        :returns: list of (timestamp, price, amount sold), from oldest to most recent
         """
         # set item price url
         url = ITEM_PRICE_MARKET_HMTL_URL.format(
@@ -109,25 +226,173 @@ class SteamItemsAPI:
             message = exc.message if hasattr(exc, "message") else None
             raise SteamItemsAPIException(item.name, item.market_hash_name, f"Request Error: {message}") from exc
 
-        # extract item price
-        match = re.search(r"var line1=(.*?);", response.text)
-        if match:
-            item_price_history = json.loads(match.group(1))
-            return item_price_history[-1][1]
+        # extract item_nameid and price history (off the event loop, if there is a parse pool)
+        with profile_stage("steam.items.parse_listing"):
+            if self.parse_executor is None:
+                item_nameid, commodity, price_history = parse_market_html(response.content)
+            else:
+                item_nameid, commodity, price_history = await asyncio.get_running_loop().run_in_executor(
+                    self.parse_executor, parse_market_html, response.content
+                )
+
+        # record commodity items item_nameid, so the orders histogram can be requested instead of this page from now on
+        if item_nameid is not None and commodity:
+            self.item_nameids.set(item.app_id, item.market_hash_name, item_nameid)
+
+        if price_history is not None:
+            return price_history
         raise SteamItemsAPIException(item.name, item.market_hash_name, response.status_code, extra=response.text)
 
-    def get_item_price_getter(self, price_source: str) -> Callable[[dict, str], float]:
+    async def get_item_price_history(self, item: AnyItem) -> list[tuple[int, float]]:
+        """
+        Request Steam web market item listing and extract the item's whole price history from the html.
+        Old entries are daily median prices, recent ones (last ~30 days) are hourly median prices.
+
+        :param item: item dictionary
+
+        :returns: list of (timestamp, price), from oldest to most recent
+        """
+        price_history = await self.get_item_price_volume_history(item)
+        return [(timestamp, price) for timestamp, price, _ in price_history]
+
+    async def _get_price_from_market_html(self, item: AnyItem, currency: str | None = None) -> PriceMetrics:
+        """
+        Request Steam web market item listing.
+        There, we can extract the price history from the html, and compute its price metrics.
+
+        :param item: item dictionary
+        :param currency: currency to retrieve the price. unused, listing pages are served in a single currency
+
+        :returns: item price metrics
+        """
+        item_price_history = await self.get_item_price_volume_history(item)
+        if not item_price_history:
+            raise SteamItemsAPIException(item.name, item.market_hash_name, "No sales history")
+        return get_price_metrics(item_price_history)
+
+    async def _get_price_from_histogram(self, item: AnyItem, currency: str) -> float | PriceMetrics:
+        """
+        Request Steam item orders histogram and get the item's lowest sell order.
+        The histogram is a small json (instead of the whole listing page), but it needs the item_nameid,
+        which is only found on the listing page. So, for items without a recorded item_nameid, the listing
+        page is requested once (recording it) and its price metrics are used instead.
+        Only commodity items (e.g. cases, stickers) are priced by their lowest sell order, since their sell orders
+        are all alike. Other items sell orders are far apart (e.g. skins wear), so they are priced by the median
+        price of their listing page, and their item_nameid is never recorded.
+
+        :param item: item dictionary
+        :param currency: currency to retrieve the price
+
+        :returns: item price (or price metrics, if the listing page was requested)
         """
-        Returns the function to get an item price given the desired retrieve mode
+        item_nameid = self.item_nameids.get(item.app_id, item.market_hash_name)
+        if item_nameid is None or (isinstance(item, Item) and item.commodity is False):
+            return await self._get_price_from_market_html(item, currency=currency)
+
+        # set item histogram url
+        url = ITEM_ORDERS_HISTOGRAM_URL.format(currency=currency, item_nameid=item_nameid)
+
+        # request item orders histogram
+        try:
+            response = await self.session.get(url)
+        except RequestError as exc:
+            message = exc.message if hasattr(exc, "message") else None
+            raise SteamItemsAPIException(item.name, item.market_hash_name, f"Request Error: {message}") from exc
+
+        # extract item price (orders are in cents)
+        response_data: dict = response.json() if response.status_code == 200 else {}
+        if response_data and response_data.get("success") == 1 and response_data.get("lowest_sell_order"):
+            return int(response_data["lowest_sell_order"]) / 100
+        raise SteamItemsAPIException(item.name, item.market_hash_name, response.status_code)
+
+    async def _get_market_search_page(self, app_id: int, query: str, start: int, currency: str) -> dict:
+        """
+        Request one page of Steam market search results, with the prices of each listed item
+
+        :param app_id: app to search items of
+        :param query: search text (empty to list every item of the app)
+        :param start: index of the first result
+        :param currency: currency to retrieve the prices
+
+        :returns: search page, with its "results" and the "total_count" of results
+        """
+        # set search url
+        url = MARKET_SEARCH_URL.format(
+            app_id=app_id,
+            query=quote(query),
+            start=start,
+            count=MARKET_SEARCH_PAGE_SIZE,
+            currency=currency,
+        )
+
+        # request search page
+        try:
+            response = await self.session.get(url)
+        except RequestError as exc:
+            message = exc.message if hasattr(exc, "message") else None
+            raise SteamMarketSearchAPIException(app_id, query, f"Request Error: {message}") from exc
+
+        response_data: dict = response.json() if response.status_code == 200 else {}
+        if response_data and response_data.get("success"):
+            return response_data
+        raise SteamMarketSearchAPIException(app_id, query, response.status_code)
+
+    async def get_app_search_prices(
+        self, app_id: int, market_hash_names: set[str], currency: str, query: str = ""
+    ) -> dict[str, float]:
+        """
+        Page through an app's market search results (up to 100 items per request), collecting the
+        sale price of the wanted items.
+        Paging stops once every wanted item is found, or when the remaining pages outnumber the items
+        still missing (requesting those items one by one is cheaper then).
+
+        :param app_id: app to search items of
+        :param market_hash_names: wanted items market_hash_name
+        :param currency: currency to retrieve the prices
+        :param query: search text, to page through fewer results (e.g. "Sticker")
+
+        :returns: map of each found item market_hash_name to its price. items without a sale price are not found
+        """
+        prices: dict[str, float] = {}
+        start = 0
+        while True:
+            with profile_stage("steam.market_search.request"):
+                search_page = await self._get_market_search_page(app_id, query, start, currency)
+            with profile_stage("rate_limit.wait"):
+                await asyncio.sleep(self.request_interval)
+            results: list[dict] = search_page.get("results") or []
+            for result in results:
+                # the sale price (what the item recently sold for) is comparable to the median prices of the other
+                # sources, while the sell price is the lowest ask
+                if result["hash_name"] in market_hash_names and result.get("sale_price_text"):
+                    prices[result["hash_name"]] = parse_price_text(result["sale_price_text"])
+
+            start += len(results)
+            missing_items_amount = len(market_hash_names) - len(prices)
+            remaining_pages = math.ceil((search_page["total_count"] - start) / MARKET_SEARCH_PAGE_SIZE)
+            print(f"Searched {start}/{search_page['total_count']} items of app {app_id}: found {len(prices)} items")
+            if (
+                not results
+                or not missing_items_amount
+                or remaining_pages <= 0
+                or remaining_pages > missing_items_amount
+            ):
+                return prices
+
+    def get_item_price_getter(self, price_source: str) -> Callable[[dict, str], float | PriceMetrics]:
+        """
+        Returns the function to get an item price given the desired retrieve mode.
+        Sources with a price history ("html" and "history") return its price metrics instead of a single price
 
         :param price_source: which source to retrieve the item price from
 
         :returns: function to retrieve the price
         """
-        price_source_to_item_price_getter: dict[str, Callable[[dict, str], float]] = {
+        price_source_to_item_price_getter: dict[str, Callable[[dict, str], float | PriceMetrics]] = {
             "html": self._get_price_from_market_html,
             "history": self._get_price_from_history,
             "overview": self._get_price_from_overview,
+            "histogram": self._get_price_from_histogram,
         }
         return price_source_to_item_price_getter[price_source]
 
@@ -147,10 +412,15 @@ class SteamItemsAPI:
         price_date = datetime.utcnow().strftime("%Y-%m-%d")
         price_timestamp = int(time())
         price = None
+        price_metrics = {}
         try:
-            price = await price_getter(item=item, currency=currency)
+            with profile_stage(f"steam.items.price.{price_source}"):
+                price = await price_getter(item=item, currency=currency)
         except SteamItemsAPIException as exc:
             exc.log()
+        if isinstance(price, PriceMetrics):
+            price_metrics = price.model_dump(exclude={"price_last"})
+            price = price.price_last
         item_with_price = ItemWithPrice(
             app_id=item.app_id,
             name=item.name,
@@ -160,6 +430,7 @@ class SteamItemsAPI:
             price_date_timestamp=price_timestamp,
             price_unitary=price,
             api_error="yes" if price is None else "no",
+            **price_metrics,
         )
         return item_with_price
 
@@ -173,7 +444,7 @@ class SteamItemsAPI:
 
         :param items: list of items dictionaries
         :param currency: currency to retrieve the price
-        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html"
+        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html", "histogram"
 
         :returns: items dictionary with price info
         """
@@ -188,7 +459,7 @@ class SteamItemsAPI:
 
         :param items: list of items dictionaries
         :param currency: currency to retrieve the price
-        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html"
+        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html", "histogram"
 
         :returns: items dictionary with price info
         """
@@ -198,9 +469,79 @@ class SteamItemsAPI:
             print(f"Requesting item {index + 1}/{len(items)}")
             item_with_price = await self.add_price_to_item(item, currency, price_source)
             items_with_price.append(item_with_price)
-            await asyncio.sleep(REQUEST_AWAIT_INTERVAL)
+            with profile_stage("rate_limit.wait"):
+                await asyncio.sleep(self.request_interval)
         return items_with_price
 
+    async def get_items_price_from_search(
+        self, items: list[AnyItem], currency: str = CURRENCIES["BRL"], query: str = ""
+    ) -> list[ItemWithPrice]:
+        """
+        Price items with Steam market search pages (up to 100 items per request), by their sale price.
+        Only found items are returned: items without a sale price, or of apps whose search failed, are not.
+
+        :param items: list of items dictionaries
+        :param currency: currency to retrieve the price
+        :param query: search text, to page through fewer results
+
+        :returns: found items dictionary with price info, in the same order as items
+        """
+        price_date = datetime.utcnow().strftime("%Y-%m-%d")
+        price_timestamp = int(time())
+        item_key_to_price: dict[tuple[int, str], float] = {}
+        for app_id in dict.fromkeys(item.app_id for item in items):
+            market_hash_names = {item.market_hash_name for item in items if item.app_id == app_id}
+            try:
+                app_prices = await self.get_app_search_prices(app_id, market_hash_names, currency, query)
+            except SteamMarketSearchAPIException as exc:
+                exc.log()
+                continue
+            item_key_to_price.update(
+                ((app_id, market_hash_name), price) for market_hash_name, price in app_prices.items()
+            )
+
+        return [
+            ItemWithPrice(
+                app_id=item.app_id,
+                name=item.name,
+                amount=item.amount,
+                market_hash_name=item.market_hash_name,
+                price_date=price_date,
+                price_date_timestamp=price_timestamp,
+                price_unitary=item_key_to_price[(item.app_id, item.market_hash_name)],
+                api_error="no",
+            )
+            for item in items
+            if (item.app_id, item.market_hash_name) in item_key_to_price
+        ]
+
+    async def _add_items_price_from_search(
+        self, items: list[AnyItem], currency: str = CURRENCIES["BRL"], price_source: str = "html"
+    ) -> list[ItemWithPrice]:
+        """
+        Request Steam market search pages, pricing up to 100 items per request.
+        Items not found are priced one by one, with serialized requests.
+
+        :param items: list of items dictionaries
+        :param currency: currency to retrieve the price
+        :param price_source: which source to retrieve the price of items not found. One of "overview", "history", "html", "histogram"
+
+        :returns: items dictionary with price info, in the same order as items
+        """
+        found_items_with_price = await self.get_items_price_from_search(items, currency)
+        item_key_to_item_with_price = {(item.app_id, item.market_hash_name): item for item in found_items_with_price}
+        items_not_found = [
+            item for item in items if (item.app_id, item.market_hash_name) not in item_key_to_item_with_price
+        ]
+        print(f"Found {len(found_items_with_price)} of {len(items)} items on market search")
+        items_not_found_with_price = iter(
+            await self._add_items_price_serialized(items_not_found, currency, price_source)
+        )
+        return [
+            item_key_to_item_with_price.get((item.app_id, item.market_hash_name)) or next(items_not_found_with_price)
+            for item in items
+        ]
+
     async def add_items_price(
         self,
         items: list[AnyItem],
@@ -213,14 +554,50 @@ class SteamItemsAPI:
 
         :param items: list of items dictionaries
         :param currency: currency to retrieve the price
-        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html"
-        :param retrieve_mode: how to retrieve info. Either "serialized" or "concurrently".
+        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html", "histogram"
+        :param retrieve_mode: how to retrieve info. One of "serialized", "concurrently" or "search"
+            (market search pages, 100 items per request, falling back to serialized requests)
 
         :returns: items dictionary with price info
         """
         retrieve_mode_to_price_adder: dict[str, Callable[[list[dict], str, str], list[dict]]] = {
             "serialized": self._add_items_price_serialized,
             "concurrently": self._add_items_price_concurrently,
+            "search": self._add_items_price_from_search,
         }
         price_adder = retrieve_mode_to_price_adder[retrieve_mode]
         return await price_adder(items, currency, price_source)
+
+    async def add_unique_items_price(
+        self,
+        items: list[AnyItem],
+        currency: str = CURRENCIES["BRL"],
+        price_source: str = "html",
+        retrieve_mode: str = "serialized",
+    ) -> list[ItemWithPrice]:
+        """
+        Same as add_items_price, but each distinct item (app_id, market_hash_name) is priced only once,
+        no matter how many times it is repeated on items (e.g. items from many users inventories).
+
+        :param items: list of items dictionaries, possibly with repeated items
+        :param currency: currency to retrieve the price
+        :param price_source: which source to retrieve the item price from. One of "overview", "history", "html", "histogram"
+        :param retrieve_mode: how to retrieve info. One of "serialized", "concurrently" or "search"
+            (market search pages, 100 items per request, falling back to serialized requests)
+
+        :returns: items dictionary with price info, in the same order (and with the same amounts) as items
+        """
+        unique_items: dict[tuple[int, str], AnyItem] = {}
+        for item in items:
+            unique_items.setdefault((item.app_id, item.market_hash_name), item)
+
+        unique_items_with_price = await self.add_items_price(
+            list(unique_items.values()), currency, price_source, retrieve_mode
+        )
+        item_key_to_item_with_price = {(item.app_id, item.market_hash_name): item for item in unique_items_with_price}
+        return [
+            item_key_to_item_with_price[(item.app_id, item.market_hash_name)].model_copy(
+                update={"name": item.name, "amount": item.amount}
+            )
+            for item in items
+        ]
@@ -0,0 +1,34 @@
+import asyncio
+from time import monotonic
+
+from diagnostics.profiler import profile_stage
+from external_apis.steam.constants import REQUEST_AWAIT_INTERVAL
+
+
+class RateLimiter:
+    def __init__(self, interval: float = REQUEST_AWAIT_INTERVAL):
+        self.interval = interval
+        self._next_slot = 0.0
+
+    def get_delay(self) -> float:
+        """
+        Get how many seconds a request made now would wait for its slot
+
+        :returns: delay in seconds
+        """
+        return max(self._next_slot - monotonic(), 0.0)
+
+    async def acquire(self):
+        """
+        Wait until a request can be sent, so that requests (from any number of tasks sharing the limiter)
+        are at least interval seconds apart
+
+        :returns: nothing
+        """
+        # reserve the slot before waiting (no await in between), so concurrent callers get consecutive slots
+        now = monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            with profile_stage("rate_limit.wait"):
+                await asyncio.sleep(slot - now)
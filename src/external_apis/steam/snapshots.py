@@ -0,0 +1,154 @@
+import json
+import os
+
+from pydantic import BaseModel
+
+from models.items import Item
+
+
+class SnapshotAsset(BaseModel):
+    asset_id: str
+    class_id: str
+    amount: int
+
+
+class SnapshotItem(BaseModel):
+    market_hash_name: str
+    name: str
+
+
+class InventorySnapshot(BaseModel):
+    """
+    A user's app inventory at some point, asset by asset (only marketable assets)
+    """
+
+    steam_id: int
+    app_id: int
+    taken_at: int  # timestamp
+    assets: list[SnapshotAsset]
+    class_id_to_item: dict[str, SnapshotItem]
+
+    @classmethod
+    def load(cls, path: str) -> "InventorySnapshot | None":
+        """
+        Load a snapshot from a json file
+
+        :param path: snapshot file path
+
+        :returns: snapshot, or None if the file doesn't exist
+        """
+        try:
+            with open(path) as snapshot_file:
+                return cls.model_validate(json.load(snapshot_file))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str):
+        """
+        Save the snapshot to a json file (replacing it atomically)
+
+        :param path: snapshot file path
+
+        :returns: nothing
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as snapshot_file:
+            snapshot_file.write(self.model_dump_json())
+        os.replace(temporary_path, path)
+
+    def get_items(self) -> dict[str, Item]:
+        """
+        Get the snapshot holdings: each item with the sum of its assets amount
+
+        :returns: items indexed by market_hash_name
+        """
+        items: dict[str, Item] = {}
+        for asset in self.assets:
+            snapshot_item = self.class_id_to_item[asset.class_id]
+            if snapshot_item.market_hash_name in items:
+                items[snapshot_item.market_hash_name].amount += asset.amount
+            else:
+                items[snapshot_item.market_hash_name] = Item(
+                    app_id=self.app_id,
+                    name=snapshot_item.name,
+                    amount=asset.amount,
+                    market_hash_name=snapshot_item.market_hash_name,
+                )
+        return items
+
+
+class InventoryDiff(BaseModel):
+    added: list[Item] = []  # items not held before
+    removed: list[Item] = []  # items no longer held (with their previous amount)
+    changed: list[Item] = []  # items still held, with their new amount
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def merge(self, other: "InventoryDiff") -> "InventoryDiff":
+        """
+        Join two diffs (e.g. of different apps)
+
+        :param other: diff to be joined
+
+        :returns: joined diff
+        """
+        return InventoryDiff(
+            added=self.added + other.added,
+            removed=self.removed + other.removed,
+            changed=self.changed + other.changed,
+        )
+
+
+def get_snapshot_path(snapshots_dir: str, excel_file_name: str, steam_id: int, app_id: int) -> str:
+    """
+    Get where a user's app inventory snapshot is stored.
+    Each workbook has its own snapshots, since each one is in sync with the inventory as of its own last sync
+
+    :param snapshots_dir: snapshots directory
+    :param excel_file_name: workbook file name
+    :param steam_id: steam user id
+    :param app_id: app id
+
+    :returns: snapshot file path
+    """
+    workbook_name = os.path.splitext(os.path.basename(excel_file_name))[0]
+    return os.path.join(snapshots_dir, workbook_name, f"{steam_id}_{app_id}.json")
+
+
+def diff_items(previous_items: dict[str, Item], current_items: dict[str, Item]) -> InventoryDiff:
+    """
+    Compare holdings by market_hash_name
+
+    :param previous_items: previous items indexed by market_hash_name
+    :param current_items: current items indexed by market_hash_name
+
+    :returns: added, removed and changed items
+    """
+    return InventoryDiff(
+        added=[item for market_hash_name, item in current_items.items() if market_hash_name not in previous_items],
+        removed=[item for market_hash_name, item in previous_items.items() if market_hash_name not in current_items],
+        changed=[
+            item
+            for market_hash_name, item in current_items.items()
+            if market_hash_name in previous_items and previous_items[market_hash_name].amount != item.amount
+        ],
+    )
+
+
+def diff_inventory_snapshots(previous: InventorySnapshot, current: InventorySnapshot) -> InventoryDiff:
+    """
+    Get what changed on an inventory between two snapshots.
+    Assets are compared first, so unchanged inventories (the common case) are detected without building holdings.
+
+    :param previous: previous snapshot
+    :param current: current snapshot
+
+    :returns: added, removed and changed items
+    """
+    previous_assets = {(asset.asset_id, asset.amount) for asset in previous.assets}
+    current_assets = {(asset.asset_id, asset.amount) for asset in current.assets}
+    if previous_assets == current_assets:
+        return InventoryDiff()
+    return diff_items(previous.get_items(), current.get_items())
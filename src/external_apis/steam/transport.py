@@ -0,0 +1,112 @@
+from collections import Counter
+from importlib.util import find_spec
+from weakref import WeakSet
+
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, Response, Timeout
+
+from external_apis.steam.constants import REQUEST_TIMEOUT
+
+# connection pool limits. steam is requested sequentially (per egress), so few connections are ever open
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+KEEPALIVE_EXPIRY = 120  # seconds an idle connection is kept open. longer than the requests interval, so it is reused
+
+# http2 and brotli need optional packages (installed with httpx[http2,brotli]). fall back when they are missing
+HTTP2_AVAILABLE = find_spec("h2") is not None
+BROTLI_AVAILABLE = find_spec("brotli") is not None or find_spec("brotlicffi") is not None
+ACCEPT_ENCODING = "br, gzip, deflate" if BROTLI_AVAILABLE else "gzip, deflate"
+
+
+class TransportMetrics:
+    """
+    Count requests, bytes (on the wire and decoded), latency, http versions and connection reuse of steam clients
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes_downloaded = 0  # compressed, as transferred
+        self.bytes_decoded = 0
+        self.elapsed_seconds = 0.0
+        self.http_versions: Counter[str] = Counter()
+        self.new_connections = 0
+        self.reused_connections = 0
+        self._network_streams: WeakSet = WeakSet()
+
+    async def on_response(self, response: Response):
+        """
+        Response event hook. Reads the body, so transfer size and latency are known
+
+        :param response: received response
+
+        :returns: nothing
+        """
+        await response.aread()
+        self.requests += 1
+        self.bytes_downloaded += response.num_bytes_downloaded
+        self.bytes_decoded += len(response.content)
+        self.elapsed_seconds += response.elapsed.total_seconds()
+        self.http_versions[response.http_version] += 1
+
+        # each connection has its own network stream, so an already seen stream means a reused connection
+        network_stream = response.extensions.get("network_stream")
+        if network_stream is None:
+            return
+        if network_stream in self._network_streams:
+            self.reused_connections += 1
+        else:
+            self.new_connections += 1
+            self._network_streams.add(network_stream)
+
+    def get_status(self) -> dict:
+        """
+        Get the metrics summary
+
+        :returns: status dict
+        """
+        compression_ratio = self.bytes_decoded / self.bytes_downloaded if self.bytes_downloaded else None
+        avg_latency_seconds = self.elapsed_seconds / self.requests if self.requests else None
+        return {
+            "requests": self.requests,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_decoded": self.bytes_decoded,
+            "compression_ratio": compression_ratio and round(compression_ratio, 2),
+            "avg_latency_seconds": avg_latency_seconds and round(avg_latency_seconds, 3),
+            "http_versions": dict(self.http_versions),
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+        }
+
+
+def create_steam_client(
+    proxy: str | None = None,
+    local_address: str | None = None,
+    limits: Limits | None = None,
+    http2: bool = True,
+    metrics: TransportMetrics | None = None,
+) -> AsyncClient:
+    """
+    Create a client with a pooled keep-alive transport, http2 (when available) and compressed responses
+
+    :param proxy: proxy url to send requests through
+    :param local_address: local source ip to send requests from
+    :param limits: connection pool limits. if not provided, MAX_CONNECTIONS, MAX_KEEPALIVE_CONNECTIONS
+        and KEEPALIVE_EXPIRY are used
+    :param http2: whether to negotiate http2 (ignored if the h2 package is not installed)
+    :param metrics: metrics to be updated on every response
+
+    :returns: http client
+    """
+    limits = limits or Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    transport = AsyncHTTPTransport(
+        http2=http2 and HTTP2_AVAILABLE, limits=limits, proxy=proxy, local_address=local_address
+    )
+    return AsyncClient(
+        transport=transport,
+        timeout=Timeout(REQUEST_TIMEOUT),
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+        event_hooks={"response": [metrics.on_response]} if metrics else None,
+    )
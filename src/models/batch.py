@@ -0,0 +1,174 @@
+import math
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from models.items import ItemWithPrice
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ItemWithPrice fields, in order. each one is a column of an ItemBatch
+ITEM_WITH_PRICE_FIELDS = list(ItemWithPrice.model_fields)
+
+
+class ItemWithPriceColumns(TypedDict):
+    app_id: list[int]
+    name: list[str]
+    price_unitary: list[float | None]
+    amount: list[int]
+    api_error: list[str]
+    price_stale: list[str]
+    price_date: list[str]
+    price_date_timestamp: list[int]
+    market_hash_name: list[str]
+    price_median_24h: list[float | None]
+    price_vwap_7d: list[float | None]
+    price_vwap_30d: list[float | None]
+    volume_24h: list[int | None]
+
+
+# ItemWithPrice fields that may be missing from columns (e.g. sheets exported before they existed), with their default
+OPTIONAL_FIELDS_DEFAULT = {
+    field: ItemWithPrice.model_fields[field].default
+    for field in ["price_stale", "price_median_24h", "price_vwap_7d", "price_vwap_30d", "volume_24h"]
+}
+
+# validates all columns (every item) in a single call
+ITEM_WITH_PRICE_COLUMNS_ADAPTER = TypeAdapter(ItemWithPriceColumns)
+
+# validates rows (e.g. json records) in a single call
+ITEM_WITH_PRICE_ROWS_ADAPTER = TypeAdapter(list[ItemWithPrice])
+
+
+class ItemBatch:
+    """
+    Items with price stored as columns (one list per ItemWithPrice field) instead of one model per item.
+    Batches are validated in bulk and converted to and from DataFrames column by column, while
+    individual items can still be accessed as ItemWithPrice (batch[index] or iterating over it).
+    """
+
+    def __init__(self, columns: dict[str, list]):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {lengths}")
+        self.columns = columns
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list]) -> "ItemBatch":
+        """
+        Validate columns in bulk and create a batch with them
+
+        :param columns: map of each ItemWithPrice field (OPTIONAL_FIELDS_DEFAULT ones are optional) to its values
+
+        :returns: item batch
+        """
+        missing_fields = [field for field in OPTIONAL_FIELDS_DEFAULT if field not in columns]
+        if missing_fields:
+            size = len(columns["app_id"])
+            columns = columns | {field: [OPTIONAL_FIELDS_DEFAULT[field]] * size for field in missing_fields}
+        validated_columns = ITEM_WITH_PRICE_COLUMNS_ADAPTER.validate_python(columns)
+        return cls({field: validated_columns[field] for field in ITEM_WITH_PRICE_FIELDS})
+
+    @classmethod
+    def from_items(cls, items: Iterable[ItemWithPrice]) -> "ItemBatch":
+        """
+        Create a batch from already validated items (no validation, no dict per item)
+
+        :param items: items with price
+
+        :returns: item batch
+        """
+        items = list(items)
+        return cls({field: [getattr(item, field) for item in items] for field in ITEM_WITH_PRICE_FIELDS})
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "ItemBatch":
+        """
+        Validate records (one dict per item) in bulk and create a batch with them
+
+        :param records: items as dicts
+
+        :returns: item batch
+        """
+        return cls.from_items(ITEM_WITH_PRICE_ROWS_ADAPTER.validate_python(records))
+
+    @classmethod
+    def from_dataframe(cls, items_df: "pd.DataFrame") -> "ItemBatch":
+        """
+        Validate a dataframe's columns in bulk and create a batch with them. Missing values (NaN) become None
+
+        :param items_df: dataframe with (at least) ItemWithPrice columns
+
+        :returns: item batch
+        """
+        columns = {field: items_df[field].tolist() for field in ITEM_WITH_PRICE_FIELDS if field in items_df}
+        for field in ["price_unitary", "price_median_24h", "price_vwap_7d", "price_vwap_30d", "volume_24h"]:
+            if field in columns:
+                columns[field] = [
+                    None if isinstance(value, float) and math.isnan(value) else value for value in columns[field]
+                ]
+        return cls.from_columns(columns)
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        Get the batch as a dataframe, built column by column
+
+        :returns: items dataframe
+        """
+        # NOTE: imported here, so pandas is only imported when a dataframe is needed
+        import pandas as pd
+
+        return pd.DataFrame(self.columns, columns=ITEM_WITH_PRICE_FIELDS)
+
+    def to_items(self) -> list[ItemWithPrice]:
+        """
+        Get all items as models
+
+        :returns: items with price
+        """
+        return list(self)
+
+    def take(self, indexes: list[int]) -> "ItemBatch":
+        """
+        Get a new batch with the items at the given indexes, in that order
+
+        :param indexes: item indexes
+
+        :returns: item batch
+        """
+        return ItemBatch({field: [column[index] for index in indexes] for field, column in self.columns.items()})
+
+    def sort_by_app_and_name(self) -> "ItemBatch":
+        """
+        Get a new batch sorted by app id and name (the spreadsheets order)
+
+        :returns: sorted item batch
+        """
+        app_ids, names = self.columns["app_id"], self.columns["name"]
+        return self.take(sorted(range(len(self)), key=lambda index: f"{app_ids[index]}-{names[index]}"))
+
+    @classmethod
+    def concat(cls, batches: list["ItemBatch"]) -> "ItemBatch":
+        """
+        Join batches into a single one
+
+        :param batches: item batches
+
+        :returns: item batch
+        """
+        return cls(
+            {field: [value for batch in batches for value in batch.columns[field]] for field in ITEM_WITH_PRICE_FIELDS}
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns["app_id"])
+
+    def __getitem__(self, index: int) -> ItemWithPrice:
+        # values were validated when the batch was created
+        return ItemWithPrice.model_construct(**{field: column[index] for field, column in self.columns.items()})
+
+    def __iter__(self) -> Iterator[ItemWithPrice]:
+        for values in zip(*self.columns.values()):
+            yield ItemWithPrice.model_construct(**dict(zip(self.columns, values)))
@@ -7,9 +7,27 @@ class ItemWithPrice(BaseModel):
     price_unitary: float | None
     amount: int
     api_error: str
+    price_stale: str = "no"  # "yes" when price_unitary was carried from a previous run instead of refreshed
     price_date: str
     price_date_timestamp: int
     market_hash_name: str
+    # metrics of the price history the price was taken from (None if the price source has no history)
+    price_median_24h: float | None = None
+    price_vwap_7d: float | None = None
+    price_vwap_30d: float | None = None
+    volume_24h: int | None = None
+
+
+class PriceMetrics(BaseModel):
+    """
+    Metrics of an item price history, computed at once from a single history fetch
+    """
+
+    price_last: float  # most recent (hourly) median price
+    price_median_24h: float | None  # median of the last 24 hours prices (None if there were no sales)
+    price_vwap_7d: float | None  # volume weighted average price of the last 7 days (None if there were no sales)
+    price_vwap_30d: float | None  # volume weighted average price of the last 30 days (None if there were no sales)
+    volume_24h: int  # amount of items sold in the last 24 hours
 
 
 class Item(BaseModel):
@@ -17,6 +35,7 @@ class Item(BaseModel):
     name: str
     amount: int
     market_hash_name: str
+    commodity: bool | None = None  # whether all item units are alike (e.g. cases). None if unknown (e.g. from a sheet)
 
 
 AnyItem = Item | ItemWithPrice
@@ -1,10 +1,25 @@
+from functools import cache
 from typing import TypeVar
 
+from pydantic import TypeAdapter
+
 Model = TypeVar("Model")
 
 
+@cache
+def get_list_adapter(model: Model) -> TypeAdapter:
+    """
+    Get (and reuse) the adapter that validates a whole list of a model at once
+
+    :param model: pydantic model class
+
+    :returns: list adapter
+    """
+    return TypeAdapter(list[model])
+
+
 def convert_list_to_model(model: Model, data_list: list) -> list[Model]:
-    return [model.model_validate(data) for data in data_list]
+    return get_list_adapter(model).validate_python(data_list)
 
 
 def convert_model_to_list(data_list: list[Model]) -> list[dict]:
@@ -0,0 +1,3 @@
+"""
+Pricing workflows built on top of the Steam API clients
+"""
@@ -0,0 +1,93 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from statistics import median
+
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.exceptions import SteamItemsAPIException
+from external_apis.steam.rate_limiter import RateLimiter
+from models.items import AnyItem
+
+
+def get_daily_median_prices(price_history: list[tuple[int, float]], since: date | None = None) -> dict[date, float]:
+    """
+    Group a price history (daily and hourly prices) into one median price per day
+
+    :param price_history: list of (timestamp, price)
+    :param since: ignore prices before this date. if not provided, all prices are used
+
+    :returns: map of date to its median price, from oldest to most recent
+    """
+    date_to_prices: dict[date, list[float]] = defaultdict(list)
+    for timestamp, price in price_history:
+        price_date = datetime.fromtimestamp(timestamp, timezone.utc).date()
+        if since is None or price_date >= since:
+            date_to_prices[price_date].append(price)
+    return {price_date: median(prices) for price_date, prices in sorted(date_to_prices.items())}
+
+
+def save_items_daily_prices(items: list[AnyItem], items_daily_prices: list[dict[date, float]], language: str):
+    """
+    Save items names (creating missing items) and upsert their daily prices to the database
+
+    :param items: items
+    :param items_daily_prices: each item's map of date to price
+    :param language: language of the items names (see db.constants.ITEM_NAME_COLUMNS)
+
+    :returns: nothing
+    """
+    # NOTE: imported here, so sqlalchemy is only imported when prices are saved
+    from db import metadata
+    from db.utils import save_item_names, upsert_item_prices
+
+    session = metadata.sip_sessionmaker()
+    save_item_names(
+        [{"market_hash_name": item.market_hash_name, "app_id": item.app_id, "name": item.name} for item in items],
+        language,
+        session,
+    )
+    upsert_item_prices(
+        [
+            {"item_id": item.market_hash_name, "date": price_date, "price_usd": price}
+            for item, daily_prices in zip(items, items_daily_prices)
+            for price_date, price in daily_prices.items()
+        ],
+        session,
+    )
+    session.commit()
+    session.close()
+
+
+async def backfill_items_price_history(
+    steam_api: SteamAPI,
+    items: list[AnyItem],
+    language: str,
+    since: date | None = None,
+    limiter: RateLimiter | None = None,
+) -> int:
+    """
+    Save each item's whole price history (one median price per day) to the database.
+    Items are saved one by one, so an interrupted backfill keeps what was already saved.
+
+    :param steam_api: steam api to request price histories with
+    :param items: items to backfill
+    :param language: language of the items names (see db.constants.ITEM_NAME_COLUMNS)
+    :param since: ignore prices before this date. if not provided, the whole history is saved
+    :param limiter: rate limiter. if not provided, one paced by the steam api request interval is used
+
+    :returns: amount of saved prices
+    """
+    limiter = limiter or RateLimiter(steam_api.request_interval)
+    saved_prices = 0
+    for index, item in enumerate(items):
+        await limiter.acquire()
+        try:
+            price_history = await steam_api.items.get_item_price_history(item)
+        except SteamItemsAPIException as exc:
+            exc.log()
+            continue
+        daily_prices = get_daily_median_prices(price_history, since)
+        await asyncio.to_thread(save_items_daily_prices, [item], [daily_prices], language)
+        saved_prices += len(daily_prices)
+        print(f"Backfilled item {index + 1}/{len(items)}: {item.name} ({len(daily_prices)} days)")
+    return saved_prices
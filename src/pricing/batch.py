@@ -0,0 +1,77 @@
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from models.items import Item, ItemWithPrice
+from pricing.constants import DEFAULT_CURRENCY
+from pricing.names import ItemNameResolver
+from pricing.selection import SelectionRules
+
+
+async def get_users_items(
+    steam_api: SteamAPI,
+    steam_id_to_app_ids: dict[int, list[int]],
+    language: str = "english",
+    selection_rules: SelectionRules | None = None,
+    name_resolver: ItemNameResolver | None = None,
+) -> dict[int, list[Item]]:
+    """
+    Get the marketable items of many users
+
+    :param steam_api: steam api to request inventories with
+    :param steam_id_to_app_ids: map of each steam user id to the app ids to get items from
+    :param language: which language we should display the item names in
+    :param selection_rules: if provided, only the items they select are kept
+    :param name_resolver: if provided, inventories are fetched in english only and names are localized by it
+        (language is ignored). names resolved for a user are reused for the next ones
+
+    :returns: map of each steam user id to its items, sorted by app and name
+    """
+    description_filter = selection_rules.is_selected if selection_rules else None
+    steam_id_to_items: dict[int, list[Item]] = {}
+    for steam_id, app_ids in steam_id_to_app_ids.items():
+        user_items: list[Item] = []
+        for app_id in app_ids:
+            if name_resolver is not None:
+                user_items.extend(
+                    await name_resolver.get_user_app_items(steam_api, steam_id, app_id, description_filter)
+                )
+            else:
+                user_items.extend(
+                    await steam_api.inventory.get_user_app_items(steam_id, app_id, language, description_filter)
+                )
+        steam_id_to_items[steam_id] = sorted(user_items, key=lambda item: f"{item.app_id}-{item.name}")
+    return steam_id_to_items
+
+
+async def add_users_items_price(
+    steam_api: SteamAPI,
+    steam_id_to_items: dict[int, list[Item]],
+    currency: str = CURRENCIES[DEFAULT_CURRENCY],
+    price_source: str = "html",
+    retrieve_mode: str = "serialized",
+) -> dict[int, list[ItemWithPrice]]:
+    """
+    Price the items of many users, requesting the price of each distinct item only once.
+    The amount of price requests scales with the amount of distinct items, not with users x items.
+
+    :param steam_api: steam api to request prices with
+    :param steam_id_to_items: map of each steam user id to its items
+    :param currency: currency to retrieve the price
+    :param price_source: which source to retrieve the item price from. One of "overview", "history", "html", "histogram"
+    :param retrieve_mode: how to request prices. One of "serialized", "concurrently" or "search"
+
+    :returns: map of each steam user id to its items with price
+    """
+    # flatten all users items, keeping track of where each user's items are
+    all_items: list[Item] = []
+    steam_id_to_items_slice: dict[int, slice] = {}
+    for steam_id, items in steam_id_to_items.items():
+        steam_id_to_items_slice[steam_id] = slice(len(all_items), len(all_items) + len(items))
+        all_items.extend(items)
+
+    unique_items_amount = len({(item.app_id, item.market_hash_name) for item in all_items})
+    print(f"Pricing {unique_items_amount} distinct items of {len(all_items)} items from {len(steam_id_to_items)} users")
+    all_items_with_price = await steam_api.items.add_unique_items_price(
+        all_items, currency, price_source, retrieve_mode
+    )
+
+    return {steam_id: all_items_with_price[items_slice] for steam_id, items_slice in steam_id_to_items_slice.items()}
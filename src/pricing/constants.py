@@ -0,0 +1,28 @@
+# NOTE: this module must stay free of heavy imports, since the sip cli reads it to build its arguments
+
+# currency exchange rates are quoted against, and item prices are saved to the database in
+BASE_CURRENCY = "USD"
+
+# currency items are requested in by default, and of workbooks with no currency recorded (all priced in BRL).
+# a workbook is always priced in a single currency, every other currency is converted locally
+DEFAULT_CURRENCY = "BRL"
+
+FX_RATES_FILE = "fx_rates.json"
+
+FX_RATES_MAX_AGE_HOURS = 24
+
+# amount of most recent sheets used to estimate each item's price volatility
+HISTORY_SHEETS = 7
+
+# min minutes between two refreshes of the same item (also how long a failing item waits to be retried)
+MIN_REFRESH_MINUTES = 60
+
+# minutes between exports of all current prices (e.g. to the workbook)
+EXPORT_INTERVAL_MINUTES = 60
+
+# daemon control server binds to localhost only
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 8787
+
+# items price histories, memory-mapped for offline valuation
+PRICE_HISTORY_INDEX_FILE = "price_history.idx"
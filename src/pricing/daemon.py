@@ -0,0 +1,261 @@
+import asyncio
+import json
+from time import time
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from external_apis.steam.rate_limiter import RateLimiter
+from models.items import ItemWithPrice
+from pricing.constants import CONTROL_HOST, CONTROL_PORT, DEFAULT_CURRENCY, EXPORT_INTERVAL_MINUTES, MIN_REFRESH_MINUTES
+from pricing.scheduler import PriceRefreshScheduler
+from pricing.sinks import PricedItemsSink
+
+# seconds to wait for a refresh request when no item is due
+IDLE_WAIT_SECONDS = 10
+
+HTTP_REASONS = {200: "OK", 202: "Accepted", 404: "Not Found", 405: "Method Not Allowed", 400: "Bad Request"}
+
+
+class PriceRefreshDaemon:
+    """
+    Keep items prices fresh with a single long-lived Steam client and rate limiter.
+
+    Items are refreshed as fast as the limiter allows (one refresh loop per steam api egress),
+    highest impact first (see PriceRefreshScheduler).
+    Refresh requests made through the control server jump ahead of scheduled items.
+    """
+
+    def __init__(
+        self,
+        steam_api: SteamAPI,
+        items: list[ItemWithPrice],
+        sinks: list[PricedItemsSink],
+        scheduler: PriceRefreshScheduler | None = None,
+        limiter: RateLimiter | None = None,
+        currency: str = CURRENCIES[DEFAULT_CURRENCY],
+        price_source: str = "html",
+        min_refresh_minutes: float = MIN_REFRESH_MINUTES,
+        export: Callable[[list[ItemWithPrice]], None] | None = None,
+        export_interval_minutes: float = EXPORT_INTERVAL_MINUTES,
+    ):
+        self.steam_api = steam_api
+        self.items = {item.market_hash_name: item for item in items}
+        self.sinks = sinks
+        self.scheduler = scheduler or PriceRefreshScheduler()
+        self.limiter = limiter or RateLimiter(steam_api.request_interval)
+        self.currency = currency
+        self.price_source = price_source
+        self.min_refresh_minutes = min_refresh_minutes
+        self.export = export
+        self.export_interval_minutes = export_interval_minutes
+
+        self.refresh_queue: asyncio.Queue[str] = asyncio.Queue()
+        self.last_attempt: dict[str, float] = {}
+        self.started_at = time()
+        self.refreshed_count = 0
+        self.failed_count = 0
+        self.last_export: float | None = None
+
+    def get_next_item(self) -> ItemWithPrice | None:
+        """
+        Get the item with the highest impact among the ones not attempted in the last min_refresh_minutes
+
+        :returns: item to be refreshed, or None if every item was attempted recently
+        """
+        self.scheduler.now = time()
+        min_attempt = self.scheduler.now - self.min_refresh_minutes * 60
+        candidates = [item for name, item in self.items.items() if self.last_attempt.get(name, 0) < min_attempt]
+        item = max(candidates, key=self.scheduler.get_impact, default=None)
+        if item is not None:
+            # mark it right away, so other refresh loops don't pick it too
+            self.last_attempt[item.market_hash_name] = self.scheduler.now
+        return item
+
+    async def refresh_item(self, item: ItemWithPrice) -> ItemWithPrice:
+        """
+        Refresh an item's price and write it to the sinks. A failed refresh keeps the last price, flagged as stale
+
+        :param item: item to be refreshed
+
+        :returns: refreshed item
+        """
+        self.last_attempt[item.market_hash_name] = time()
+        await self.limiter.acquire()
+        item_with_price = await self.steam_api.items.add_price_to_item(item, self.currency, self.price_source)
+        if item_with_price.api_error == "yes" and item.price_unitary is not None:
+            self.failed_count += 1
+            item_with_price = item.model_copy(update={"price_stale": "yes"})
+        else:
+            self.refreshed_count += 1
+            for sink in self.sinks:
+                await sink.write([item_with_price])
+        self.items[item.market_hash_name] = item_with_price
+        print(f"Refreshed {item_with_price.name}: {item_with_price.price_unitary}")
+        return item_with_price
+
+    async def _refresh_loop(self):
+        """
+        Refresh items forever: requested items first, then the scheduled ones
+
+        :returns: nothing
+        """
+        while True:
+            if not self.refresh_queue.empty():
+                item = self.items.get(self.refresh_queue.get_nowait())
+            else:
+                item = self.get_next_item()
+            if item is None:
+                # nothing to do, wait for a refresh request (or for items to be due again)
+                try:
+                    name = await asyncio.wait_for(self.refresh_queue.get(), IDLE_WAIT_SECONDS)
+                    item = self.items.get(name)
+                except asyncio.TimeoutError:
+                    continue
+            if item is not None:
+                await self.refresh_item(item)
+
+    async def _export_loop(self):
+        """
+        Export all current prices every export_interval_minutes
+
+        :returns: nothing
+        """
+        while True:
+            await asyncio.sleep(self.export_interval_minutes * 60)
+            await self.export_items()
+
+    async def export_items(self):
+        """
+        Export all current prices (on a thread, so the refresh loop is not blocked)
+
+        :returns: nothing
+        """
+        items = sorted(self.items.values(), key=lambda item: f"{item.app_id}-{item.name}")
+        await asyncio.to_thread(self.export, items)
+        self.last_export = time()
+
+    def get_status(self) -> dict:
+        """
+        Get the daemon status
+
+        :returns: status dict
+        """
+        now = time()
+        prices_age_hours = [(now - item.price_date_timestamp) / 3600 for item in self.items.values()]
+        return {
+            "uptime_seconds": int(now - self.started_at),
+            "items": len(self.items),
+            "refreshed": self.refreshed_count,
+            "failed": self.failed_count,
+            "pending_requests": self.refresh_queue.qsize(),
+            "stale_items": sum(item.price_stale == "yes" for item in self.items.values()),
+            "max_price_age_hours": round(max(prices_age_hours, default=0), 2),
+            "requests_per_minute": round(60 / self.limiter.interval, 2) if self.limiter.interval else None,
+            "egresses": self.steam_api.get_egresses_status(),
+            "transport": self.steam_api.metrics.get_status(),
+            "last_export": self.last_export,
+        }
+
+    def request_refresh(self, market_hash_names: list[str]) -> list[str]:
+        """
+        Queue items to be refreshed before the scheduled ones
+
+        :param market_hash_names: items to be refreshed. unknown items are ignored
+
+        :returns: queued items
+        """
+        queued = [name for name in market_hash_names if name in self.items]
+        for name in queued:
+            self.refresh_queue.put_nowait(name)
+        return queued
+
+    async def handle_control_request(self, method: str, target: str) -> tuple[int, dict]:
+        """
+        Handle a control request. Routes:
+            GET /status
+            POST /refresh?market_hash_name=<name>[&market_hash_name=<name>...]
+            POST /export
+
+        :param method: http method
+        :param target: request target (path and query)
+
+        :returns: http status code and json body
+        """
+        url = urlsplit(target)
+        routes = {"/status": "GET", "/refresh": "POST", "/export": "POST"}
+        if url.path not in routes:
+            return 404, {"error": f"Unknown path {url.path}"}
+        if method != routes[url.path]:
+            return 405, {"error": f"Use {routes[url.path]} {url.path}"}
+
+        if url.path == "/status":
+            return 200, self.get_status()
+        if url.path == "/refresh":
+            market_hash_names = parse_qs(url.query).get("market_hash_name", [])
+            if not market_hash_names:
+                return 400, {"error": "Provide at least one market_hash_name"}
+            return 202, {"queued": self.request_refresh(market_hash_names)}
+        if self.export is None:
+            return 400, {"error": "No export configured"}
+        await self.export_items()
+        return 200, {"exported": len(self.items)}
+
+    async def _handle_control_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Read one http request from the connection and answer it with json
+
+        :param reader: connection reader
+        :param writer: connection writer
+
+        :returns: nothing
+        """
+        try:
+            request_line = (await reader.readline()).decode().split()
+            # skip headers, no request handled here has a body
+            while (await reader.readline()).strip():
+                pass
+            if len(request_line) != 3:
+                status_code, body = 400, {"error": "Malformed request"}
+            else:
+                status_code, body = await self.handle_control_request(request_line[0], request_line[1])
+            content = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status_code} {HTTP_REASONS[status_code]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode()
+                + content
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def run(self, host: str = CONTROL_HOST, port: int | None = CONTROL_PORT):
+        """
+        Run the daemon until cancelled, then flush the sinks, export prices and close the steam client
+
+        :param host: control server host
+        :param port: control server port. if None, no control server is started
+
+        :returns: nothing
+        """
+        server = None
+        if port is not None:
+            server = await asyncio.start_server(self._handle_control_connection, host, port)
+            print(f"Control server listening on http://{host}:{port}")
+
+        tasks = [asyncio.ensure_future(self._refresh_loop()) for _ in range(self.steam_api.concurrency)]
+        if self.export is not None:
+            tasks.append(asyncio.ensure_future(self._export_loop()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if server is not None:
+                server.close()
+            for sink in self.sinks:
+                await sink.close()
+            if self.export is not None:
+                await self.export_items()
+            await self.steam_api.aclose()
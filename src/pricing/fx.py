@@ -0,0 +1,189 @@
+import asyncio
+import json
+from statistics import median
+from time import time
+
+from pydantic import BaseModel
+
+from external_apis.steam.constants import CURRENCIES, REQUEST_AWAIT_INTERVAL
+from external_apis.steam.exceptions import SteamItemsAPIException
+from external_apis.steam.items import SteamItemsAPI
+from models.items import Item
+from pricing.constants import BASE_CURRENCY, DEFAULT_CURRENCY, FX_RATES_FILE, FX_RATES_MAX_AGE_HOURS
+
+# liquid items, priced in every currency to derive exchange rates from
+FX_REFERENCE_ITEMS = [
+    Item(app_id=730, name="Revolution Case", amount=1, market_hash_name="Revolution Case"),
+    Item(app_id=730, name="Recoil Case", amount=1, market_hash_name="Recoil Case"),
+    Item(app_id=730, name="Dreams & Nightmares Case", amount=1, market_hash_name="Dreams & Nightmares Case"),
+]
+
+
+class FxRates(BaseModel):
+    base: str = BASE_CURRENCY
+    rates: dict[str, float]  # amount of each currency that one base currency unit buys
+    updated_at: int  # timestamp
+
+    @classmethod
+    def load(cls, path: str) -> "FxRates | None":
+        """
+        Load rates from a json file
+
+        :param path: rates file path
+
+        :returns: rates, or None if the file doesn't exist
+        """
+        try:
+            with open(path) as rates_file:
+                return cls.model_validate(json.load(rates_file))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str):
+        """
+        Save rates to a json file
+
+        :param path: rates file path
+
+        :returns: nothing
+        """
+        with open(path, "w") as rates_file:
+            json.dump(self.model_dump(), rates_file, indent=2)
+
+    def is_usable(self, currencies: list[str], max_age_hours: float | None) -> bool:
+        """
+        Check if rates have all currencies and are recent enough
+
+        :param currencies: currencies that must have a rate
+        :param max_age_hours: max age of the rates. if None, rates never expire
+
+        :returns: True if rates can be used
+        """
+        if any(currency not in self.rates for currency in currencies):
+            return False
+        return max_age_hours is None or time() - self.updated_at <= max_age_hours * 3600
+
+    def get_rates(self, currencies: list[str], base: str = BASE_CURRENCY) -> dict[str, float]:
+        """
+        Get the rates of the given currencies
+
+        :param currencies: currencies to get rates of
+        :param base: currency rates are quoted against (must have a rate too)
+
+        :returns: currency to rate map (amount of each currency that one base unit buys)
+        """
+        return {currency: self.rates[currency] / self.rates[base] for currency in currencies}
+
+
+async def derive_fx_rates(
+    steam_items_api: SteamItemsAPI, currencies: list[str], reference_items: list[Item] = FX_REFERENCE_ITEMS
+) -> FxRates:
+    """
+    Derive exchange rates by pricing reference items in the base currency and in each currency.
+    Each rate is the median of the reference items price ratios.
+
+    :param steam_items_api: steam items api to request prices with
+    :param currencies: currencies to derive rates of
+    :param reference_items: items to be priced in each currency
+
+    :returns: exchange rates
+    """
+    price_getter = steam_items_api.get_item_price_getter("overview")
+    currency_to_ratios: dict[str, list[float]] = {currency: [] for currency in currencies}
+    for item in reference_items:
+        try:
+            base_price = await price_getter(item=item, currency=CURRENCIES[BASE_CURRENCY])
+        except SteamItemsAPIException as exc:
+            exc.log()
+            continue
+        finally:
+            await asyncio.sleep(REQUEST_AWAIT_INTERVAL)
+
+        for currency in currencies:
+            try:
+                price = await price_getter(item=item, currency=CURRENCIES[currency])
+                currency_to_ratios[currency].append(price / base_price)
+            except SteamItemsAPIException as exc:
+                exc.log()
+            finally:
+                await asyncio.sleep(REQUEST_AWAIT_INTERVAL)
+
+    missing_currencies = [currency for currency, ratios in currency_to_ratios.items() if not ratios]
+    if missing_currencies:
+        raise ValueError(f"Could not derive exchange rates for {missing_currencies}")
+
+    return FxRates(
+        rates={BASE_CURRENCY: 1.0} | {currency: median(ratios) for currency, ratios in currency_to_ratios.items()},
+        updated_at=int(time()),
+    )
+
+
+async def get_fx_rates(
+    steam_items_api: SteamItemsAPI,
+    currencies: list[str],
+    path: str = FX_RATES_FILE,
+    max_age_hours: float | None = FX_RATES_MAX_AGE_HOURS,
+) -> FxRates:
+    """
+    Get exchange rates from the rates file, deriving (and caching) them again only if needed
+
+    :param steam_items_api: steam items api to request prices with
+    :param currencies: currencies that must have a rate
+    :param path: rates file path
+    :param max_age_hours: max age of cached rates. if None, cached rates never expire
+
+    :returns: exchange rates
+    """
+    fx_rates = FxRates.load(path)
+    if fx_rates and fx_rates.is_usable(currencies, max_age_hours):
+        return fx_rates
+
+    quoted_currencies = [currency for currency in currencies if currency != BASE_CURRENCY]
+    fx_rates = await derive_fx_rates(steam_items_api, quoted_currencies)
+    fx_rates.save(path)
+    return fx_rates
+
+
+async def get_currency_rates(
+    steam_items_api: SteamItemsAPI, currency: str, currencies: list[str], path: str = FX_RATES_FILE
+) -> dict[str, float]:
+    """
+    Get the rates to convert prices from a currency to others, without any request if no rate is needed
+
+    :param steam_items_api: steam items api to request prices with
+    :param currency: currency prices are in
+    :param currencies: currencies to convert prices to
+    :param path: rates file path
+
+    :returns: currency to rate map (amount of each currency that one unit of currency buys)
+    """
+    if all(quoted_currency == currency for quoted_currency in currencies):
+        return {quoted_currency: 1.0 for quoted_currency in currencies}
+    fx_rates = await get_fx_rates(steam_items_api, [currency, *currencies], path)
+    return fx_rates.get_rates(currencies, currency)
+
+
+def get_workbook_currency(excel_file_name: str, currency: str | None = None) -> str:
+    """
+    Get the currency to price a workbook in, so a workbook never mixes prices in different currencies.
+    Workbooks with no currency recorded were priced in DEFAULT_CURRENCY
+
+    :param excel_file_name: workbook file name
+    :param currency: requested currency. if None, the workbook's currency (DEFAULT_CURRENCY for new workbooks)
+
+    :returns: currency
+    :raises ValueError: if the workbook is priced in another currency
+    """
+    # NOTE: imported here, so pandas is only imported when a workbook is read
+    from data_readers.excel_reader import ExcelReader
+
+    try:
+        workbook_currency = ExcelReader(excel_file_name).get_currency() or DEFAULT_CURRENCY
+    except FileNotFoundError:
+        return currency or DEFAULT_CURRENCY
+    if currency is not None and currency != workbook_currency:
+        raise ValueError(
+            f"{excel_file_name} is priced in {workbook_currency}, it can't be priced in {currency}."
+            f" Add --currencies {currency} to export prices in it too, or use a new workbook"
+        )
+    return workbook_currency
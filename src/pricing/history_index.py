@@ -0,0 +1,219 @@
+import asyncio
+import os
+import struct
+from datetime import date, datetime, time, timezone
+from typing import Iterable
+
+import numpy as np
+
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.exceptions import SteamItemsAPIException
+from external_apis.steam.rate_limiter import RateLimiter
+from models.batch import ItemBatch
+from models.items import AnyItem
+from pricing.constants import PRICE_HISTORY_INDEX_FILE
+
+# file layout: header | item names (utf-8, "\n" separated, padded to 8 bytes) | offsets (int64, items + 1)
+#              | timestamps (int64, points) | prices (float64, points)
+# item i points are at [offsets[i], offsets[i + 1]), sorted by timestamp
+HEADER_FORMAT = "<8sQQQ"  # magic, items amount, points amount, names size in bytes
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = b"SIPPHX01"
+
+
+def _padded(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+def write_price_history_index(path: str, items_price_history: dict[str, list[tuple[int, float]]]):
+    """
+    Write items price histories to an index file (replacing it atomically, if it exists)
+
+    :param path: index file path
+    :param items_price_history: map of item market_hash_name to its list of (timestamp, price)
+
+    :returns: nothing
+    """
+    names = list(items_price_history)
+    names_bytes = "\n".join(names).encode()
+    lengths = [len(items_price_history[name]) for name in names]
+    offsets = np.zeros(len(names) + 1, dtype="<i8")
+    np.cumsum(lengths, out=offsets[1:])
+
+    timestamps = np.empty(offsets[-1], dtype="<i8")
+    prices = np.empty(offsets[-1], dtype="<f8")
+    for index, name in enumerate(names):
+        price_history = sorted(items_price_history[name])
+        start, end = offsets[index], offsets[index + 1]
+        timestamps[start:end] = [timestamp for timestamp, _ in price_history]
+        prices[start:end] = [price for _, price in price_history]
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as index_file:
+        index_file.write(struct.pack(HEADER_FORMAT, MAGIC, len(names), len(timestamps), len(names_bytes)))
+        index_file.write(names_bytes.ljust(_padded(len(names_bytes)), b"\0"))
+        index_file.write(offsets.tobytes())
+        index_file.write(timestamps.tobytes())
+        index_file.write(prices.tobytes())
+    os.replace(temporary_path, path)
+
+
+def get_end_of_day_timestamp(day: date) -> int:
+    """
+    Get the last second of a day (UTC), so prices "as of" a day include all of that day's prices
+
+    :param day: date
+
+    :returns: timestamp
+    """
+    return int(datetime.combine(day, time.max, timezone.utc).timestamp())
+
+
+class PriceHistoryIndex:
+    """
+    Read-only, memory-mapped items price histories.
+    The price of an item as of a date is a binary search on the item's timestamps, so valuing a whole
+    portfolio on any past date needs neither the network nor the database.
+    """
+
+    def __init__(self, path: str = PRICE_HISTORY_INDEX_FILE):
+        self.path = path
+        with open(path, "rb") as index_file:
+            magic, items_amount, points_amount, names_size = struct.unpack(HEADER_FORMAT, index_file.read(HEADER_SIZE))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a price history index")
+            names = index_file.read(names_size).decode().split("\n") if items_amount else []
+
+        offsets_start = HEADER_SIZE + _padded(names_size)
+        timestamps_start = offsets_start + (items_amount + 1) * 8
+        prices_start = timestamps_start + points_amount * 8
+        self.name_to_index = {name: index for index, name in enumerate(names)}
+        self.offsets = np.memmap(path, dtype="<i8", mode="r", offset=offsets_start, shape=(items_amount + 1,))
+        # numpy can't memory-map empty arrays
+        if points_amount:
+            self.timestamps = np.memmap(path, dtype="<i8", mode="r", offset=timestamps_start, shape=(points_amount,))
+            self.prices = np.memmap(path, dtype="<f8", mode="r", offset=prices_start, shape=(points_amount,))
+        else:
+            self.timestamps = np.empty(0, dtype="<i8")
+            self.prices = np.empty(0, dtype="<f8")
+
+    def __len__(self) -> int:
+        return len(self.name_to_index)
+
+    def __contains__(self, market_hash_name: str) -> bool:
+        return market_hash_name in self.name_to_index
+
+    def get_price_history(self, market_hash_name: str) -> list[tuple[int, float]]:
+        """
+        Get an item's whole price history
+
+        :param market_hash_name: item market_hash_name
+
+        :returns: list of (timestamp, price), from oldest to most recent. empty if the item is not indexed
+        """
+        index = self.name_to_index.get(market_hash_name)
+        if index is None:
+            return []
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return list(zip(self.timestamps[start:end].tolist(), self.prices[start:end].tolist()))
+
+    def get_price(self, market_hash_name: str, timestamp: int) -> float | None:
+        """
+        Get an item's most recent price at a timestamp
+
+        :param market_hash_name: item market_hash_name
+        :param timestamp: point in time
+
+        :returns: price, or None if the item is not indexed or has no price before timestamp
+        """
+        index = self.name_to_index.get(market_hash_name)
+        if index is None:
+            return None
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        position = start + int(np.searchsorted(self.timestamps[start:end], timestamp, side="right")) - 1
+        return float(self.prices[position]) if position >= start else None
+
+    def get_prices(self, market_hash_names: list[str], day: date) -> list[float | None]:
+        """
+        Get many items price as of the end of a day
+
+        :param market_hash_names: items market_hash_name
+        :param day: date
+
+        :returns: each item's price (None if unknown)
+        """
+        timestamp = get_end_of_day_timestamp(day)
+        return [self.get_price(market_hash_name, timestamp) for market_hash_name in market_hash_names]
+
+    def value_items(self, items: Iterable[AnyItem], day: date) -> ItemBatch:
+        """
+        Price items as of the end of a day (e.g. to rebuild a past sheet or run what-if valuations)
+
+        :param items: items to be priced
+        :param day: date
+
+        :returns: items with price. items without a price on that day are flagged as api errors
+        """
+        items = list(items)
+        prices = self.get_prices([item.market_hash_name for item in items], day)
+        return ItemBatch.from_columns(
+            {
+                "app_id": [item.app_id for item in items],
+                "name": [item.name for item in items],
+                "price_unitary": prices,
+                "amount": [item.amount for item in items],
+                "api_error": ["yes" if price is None else "no" for price in prices],
+                "price_date": [day.isoformat()] * len(items),
+                "price_date_timestamp": [get_end_of_day_timestamp(day)] * len(items),
+                "market_hash_name": [item.market_hash_name for item in items],
+            }
+        )
+
+    def get_portfolio_value(self, items: Iterable[AnyItem], day: date) -> float:
+        """
+        Get the total value of items as of the end of a day. Items without a price on that day are ignored
+
+        :param items: items
+        :param day: date
+
+        :returns: total value
+        """
+        items = list(items)
+        prices = self.get_prices([item.market_hash_name for item in items], day)
+        return sum(price * item.amount for item, price in zip(items, prices) if price is not None)
+
+
+async def build_price_history_index(
+    steam_api: SteamAPI,
+    items: list[AnyItem],
+    path: str = PRICE_HISTORY_INDEX_FILE,
+    limiter: RateLimiter | None = None,
+) -> int:
+    """
+    Download each item's whole price history from its market listing and write them to an index file.
+    Items already on an existing index are kept (e.g. indexed from other workbooks), and the downloaded items
+    replace their previous history, which is only kept if downloading it again fails.
+
+    :param steam_api: steam api to request price histories with
+    :param items: items to be indexed
+    :param path: index file path
+    :param limiter: rate limiter. if not provided, one paced by the steam api request interval is used
+
+    :returns: amount of items on the index
+    """
+    items_price_history: dict[str, list[tuple[int, float]]] = {}
+    if os.path.exists(path):
+        previous_index = PriceHistoryIndex(path)
+        items_price_history = {name: previous_index.get_price_history(name) for name in previous_index.name_to_index}
+    limiter = limiter or RateLimiter(steam_api.request_interval)
+    unique_items = {item.market_hash_name: item for item in items}
+    for position, item in enumerate(unique_items.values()):
+        await limiter.acquire()
+        try:
+            items_price_history[item.market_hash_name] = await steam_api.items.get_item_price_history(item)
+        except SteamItemsAPIException as exc:
+            exc.log()
+        print(f"Downloaded price history {position + 1}/{len(unique_items)}: {item.name}")
+
+    await asyncio.to_thread(write_price_history_index, path, items_price_history)
+    return len(items_price_history)
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Callable
+
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.models import InventoryDescription
+from models.items import Item
+
+# language inventories are fetched in. its names are saved as the item english names (item.name_en)
+INVENTORY_LANGUAGE = "english"
+
+
+class ItemNameResolver:
+    """
+    Localize item names with the item table (market_hash_name -> name in each language) as a cache.
+    Inventories are fetched only once, in english, and names in other languages come from the cache.
+    A user's inventory is fetched again in the requested language only when it has items whose names were never
+    seen in that language, which fetches all of its missing names at once (and saves them for the next runs).
+    Database calls run on a thread, so they don't block the event loop.
+    """
+
+    def __init__(self, language: str):
+        self.language = language
+        self.names: dict[str, str] = {}  # names in the requested language already read or fetched on this run
+
+    def _save_names(self, items: list[Item], language: str):
+        """
+        Save items names in a language to the item table
+
+        :param items: items, named in that language
+        :param language: names language
+
+        :returns: nothing
+        """
+        # NOTE: imported here, so sqlalchemy is only imported when names are resolved through the database
+        from db.utils import save_item_names
+
+        save_item_names(
+            [{"market_hash_name": item.market_hash_name, "app_id": item.app_id, "name": item.name} for item in items],
+            language,
+        )
+
+    def _get_names(self, market_hash_names: list[str]) -> dict[str, str]:
+        """
+        Read items names in the requested language from the item table
+
+        :param market_hash_names: items market_hash_name
+
+        :returns: map of market_hash_name to name, only for items with a name in the requested language
+        """
+        # NOTE: imported here, so sqlalchemy is only imported when names are resolved through the database
+        from db.queries import get_item_names
+
+        return get_item_names(market_hash_names, self.language)
+
+    async def get_user_app_items(
+        self,
+        steam_api: SteamAPI,
+        steam_user_id: int,
+        app_id: int,
+        description_filter: Callable[[InventoryDescription], bool] | None = None,
+    ) -> list[Item]:
+        """
+        Get all user's marketable items for a given app, named in the requested language
+
+        :param steam_api: steam api to request inventories with
+        :param steam_user_id: steam user id
+        :param app_id: app id
+        :param description_filter: if provided, only items it accepts are kept (e.g. SelectionRules.is_selected)
+
+        :returns: user's marketable app's items
+        """
+        items = await steam_api.inventory.get_user_app_items(
+            steam_user_id, app_id, INVENTORY_LANGUAGE, description_filter
+        )
+        await asyncio.to_thread(self._save_names, items, INVENTORY_LANGUAGE)
+        if self.language == INVENTORY_LANGUAGE:
+            return items
+
+        # read names not seen on this run from the cache
+        unseen_names = [item.market_hash_name for item in items if item.market_hash_name not in self.names]
+        if unseen_names:
+            self.names.update(await asyncio.to_thread(self._get_names, unseen_names))
+
+        # fetch names never seen in the requested language with a single inventory request
+        if any(item.market_hash_name not in self.names for item in items):
+            localized_items = await steam_api.inventory.get_user_app_items(
+                steam_user_id, app_id, self.language, description_filter
+            )
+            await asyncio.to_thread(self._save_names, localized_items, self.language)
+            self.names.update({item.market_hash_name: item.name for item in localized_items})
+
+        return [item.model_copy(update={"name": self.names.get(item.market_hash_name, item.name)}) for item in items]
@@ -0,0 +1,178 @@
+import asyncio
+from time import monotonic
+from typing import AsyncIterator, Iterable
+
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from external_apis.steam.rate_limiter import RateLimiter
+from models.items import AnyItem, ItemWithPrice
+from pricing.constants import DEFAULT_CURRENCY
+from pricing.names import ItemNameResolver
+from pricing.selection import SelectionRules, carry_cached_item
+from pricing.sinks import PricedItemsSink
+
+# max amount of items waiting on each queue. a full queue blocks its producer (backpressure)
+QUEUE_SIZE = 100
+
+# amount of priced items written to sinks at once
+SINK_BATCH_SIZE = 10
+
+
+async def get_inventory_items(
+    steam_api: SteamAPI,
+    steam_id: int,
+    app_ids: list[int],
+    language: str = "english",
+    selection_rules: SelectionRules | None = None,
+    cached_items: dict[str, ItemWithPrice] | None = None,
+    name_resolver: ItemNameResolver | None = None,
+    carried_items: list[ItemWithPrice] | None = None,
+) -> AsyncIterator[AnyItem]:
+    """
+    Yield a user's marketable items, app by app, as soon as each app inventory is fetched
+
+    :param steam_api: steam api to request inventories with
+    :param steam_id: steam user id
+    :param app_ids: app ids to get items from
+    :param language: which language we should display the item names in
+    :param selection_rules: if provided, only the items they select are yielded
+    :param cached_items: last priced item of each item (by market_hash_name), for the rules min value
+    :param name_resolver: if provided, inventories are fetched in english only and names are localized by it
+        (language is ignored)
+    :param carried_items: if provided, items worth less than the rules min value are appended to it at their last
+        price, flagged as stale (instead of being left out of the sheet)
+
+    :returns: items async generator
+    """
+    description_filter = selection_rules.is_selected if selection_rules else None
+    for app_id in app_ids:
+        if name_resolver is not None:
+            app_items = await name_resolver.get_user_app_items(steam_api, steam_id, app_id, description_filter)
+        else:
+            app_items = await steam_api.inventory.get_user_app_items(steam_id, app_id, language, description_filter)
+        for item in app_items:
+            if selection_rules is None or selection_rules.has_min_value(item, cached_items or {}):
+                yield item
+            elif carried_items is not None:
+                carried_items.append(carry_cached_item(item, cached_items[item.market_hash_name]))
+
+
+class StreamingPricingPipeline:
+    """
+    Price items as a stream: items -> pricing workers -> sinks, connected by bounded queues.
+    Sinks receive priced items while the remaining ones are still being priced, and the queues bound how many
+    items are waiting to be priced or written (backpressure). Priced items are still all kept, since run returns
+    them, and sinks may keep them too (e.g. ExcelSink holds the whole sheet until it closes).
+    """
+
+    def __init__(
+        self,
+        steam_api: SteamAPI,
+        sinks: list[PricedItemsSink],
+        workers: int | None = None,
+        limiter: RateLimiter | None = None,
+        currency: str = CURRENCIES[DEFAULT_CURRENCY],
+        price_source: str = "html",
+        queue_size: int = QUEUE_SIZE,
+        deadline: float | None = None,
+    ):
+        self.steam_api = steam_api
+        self.sinks = sinks
+        # by default, use as many workers (and as fast a limiter) as the steam api egresses allow
+        self.workers = workers or steam_api.concurrency
+        self.limiter = limiter or RateLimiter(steam_api.request_interval)
+        self.currency = currency
+        self.price_source = price_source
+        self.queue_size = queue_size
+        self.deadline = deadline  # monotonic time after which items are no longer priced
+
+    async def _produce(self, items: AsyncIterator[AnyItem] | Iterable[AnyItem], items_queue: asyncio.Queue):
+        """
+        Put items on the items queue, followed by one stop signal (None) per worker
+
+        :param items: items to be priced
+        :param items_queue: queue read by pricing workers
+
+        :returns: nothing
+        """
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                await items_queue.put(item)
+        else:
+            for item in items:
+                await items_queue.put(item)
+        for _ in range(self.workers):
+            await items_queue.put(None)
+
+    async def _price(self, items_queue: asyncio.Queue, priced_items_queue: asyncio.Queue):
+        """
+        Price items from the items queue (respecting the rate limit) and put them on the priced items queue
+        Once the deadline is reached, remaining items are drained without being priced
+
+        :param items_queue: queue with items to be priced
+        :param priced_items_queue: queue read by the sinks consumer
+
+        :returns: nothing
+        """
+        while (item := await items_queue.get()) is not None:
+            # checked before acquiring the limiter, so skipped items don't wait for a request they won't make
+            if self.deadline is not None and monotonic() >= self.deadline:
+                continue
+            await self.limiter.acquire()
+            item_with_price = await self.steam_api.items.add_price_to_item(item, self.currency, self.price_source)
+            await priced_items_queue.put(item_with_price)
+        await priced_items_queue.put(None)
+
+    async def _consume(self, priced_items_queue: asyncio.Queue) -> list[ItemWithPrice]:
+        """
+        Write priced items to every sink, in small batches, until all workers are done
+
+        :param priced_items_queue: queue with priced items
+
+        :returns: all priced items
+        """
+        priced_items: list[ItemWithPrice] = []
+        batch: list[ItemWithPrice] = []
+        finished_workers = 0
+        while finished_workers < self.workers:
+            item_with_price = await priced_items_queue.get()
+            if item_with_price is None:
+                finished_workers += 1
+            else:
+                batch.append(item_with_price)
+                priced_items.append(item_with_price)
+                print(f"Priced item {len(priced_items)}: {item_with_price.name}")
+
+            # write batch when it is full, or when the queue is drained (so sinks are never too far behind)
+            if batch and (len(batch) >= SINK_BATCH_SIZE or priced_items_queue.empty()):
+                for sink in self.sinks:
+                    await sink.write(batch)
+                batch = []
+
+        for sink in self.sinks:
+            await sink.close()
+        return priced_items
+
+    async def run(self, items: AsyncIterator[AnyItem] | Iterable[AnyItem]) -> list[ItemWithPrice]:
+        """
+        Price all items, writing them to the sinks as they are priced
+
+        :param items: items to be priced. may be an async generator (e.g. get_inventory_items)
+
+        :returns: all priced items, in the order they were priced
+        """
+        items_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        priced_items_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [
+            asyncio.ensure_future(self._produce(items, items_queue)),
+            *[asyncio.ensure_future(self._price(items_queue, priced_items_queue)) for _ in range(self.workers)],
+        ]
+        consumer = asyncio.ensure_future(self._consume(priced_items_queue))
+        try:
+            await asyncio.gather(*tasks, consumer)
+        except BaseException:
+            # one stage failed -> stop the others, since they would wait on each other forever
+            for task in [*tasks, consumer]:
+                task.cancel()
+            raise
+        return consumer.result()
@@ -0,0 +1,107 @@
+import math
+from statistics import mean, pstdev
+from time import time
+from typing import Iterable
+
+from models.items import ItemWithPrice
+
+# volatility assumed for items without enough price history (relative price change between runs)
+DEFAULT_VOLATILITY = 0.05
+
+# volatility floor, so stable items are still refreshed once they get old enough
+MIN_VOLATILITY = 0.01
+
+
+class PriceRefreshScheduler:
+    """
+    Rank items by how much refreshing their price is expected to change the portfolio value.
+
+    An item's impact is its expected absolute value error:
+        price_unitary * amount * volatility * sqrt(days since last price + 1)
+    i.e. valuable, volatile and old prices come first. Items without a price come before everything else.
+    """
+
+    def __init__(self, items_price_history: dict[str, list[float]] | None = None, now: float | None = None):
+        self.items_price_history = items_price_history or {}
+        self.now = now or time()
+
+    def get_volatility(self, item: ItemWithPrice) -> float:
+        """
+        Get the item's relative price volatility (coefficient of variation of its recent prices)
+
+        :param item: item to get volatility of
+
+        :returns: volatility
+        """
+        prices = self.items_price_history.get(item.market_hash_name, [])
+        if len(prices) < 2 or mean(prices) <= 0:
+            return DEFAULT_VOLATILITY
+        return max(pstdev(prices) / mean(prices), MIN_VOLATILITY)
+
+    def get_impact(self, item: ItemWithPrice) -> float:
+        """
+        Get the expected absolute value error of the item's current price
+
+        :param item: item to get impact of
+
+        :returns: impact (infinite for items without a price)
+        """
+        if item.price_unitary is None or item.api_error == "yes":
+            return math.inf
+        age_days = max(self.now - item.price_date_timestamp, 0) / 86400
+        return item.price_unitary * item.amount * self.get_volatility(item) * math.sqrt(age_days + 1)
+
+    def rank(self, items: Iterable[ItemWithPrice]) -> list[ItemWithPrice]:
+        """
+        Sort items from the highest to the lowest impact
+
+        :param items: items to be ranked
+
+        :returns: ranked items
+        """
+        return sorted(items, key=self.get_impact, reverse=True)
+
+    def schedule(
+        self, items: Iterable[ItemWithPrice], max_requests: int | None = None
+    ) -> tuple[list[ItemWithPrice], list[ItemWithPrice]]:
+        """
+        Split items into the ones to be refreshed (highest impact first) and the ones to carry their last price
+
+        :param items: items to be scheduled
+        :param max_requests: max amount of items to be refreshed. if not provided, refresh all items
+
+        :returns: items to be refreshed and items to be carried
+        """
+        ranked_items = self.rank(items)
+        if max_requests is None:
+            return ranked_items, []
+        return ranked_items[:max_requests], ranked_items[max_requests:]
+
+
+def get_request_budget(max_requests: int | None, deadline_minutes: float | None, request_interval: float) -> int | None:
+    """
+    Get the amount of requests that fit in both budgets
+
+    :param max_requests: max amount of requests
+    :param deadline_minutes: max amount of minutes to spend on requests
+    :param request_interval: min seconds between requests
+
+    :returns: amount of requests, or None if there is no budget
+    """
+    budgets = []
+    if max_requests is not None:
+        budgets.append(max_requests)
+    if deadline_minutes is not None:
+        budgets.append(int(deadline_minutes * 60 / request_interval))
+    return min(budgets) if budgets else None
+
+
+def carry_stale_prices(items: Iterable[ItemWithPrice]) -> list[ItemWithPrice]:
+    """
+    Flag items which price was not refreshed as stale, keeping their last known price
+
+    :param items: items that were not refreshed
+
+    :returns: stale items
+    """
+    return [item.model_copy(update={"price_stale": "yes"}) for item in items]
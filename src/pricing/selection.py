@@ -0,0 +1,130 @@
+import json
+import os
+import re
+
+from pydantic import BaseModel
+
+from external_apis.steam.models import InventoryDescription
+from models.items import AnyItem, ItemWithPrice
+from pricing.scheduler import carry_stale_prices
+
+
+class SelectionRule(BaseModel):
+    """
+    Conditions an item must meet to match the rule (all the set ones)
+    """
+
+    app_ids: set[int] | None = None
+    # any of these tags, by internal or localized name (e.g. "CSGO_Type_WeaponCase", "Container")
+    tags: set[str] | None = None
+    name_regex: re.Pattern | None = None  # searched on the item market_hash_name, e.g. "^Sticker \\|"
+    marketable: bool | None = None
+    commodity: bool | None = None
+
+    def matches(self, description: InventoryDescription) -> bool:
+        """
+        Check if an inventory item meets all of the rule conditions
+
+        :param description: inventory item description
+
+        :returns: True if it matches
+        """
+        if self.app_ids is not None and description.app_id not in self.app_ids:
+            return False
+        if self.marketable is not None and bool(description.marketable) != self.marketable:
+            return False
+        if self.commodity is not None and bool(description.commodity) != self.commodity:
+            return False
+        if self.tags is not None and not any(
+            tag.internal_name in self.tags or tag.localized_tag_name in self.tags for tag in description.tags
+        ):
+            return False
+        if self.name_regex is not None and not self.name_regex.search(description.market_hash_name):
+            return False
+        return True
+
+
+class SelectionRules(BaseModel):
+    """
+    Which inventory items are priced: items matching any include rule (every item, if there are none),
+    except the ones matching any exclude rule or worth less than min_value (by their cached price).
+    Rules are compiled once, when loaded, and applied before any price request.
+    """
+
+    include: list[SelectionRule] = []
+    exclude: list[SelectionRule] = []
+    min_value: float | None = None  # min cached price x amount. items without a cached price are kept
+
+    @classmethod
+    def load(cls, path: str) -> "SelectionRules":
+        """
+        Load rules from a json file, e.g.
+        {"include": [{"app_ids": [730]}], "exclude": [{"tags": ["Graffiti"]}], "min_value": 0.1}
+
+        :param path: rules file path
+
+        :returns: rules
+        """
+        with open(path) as rules_file:
+            return cls.model_validate(json.load(rules_file))
+
+    def is_selected(self, description: InventoryDescription) -> bool:
+        """
+        Check if an inventory item passes the include and exclude rules
+
+        :param description: inventory item description
+
+        :returns: True if the item should be priced
+        """
+        if self.include and not any(rule.matches(description) for rule in self.include):
+            return False
+        return not any(rule.matches(description) for rule in self.exclude)
+
+    def has_min_value(self, item: AnyItem, cached_items: dict[str, ItemWithPrice]) -> bool:
+        """
+        Check if an item is worth at least min_value, by its cached price
+
+        :param item: item with amount
+        :param cached_items: map of item market_hash_name to its last priced item (see get_cached_items)
+
+        :returns: True if the item should be priced
+        """
+        cached_item = cached_items.get(item.market_hash_name)
+        return (
+            self.min_value is None or cached_item is None or cached_item.price_unitary * item.amount >= self.min_value
+        )
+
+
+def carry_cached_item(item: AnyItem, cached_item: ItemWithPrice) -> ItemWithPrice:
+    """
+    Keep an item that is not priced (e.g. worth less than the rules min value) at its last known price,
+    flagged as stale, so it stays on the sheet and its totals (and is judged by the same price on the next run)
+
+    :param item: inventory item, with its current name and amount
+    :param cached_item: item's last priced item
+
+    :returns: stale item
+    """
+    return carry_stale_prices([cached_item.model_copy(update={"name": item.name, "amount": item.amount})])[0]
+
+
+def get_cached_items(excel_file_name: str) -> dict[str, ItemWithPrice]:
+    """
+    Get each item's last priced item from a spreadsheet most recent sheet (skipping api errors).
+    Items not priced because of the rules min value are carried to every sheet, so they are always found there
+
+    :param excel_file_name: spreadsheet file name
+
+    :returns: map of item market_hash_name to its item. empty if the spreadsheet doesn't exist yet
+    """
+    if not os.path.exists(excel_file_name):
+        return {}
+
+    # NOTE: imported here, so pandas is only imported when there is a spreadsheet to read
+    from data_readers.excel_reader import ExcelReader
+
+    return {
+        item.market_hash_name: item
+        for item in ExcelReader(excel_file_name).get_items()
+        if item.price_unitary is not None
+    }
@@ -0,0 +1,161 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import date
+
+from diagnostics.profiler import profile_stage
+from models.batch import ItemBatch
+from models.items import ItemWithPrice
+
+
+class PricedItemsSink(ABC):
+    """
+    Destination of priced items. Sinks receive items in batches, while pricing is still running.
+    """
+
+    @abstractmethod
+    async def write(self, items: list[ItemWithPrice]):
+        """
+        Write a batch of priced items
+
+        :param items: priced items
+
+        :returns: nothing
+        """
+
+    async def close(self):
+        """
+        Persist anything still buffered. Called once, after the last batch
+
+        :returns: nothing
+        """
+
+
+class JsonLinesSink(PricedItemsSink):
+    """
+    Append each priced item as a json line, so results can be read (e.g. with 'tail -f') as they arrive
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, "a")
+
+    async def write(self, items: list[ItemWithPrice]):
+        self.file.writelines(item.model_dump_json() + "\n" for item in items)
+        self.file.flush()
+
+    async def close(self):
+        self.file.close()
+
+
+class DatabaseSink(PricedItemsSink):
+    """
+    Upsert item prices (in USD) to the database, in batches.
+    Database calls run on a thread, so they don't block the event loop.
+    """
+
+    def __init__(self, language: str, batch_size: int = 100, usd_rate: float = 1.0):
+        self.language = language  # language of the items names (see db.constants.ITEM_NAME_COLUMNS)
+        self.batch_size = batch_size
+        self.usd_rate = usd_rate  # amount of USD that one unit of the items currency buys
+        self.buffer: list[ItemWithPrice] = []
+
+    def _save(self, items: list[ItemWithPrice]):
+        """
+        Save items names (creating missing items) and upsert their prices
+
+        :param items: priced items
+
+        :returns: nothing
+        """
+        # NOTE: imported here, so sqlalchemy is only imported when this sink is used
+        from db import metadata
+        from db.utils import save_item_names, upsert_item_prices
+
+        priced_items = [item for item in items if item.price_unitary is not None]
+        session = metadata.sip_sessionmaker()
+        save_item_names(
+            [
+                {"market_hash_name": item.market_hash_name, "app_id": item.app_id, "name": item.name}
+                for item in priced_items
+            ],
+            self.language,
+            session,
+        )
+        upsert_item_prices(
+            [
+                {
+                    "item_id": item.market_hash_name,
+                    "date": date.fromisoformat(item.price_date),
+                    "price_usd": item.price_unitary * self.usd_rate,
+                }
+                for item in priced_items
+            ],
+            session,
+        )
+        session.commit()
+        session.close()
+
+    async def _flush(self):
+        """
+        Save buffered items
+
+        :returns: nothing
+        """
+        items, self.buffer = self.buffer, []
+        if items:
+            with profile_stage("database.save_prices"):
+                await asyncio.to_thread(self._save, items)
+
+    async def write(self, items: list[ItemWithPrice]):
+        self.buffer.extend(items)
+        if len(self.buffer) >= self.batch_size:
+            await self._flush()
+
+    async def close(self):
+        await self._flush()
+
+
+class ExcelSink(PricedItemsSink):
+    """
+    Export all priced items to today's sheet once pricing is over (xlsx files can't be appended to),
+    so it holds every priced item in memory until then
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        currency_rates: dict[str, float] | None = None,
+        carried_items: list[ItemWithPrice] | None = None,
+        currency: str | None = None,
+        list_id: int | None = None,
+        list_usd_rate: float = 1.0,
+    ):
+        self.filename = filename
+        self.currency_rates = currency_rates
+        self.currency = currency  # recorded on the workbook (see PandasExcelExporter)
+        # database list whose daily values (in USD) fill the Summary sheet, converted to the workbook currency
+        self.list_id = list_id
+        self.list_usd_rate = list_usd_rate
+        # items exported along with the priced ones, without being priced (e.g. carried at their last price).
+        # read when the sink closes, so it may still be filled while items are streamed
+        self.carried_items = carried_items if carried_items is not None else []
+        self.items: list[ItemWithPrice] = []
+
+    async def write(self, items: list[ItemWithPrice]):
+        self.items.extend(items)
+
+    async def close(self):
+        # NOTE: imported here, so pandas is only imported when this sink is used
+        from data_exporters.pandas_excel_exporter import PandasExcelExporter
+
+        if not self.items and not self.carried_items:
+            return
+        summary = None
+        if self.list_id is not None:
+            # NOTE: imported here, so sqlalchemy is only imported when a list is provided
+            from db.queries import get_list_summary
+
+            summary = await asyncio.to_thread(get_list_summary, self.list_id, None, date.today(), self.list_usd_rate)
+        items = ItemBatch.from_items(self.items + self.carried_items).sort_by_app_and_name()
+        excel_exporter = PandasExcelExporter(self.filename, self.currency)
+        excel_exporter.export_today_items(items, summary, self.currency_rates)
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+from itertools import groupby
+
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from external_apis.steam.rate_limiter import RateLimiter
+from models.items import Item
+from pricing.constants import FX_RATES_FILE
+from pricing.fx import BASE_CURRENCY, get_fx_rates
+from pricing.pipeline import StreamingPricingPipeline
+
+# seconds an idle worker waits before looking for new jobs again
+POLL_INTERVAL = 10
+
+
+class PricingWorker:
+    """
+    Price jobs claimed from the pricing_job table and save their prices (in USD) to item_price.
+    Each worker prices with its own steam api (egresses) and rate limiter, and workers coordinate only
+    through the database, so pricing capacity scales out by starting more workers, on any host.
+    Database calls run on a thread, so they don't block the event loop.
+    """
+
+    def __init__(
+        self,
+        steam_api: SteamAPI,
+        batch_size: int,
+        lease_seconds: int,
+        price_source: str = "html",
+        fx_rates_file: str = FX_RATES_FILE,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.steam_api = steam_api
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.price_source = price_source
+        self.fx_rates_file = fx_rates_file
+        self.poll_interval = poll_interval
+        self.limiter = RateLimiter(steam_api.request_interval)
+
+    async def _get_usd_rate(self, currency: str) -> float:
+        """
+        Get how many units of a currency one USD is worth
+
+        :param currency: currency
+
+        :returns: exchange rate
+        """
+        if currency == BASE_CURRENCY:
+            return 1.0
+        fx_rates = await get_fx_rates(self.steam_api.items, [currency], self.fx_rates_file)
+        return fx_rates.get_rates([currency])[currency]
+
+    async def _price_jobs(self, jobs: list[dict]) -> list[dict]:
+        """
+        Price jobs, one pipeline run per currency (sharing this worker's limiter)
+
+        :param jobs: claimed jobs
+
+        :returns: jobs with their price in USD (None if the item could not be priced)
+        """
+        job_prices = []
+        for currency, currency_jobs in groupby(
+            sorted(jobs, key=lambda job: job["currency"]), lambda job: job["currency"]
+        ):
+            currency_jobs = list(currency_jobs)
+            items = [
+                Item(
+                    app_id=job["app_id"],
+                    name=job["market_hash_name"],
+                    amount=1,
+                    market_hash_name=job["market_hash_name"],
+                )
+                for job in currency_jobs
+            ]
+            pipeline = StreamingPricingPipeline(
+                self.steam_api,
+                [],
+                limiter=self.limiter,
+                currency=CURRENCIES[currency],
+                price_source=self.price_source,
+            )
+            prices = {item.market_hash_name: item.price_unitary for item in await pipeline.run(items)}
+            usd_rate = (
+                await self._get_usd_rate(currency) if any(price is not None for price in prices.values()) else 1.0
+            )
+            for job in currency_jobs:
+                price = prices.get(job["market_hash_name"])
+                job_prices.append(job | {"price_usd": None if price is None else price / usd_rate})
+        return job_prices
+
+    async def run_once(self) -> int:
+        """
+        Claim a batch of jobs, price them and save their prices
+
+        :returns: amount of claimed jobs
+        """
+        # NOTE: imported here, so sqlalchemy is only imported when jobs are processed
+        from db.jobs import claim_pricing_jobs, complete_pricing_jobs
+
+        claim_token, jobs = await asyncio.to_thread(claim_pricing_jobs, self.batch_size, self.lease_seconds)
+        if not jobs:
+            return 0
+
+        job_prices = await self._price_jobs(jobs)
+        price_date = datetime.utcnow().date()
+        saved_prices = await asyncio.to_thread(complete_pricing_jobs, claim_token, job_prices, price_date)
+        print(f"Priced {saved_prices}/{len(jobs)} claimed jobs")
+        return len(jobs)
+
+    async def run(self, exit_when_empty: bool = False) -> int:
+        """
+        Process jobs until interrupted, waiting for new jobs when the queue is empty
+
+        :param exit_when_empty: return as soon as there are no jobs to claim, instead of waiting for new ones
+
+        :returns: amount of processed jobs
+        """
+        processed_jobs = 0
+        while True:
+            claimed_jobs = await self.run_once()
+            processed_jobs += claimed_jobs
+            if not claimed_jobs:
+                if exit_when_empty:
+                    return processed_jobs
+                await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,3 @@
+"""
+Local http api serving lists, prices and valuations from the database (no Steam requests are made)
+"""
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from time import monotonic
+from typing import Hashable
+
+# max amount of responses kept in memory. the least recently used ones are dropped first
+CACHE_SIZE = 1024
+
+
+def get_etag(body: bytes) -> str:
+    """
+    Get the (strong) ETag of a response body
+
+    :param body: response body
+
+    :returns: quoted ETag
+    """
+    return f'"{blake2b(body, digest_size=8).hexdigest()}"'
+
+
+class CachedResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = get_etag(body)
+
+
+class ResponseCache:
+    """
+    In-memory responses, valid while the data they were built from doesn't change.
+    The owner reads the data version at most once every version_check_seconds (see is_version_stale), so
+    responses are served from memory in between, and the whole cache is dropped as soon as a new version is seen.
+    """
+
+    def __init__(self, version_check_seconds: float, size: int = CACHE_SIZE):
+        self.version_check_seconds = version_check_seconds
+        self.size = size
+        self.responses: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.version: Hashable = None
+        self.version_checked_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def is_version_stale(self) -> bool:
+        """
+        Check if the data version should be read again before serving responses
+
+        :returns: True if it was never read or was read more than version_check_seconds ago
+        """
+        return self.version_checked_at is None or monotonic() - self.version_checked_at >= self.version_check_seconds
+
+    def set_version(self, version: Hashable):
+        """
+        Record the data version just read, dropping all responses if it changed
+
+        :param version: data version
+
+        :returns: nothing
+        """
+        if version != self.version:
+            self.responses.clear()
+            self.version = version
+        self.version_checked_at = monotonic()
+
+    def get(self, key: str) -> CachedResponse | None:
+        """
+        Get a cached response
+
+        :param key: response key (e.g. request target)
+
+        :returns: response, or None if it is not cached
+        """
+        response = self.responses.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self.responses.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def set(self, key: str, body: bytes) -> CachedResponse:
+        """
+        Cache a response
+
+        :param key: response key (e.g. request target)
+        :param body: response body
+
+        :returns: cached response
+        """
+        response = CachedResponse(body)
+        self.responses[key] = response
+        self.responses.move_to_end(key)
+        while len(self.responses) > self.size:
+            self.responses.popitem(last=False)
+        return response
+
+    def get_status(self) -> dict:
+        """
+        Get the cache status
+
+        :returns: cache status
+        """
+        return {"responses": len(self.responses), "hits": self.hits, "misses": self.misses, "version": self.version}
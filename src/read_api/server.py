@@ -0,0 +1,256 @@
+import asyncio
+import json
+import re
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from db.constants import READ_API_VERSION_CHECK_SECONDS
+from read_api.cache import CACHE_SIZE, CachedResponse, ResponseCache
+
+HTTP_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+# days valued by /lists/<id>/values when no start_date is provided
+DEFAULT_VALUES_DAYS = 30
+
+LIST_PATTERN = re.compile(r"/lists/(\d+)")
+LIST_VALUES_PATTERN = re.compile(r"/lists/(\d+)/values")
+
+
+class UnreadableRequestError(Exception):
+    """
+    Request that can't be read, so the rest of the connection's stream can't be read either
+    """
+
+    def __init__(self, status_code: int, error: str):
+        super().__init__(error)
+        self.status_code = status_code
+        self.error = error
+
+
+class ReadAPIServer:
+    """
+    Serve lists, their items latest prices and their valuations from the database, as json over http.
+    Responses are cached in memory until new prices or list changes are commited
+    (see db.data_version.bump_data_version), and carry an ETag, so clients revalidating with If-None-Match get an empty 304 when nothing changed.
+    No request ever reaches Steam. Database calls run on a thread, so they don't block the event loop.
+    """
+
+    def __init__(self, version_check_seconds: float = READ_API_VERSION_CHECK_SECONDS, cache_size: int = CACHE_SIZE):
+        self.cache = ResponseCache(version_check_seconds, cache_size)
+
+    def _get_data_version(self) -> tuple:
+        """
+        Read the version of the served data. Today's date is part of it, so responses built from date ranges
+        ending today by default (e.g. /lists/<id>/values) are dropped once the day changes
+
+        :returns: data version
+        """
+        # NOTE: imported here, so sqlalchemy is only imported when the server runs
+        from db.queries import get_data_versions
+
+        return (date.today().isoformat(),) + tuple(sorted(get_data_versions().items()))
+
+    def query(self, path: str, query: dict[str, list[str]]) -> tuple[int, dict | list]:
+        """
+        Read a route's data from the database. Routes:
+            GET /lists
+            GET /lists/<id>
+            GET /lists/<id>/values[?start_date=YYYY-MM-DD][&end_date=YYYY-MM-DD]
+            GET /prices?market_hash_name=<name>[&market_hash_name=<name>...]
+
+        :param path: request path
+        :param query: request query parameters
+
+        :returns: http status code and json body
+        """
+        # NOTE: imported here, so sqlalchemy is only imported when the server runs
+        from db.queries import (
+            get_items_latest_price,
+            get_list,
+            get_list_items_latest_price,
+            get_list_summary,
+            get_lists,
+        )
+
+        if path == "/lists":
+            return 200, get_lists()
+
+        if path == "/prices":
+            market_hash_names = query.get("market_hash_name", [])
+            if not market_hash_names:
+                return 400, {"error": "Provide at least one market_hash_name"}
+            return 200, get_items_latest_price(market_hash_names)
+
+        list_match = LIST_PATTERN.fullmatch(path) or LIST_VALUES_PATTERN.fullmatch(path)
+        if list_match is None:
+            return 404, {"error": f"Unknown path {path}"}
+        list_id = int(list_match.group(1))
+        list_row = get_list(list_id)
+        if list_row is None:
+            return 404, {"error": f"Unknown list {list_id}"}
+
+        if list_match.re is LIST_PATTERN:
+            return 200, list_row | {"items": get_list_items_latest_price(list_id)}
+
+        try:
+            end_date = date.fromisoformat(query["end_date"][0]) if "end_date" in query else date.today()
+            start_date = (
+                date.fromisoformat(query["start_date"][0])
+                if "start_date" in query
+                else end_date - timedelta(days=DEFAULT_VALUES_DAYS)
+            )
+        except ValueError:
+            return 400, {"error": "Invalid date, use the YYYY-MM-DD format"}
+        return 200, get_list_summary(list_id, start_date, end_date)
+
+    async def handle_request(self, method: str, target: str, headers: dict[str, str]) -> tuple[int, dict, bytes]:
+        """
+        Answer a request from the cache, querying the database only for responses not cached yet
+
+        :param method: http method
+        :param target: request target (path and query)
+        :param headers: request headers, with lowercase names
+
+        :returns: http status code, response headers and body
+        """
+        if method != "GET":
+            return 405, {}, json.dumps({"error": "Use GET"}).encode()
+        url = urlsplit(target)
+        if url.path == "/status":
+            return 200, {}, json.dumps(self.cache.get_status()).encode()
+
+        # drop cached responses once the data changed (checking it at most once every version_check_seconds)
+        if self.cache.is_version_stale():
+            self.cache.set_version(await asyncio.to_thread(self._get_data_version))
+
+        response: CachedResponse | None = self.cache.get(target)
+        if response is None:
+            status_code, body = await asyncio.to_thread(self.query, url.path, parse_qs(url.query))
+            content = json.dumps(body, default=str).encode()
+            if status_code != 200:
+                return status_code, {}, content
+            response = self.cache.set(target, content)
+
+        response_headers = {"ETag": response.etag, "Cache-Control": "no-cache"}
+        if_none_match = headers.get("if-none-match", "")
+        if response.etag in [etag.strip() for etag in if_none_match.split(",")] or if_none_match == "*":
+            return 304, response_headers, b""
+        return 200, response_headers, response.body
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> str:
+        """
+        Read a request or header line
+
+        :param reader: connection reader
+
+        :returns: decoded line (empty once the client closes the connection)
+        """
+        try:
+            line = await reader.readline()
+        except ValueError:
+            # the line is longer than the reader limit
+            raise UnreadableRequestError(431, "Request line or header too long")
+        try:
+            return line.decode()
+        except UnicodeDecodeError:
+            raise UnreadableRequestError(400, "Request is not utf-8")
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[list[str], dict[str, str]]:
+        """
+        Read a request line and its headers, discarding the request body (no route reads it)
+
+        :param reader: connection reader
+
+        :returns: request line parts (empty once the client closes the connection) and headers, with lowercase names
+        """
+        request_line = (await self._read_line(reader)).split()
+        headers = {}
+        if not request_line:
+            return request_line, headers
+        while header_line := (await self._read_line(reader)).strip():
+            name, _, value = header_line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        # read the body, so it isn't parsed as the next request on the connection
+        content_length = headers.get("content-length", "0")
+        if not content_length.isdigit():
+            raise UnreadableRequestError(400, "Invalid Content-Length")
+        await reader.readexactly(int(content_length))
+        return request_line, headers
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Answer the connection's http requests (kept alive until the client closes it or asks to)
+
+        :param reader: connection reader
+        :param writer: connection writer
+
+        :returns: nothing
+        """
+        try:
+            while True:
+                try:
+                    request_line, headers = await self._read_request(reader)
+                except UnreadableRequestError as exc:
+                    request_line, headers = None, {}
+                    status_code, response_headers = exc.status_code, {}
+                    content = json.dumps({"error": exc.error}).encode()
+                else:
+                    if not request_line:
+                        break
+                    if len(request_line) != 3:
+                        status_code, response_headers = 400, {}
+                        content = json.dumps({"error": "Malformed request"}).encode()
+                    else:
+                        try:
+                            status_code, response_headers, content = await self.handle_request(
+                                request_line[0], request_line[1], headers
+                            )
+                        except Exception as exc:
+                            print(f"Failed to answer {request_line[1]}: {exc!r}")
+                            status_code, response_headers = 500, {}
+                            content = json.dumps({"error": "Internal server error"}).encode()
+
+                keep_alive = (
+                    request_line is not None
+                    and len(request_line) == 3
+                    and headers.get("connection", "").lower() != "close"
+                )
+                response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+                # not modified responses have no body
+                if status_code != 304:
+                    response_headers |= {"Content-Type": "application/json", "Content-Length": str(len(content))}
+                writer.write(
+                    f"HTTP/1.1 {status_code} {HTTP_REASONS[status_code]}\r\n".encode()
+                    + "".join(f"{name}: {value}\r\n" for name, value in response_headers.items()).encode()
+                    + b"\r\n"
+                    + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, host: str, port: int):
+        """
+        Run the server until cancelled
+
+        :param host: server host
+        :param port: server port
+
+        :returns: nothing
+        """
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Read api listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,571 @@
+"""
+Command line arguments of each script, shared by the scripts themselves and the sip cli.
+
+NOTE: this module must only import light modules (no pandas, httpx, pydantic or sqlalchemy),
+so 'sip --help' and quick commands start fast.
+"""
+import argparse
+
+from db.constants import (
+    FULL_RESOLUTION_DAYS,
+    PRICING_JOB_BATCH_SIZE,
+    PRICING_JOB_LEASE_SECONDS,
+    READ_API_PORT,
+    READ_API_VERSION_CHECK_SECONDS,
+    WEEKLY_RESOLUTION_DAYS,
+)
+from external_apis.steam.constants import CURRENCIES, INVENTORY_SNAPSHOTS_DIR
+from pricing.constants import (
+    BASE_CURRENCY,
+    CONTROL_HOST,
+    CONTROL_PORT,
+    DEFAULT_CURRENCY,
+    EXPORT_INTERVAL_MINUTES,
+    FX_RATES_FILE,
+    FX_RATES_MAX_AGE_HOURS,
+    HISTORY_SHEETS,
+    MIN_REFRESH_MINUTES,
+    PRICE_HISTORY_INDEX_FILE,
+)
+
+GENERATE_DESCRIPTION = "Build spreadsheet with an user's desired items (see --rules_file)"
+GENERATE_BATCH_DESCRIPTION = (
+    "Build one spreadsheet per user with all their marketable items, pricing each distinct item once"
+)
+UPDATE_PRICES_DESCRIPTION = "Update today spreadsheet with most up to date prices or add a new spreadsheet if today date does not have it's own spreadsheet yet"
+RETRY_ERRORS_DESCRIPTION = "Retry to get item prices for api error items. This script can only be run if the most recent spreadsheet is from today date"
+UPDATE_AMOUNT_DESCRIPTION = "Sync a spreadsheet with the user's inventory: update changed amounts, remove items no longer held and price only the new ones"
+DAEMON_DESCRIPTION = "Keep refreshing a spreadsheet items prices, at the rate limit, until interrupted (Ctrl+C)"
+COMPACT_DESCRIPTION = "Apply item prices retention policy: downsample old prices and compact old partitions"
+BACKFILL_DESCRIPTION = "Save the full price history of a spreadsheet items (one median price per day) to the database"
+BUILD_INDEX_DESCRIPTION = (
+    "Download the full price history of a spreadsheet items into a price history index file, for offline valuation"
+)
+BACKDATE_DESCRIPTION = "Add back-dated sheets to a spreadsheet, pricing its current items from a price history index file (no Steam requests are made)"
+ENQUEUE_DESCRIPTION = "Enqueue a spreadsheet items as pricing jobs on the database, to be priced by pricing workers"
+WORKER_DESCRIPTION = "Claim pricing jobs from the database and save their prices to it, until interrupted (Ctrl+C). Any number of workers can run, on any host"
+SERVE_DESCRIPTION = "Serve lists, latest prices and list valuations from the database over a local http api, cached in memory (no Steam requests are made)"
+STATUS_DESCRIPTION = "Show the price daemon status and the cached exchange rates (no Steam requests are made)"
+
+# item names of commands reading items from a spreadsheet are in the language the spreadsheet was generated in
+SHEET_LANGUAGE_HELP = (
+    "Language of the spreadsheet item names, saved to the database along with their prices "
+    "('portuguese' (default), 'english')"
+)
+
+
+def parse_user(user: str) -> tuple[int, list[int]]:
+    """
+    Parse a 'steam_id' or 'steam_id:app_id,app_id' user argument
+
+    :param user: user argument
+
+    :returns: steam id and its app ids (CSGO only, if not provided)
+    """
+    steam_id, _, app_ids = user.partition(":")
+    if not app_ids:
+        return int(steam_id), [730]
+    return int(steam_id), [int(app_id) for app_id in app_ids.split(",")]
+
+
+def validate_language(item_names_language: str) -> bool:
+    """
+    Check the item names language, printing the valid ones if it is invalid
+
+    :param item_names_language: item names language argument
+
+    :returns: True if it is valid
+    """
+    if item_names_language not in ["english", "portuguese"]:
+        print("Invalid chosen language, choose either 'english' or 'portuguese'")
+        return False
+    return True
+
+
+def validate_currencies(currencies: list[str]) -> bool:
+    """
+    Check the currencies, printing the valid ones if any is invalid
+
+    :param currencies: currencies argument
+
+    :returns: True if all of them are valid
+    """
+    if any(currency not in CURRENCIES for currency in currencies):
+        print(f"Invalid currency, choose among {', '.join(CURRENCIES)}")
+        return False
+    return True
+
+
+def validate_list_id(list_id: int | None) -> bool:
+    """
+    Check the list id, if provided, exists in the database
+
+    :param list_id: list id argument
+
+    :returns: True if it was not provided or the list exists
+    """
+    if list_id is None:
+        return True
+    # NOTE: imported here, so sqlalchemy is only imported when a list is provided
+    from db.queries import get_list
+
+    if get_list(list_id) is None:
+        print(f"List {list_id} not found")
+        return False
+    return True
+
+
+def add_excel_file_name_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "excel_file_name",
+        help="Which file name to use. Do not add extension to it, .xlxs will be used",
+        type=str,
+    )
+
+
+def add_steam_id_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "steam_id",
+        help="Users's Steam id (search for 'ID Steam' on 'https://store.steampowered.com/account')",
+        type=int,
+    )
+
+
+def add_language_argument(
+    parser: argparse.ArgumentParser, help: str = "Language to display item names ('portuguese' (default), 'english')"
+):
+    parser.add_argument(
+        "--item_names_language",
+        dest="item_names_language",
+        help=help,
+        type=str,
+        default="portuguese",
+    )
+
+
+def add_currencies_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--currency",
+        dest="currency",
+        help=(
+            "Currency items are priced in. A workbook is never priced in two currencies, so the default value is "
+            f"the workbook's currency ({DEFAULT_CURRENCY} for new workbooks and for workbooks with no currency recorded)"
+        ),
+        choices=list(CURRENCIES),
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--currencies",
+        dest="currencies",
+        help=f"Extra currencies to export prices in, converted from the workbook's currency (one of {', '.join(CURRENCIES)})",
+        nargs="+",
+        type=str,
+        default=[],
+    )
+    parser.add_argument(
+        "--fx_rates_file",
+        dest="fx_rates_file",
+        help=f"Exchange rates cache file. Rates are derived from Steam again after {FX_RATES_MAX_AGE_HOURS} hours. '{FX_RATES_FILE}' is the default value",
+        type=str,
+        default=FX_RATES_FILE,
+    )
+
+
+def add_sinks_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--stream_output",
+        dest="stream_output",
+        help="Json lines file to append each item to as soon as it is priced (e.g. to follow the run with 'tail -f')",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--save_to_database",
+        dest="save_to_database",
+        help="Also save prices to the database (see SIP_DATABASE_URL), as they are priced",
+        action="store_true",
+    )
+
+
+def add_list_id_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--list_id",
+        dest="list_id",
+        help="Database list (see SIP_DATABASE_URL) holding the spreadsheet items. If provided, the Summary sheet takes each date value from the list daily values, converted to the workbook currency",
+        type=int,
+        default=None,
+    )
+
+
+def add_price_source_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--price_source",
+        dest="price_source",
+        help="Where to get each item price from: 'html' (listing page, default), 'histogram' (lowest sell order of commodity items like cases, a much lighter request once the item listing page was requested before. other items are priced from their listing page), 'overview' or 'history'",
+        choices=["html", "histogram", "overview", "history"],
+        default="html",
+    )
+
+
+def add_rules_file_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--rules_file",
+        dest="rules_file",
+        help='Json file with the rules selecting which items are priced, e.g. {"include": [{"app_ids": [730]}], "exclude": [{"tags": ["Graffiti"]}, {"name_regex": "^Sticker"}], "min_value": 0.1}. Rules may also check the marketable and commodity flags. Every marketable item is priced by default',
+        type=str,
+        default=None,
+    )
+
+
+def add_cache_item_names_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--cache_item_names",
+        dest="cache_item_names",
+        help="Fetch inventories in english only and take item names in the chosen language from the database item table (see SIP_DATABASE_URL). Inventories are fetched again in that language only for items never seen before",
+        action="store_true",
+    )
+
+
+def add_market_search_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--market_search",
+        dest="market_search",
+        help="Price items with market search pages first (up to 100 items per request, by their recent sale price). Items not found are priced one by one",
+        action="store_true",
+    )
+
+
+def add_history_sheets_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--history_sheets",
+        dest="history_sheets",
+        help=f"Amount of most recent sheets used to estimate each item's price volatility. {HISTORY_SHEETS} is the default value",
+        type=int,
+        default=HISTORY_SHEETS,
+    )
+
+
+def add_control_port_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--port",
+        dest="port",
+        help=f"Local control server port (GET /status, POST /refresh?market_hash_name=..., POST /export). {CONTROL_PORT} is the default value",
+        type=int,
+        default=CONTROL_PORT,
+    )
+
+
+def add_index_file_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--index_file",
+        dest="index_file",
+        help=f"Price history index file. '{PRICE_HISTORY_INDEX_FILE}' is the default value",
+        type=str,
+        default=PRICE_HISTORY_INDEX_FILE,
+    )
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        help="Json file to write a profiling report to: wall and CPU time of each run stage (inventory requests, price requests, rate limit waits, spreadsheet building and saving...)",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--profile_memory",
+        dest="profile_memory",
+        help="Also trace the peak memory of each stage on the profiling report (slows the run down)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile_cprofile",
+        dest="profile_cprofile",
+        help="Also write a cProfile dump of the whole run to this file (e.g. to open with snakeviz or pstats)",
+        type=str,
+        default=None,
+    )
+
+
+def add_generate_arguments(parser: argparse.ArgumentParser):
+    add_steam_id_argument(parser)
+    parser.add_argument(
+        "--app_ids",
+        dest="app_ids",
+        help="App ids to retrieve items from. CSGO is 730. Check all at 'https://steamdb.info/'",
+        nargs="+",
+        type=int,
+        default=[730],
+    )
+    add_language_argument(parser)
+    add_cache_item_names_argument(parser)
+    parser.add_argument(
+        "--excel_file_name",
+        dest="excel_file_name",
+        help="Which file name to use. Do not add extension to it, .xlxs will be used. 'prices' is the default value",
+        type=str,
+        default="prices",
+    )
+    add_rules_file_argument(parser)
+    add_currencies_arguments(parser)
+    add_sinks_arguments(parser)
+    add_list_id_argument(parser)
+    add_profile_arguments(parser)
+
+
+def add_generate_batch_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "users",
+        help="Users's Steam ids, optionally followed by their app ids (e.g. '76561198000000000:730,440'). CSGO (730) is the default app",
+        nargs="+",
+        type=parse_user,
+    )
+    add_language_argument(parser)
+    add_cache_item_names_argument(parser)
+    parser.add_argument(
+        "--excel_file_prefix",
+        dest="excel_file_prefix",
+        help="Prefix of each user file name, which is followed by the user's steam id. 'prices' is the default value",
+        type=str,
+        default="prices",
+    )
+    add_rules_file_argument(parser)
+    add_currencies_arguments(parser)
+    add_market_search_argument(parser)
+    add_profile_arguments(parser)
+
+
+def add_update_prices_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_currencies_arguments(parser)
+    add_sinks_arguments(parser)
+    add_language_argument(parser, SHEET_LANGUAGE_HELP)
+    parser.add_argument(
+        "--max_requests",
+        dest="max_requests",
+        help="Max amount of items to refresh. The ones with the highest impact on the total value are refreshed first, the others keep their last price (flagged as stale)",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--deadline_minutes",
+        dest="deadline_minutes",
+        help="Max amount of minutes to spend refreshing prices. Items not refreshed in time keep their last price (flagged as stale)",
+        type=float,
+        default=None,
+    )
+    add_history_sheets_argument(parser)
+    add_price_source_argument(parser)
+    add_market_search_argument(parser)
+    add_list_id_argument(parser)
+    add_profile_arguments(parser)
+
+
+def add_retry_errors_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_currencies_arguments(parser)
+    add_profile_arguments(parser)
+
+
+def add_update_amount_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_steam_id_argument(parser)
+    parser.add_argument(
+        "--app_ids",
+        dest="app_ids",
+        help="App ids to sync besides the ones of the spreadsheet items, which are the only ones synced by default (so holdings in a new app are only found if its id is provided)",
+        nargs="+",
+        type=int,
+        default=[],
+    )
+    add_language_argument(parser)
+    parser.add_argument(
+        "--snapshots_dir",
+        dest="snapshots_dir",
+        help=f"Directory of the inventory snapshots (one subdirectory per spreadsheet), diffed against the current inventory. '{INVENTORY_SNAPSHOTS_DIR}' is the default value",
+        type=str,
+        default=INVENTORY_SNAPSHOTS_DIR,
+    )
+    add_currencies_arguments(parser)
+    add_profile_arguments(parser)
+
+
+def add_daemon_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_currencies_arguments(parser)
+    add_sinks_arguments(parser)
+    add_language_argument(parser, SHEET_LANGUAGE_HELP)
+    add_history_sheets_argument(parser)
+    add_price_source_argument(parser)
+    parser.add_argument(
+        "--min_refresh_minutes",
+        dest="min_refresh_minutes",
+        help=f"Min minutes between two refreshes of the same item. {MIN_REFRESH_MINUTES} is the default value",
+        type=float,
+        default=MIN_REFRESH_MINUTES,
+    )
+    parser.add_argument(
+        "--export_interval_minutes",
+        dest="export_interval_minutes",
+        help=f"Minutes between spreadsheet exports. {EXPORT_INTERVAL_MINUTES} is the default value",
+        type=float,
+        default=EXPORT_INTERVAL_MINUTES,
+    )
+    add_control_port_argument(parser)
+    parser.add_argument(
+        "--no_control_server",
+        dest="no_control_server",
+        help="Do not start the local control server",
+        action="store_true",
+    )
+    add_list_id_argument(parser)
+    add_profile_arguments(parser)
+
+
+def add_compact_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--full_resolution_days",
+        dest="full_resolution_days",
+        help=f"Amount of days to keep daily prices. {FULL_RESOLUTION_DAYS} is the default value",
+        type=int,
+        default=FULL_RESOLUTION_DAYS,
+    )
+    parser.add_argument(
+        "--weekly_resolution_days",
+        dest="weekly_resolution_days",
+        help=f"Amount of days to keep at least weekly prices. {WEEKLY_RESOLUTION_DAYS} is the default value",
+        type=int,
+        default=WEEKLY_RESOLUTION_DAYS,
+    )
+    parser.add_argument(
+        "--skip_compaction",
+        dest="skip_compaction",
+        help="Do not rebuild old partitions (MySQL) or vacuum the database (SQLite)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--rebuild_list_values",
+        dest="rebuild_list_values",
+        help="Also drop and recompute every list daily value (list_daily_value) from the item prices, e.g. to repair them",
+        action="store_true",
+    )
+    add_profile_arguments(parser)
+
+
+def add_backfill_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_language_argument(parser, SHEET_LANGUAGE_HELP)
+    parser.add_argument(
+        "--since",
+        dest="since",
+        help="Only save prices from this date on (YYYY-MM-DD). The whole history is saved by default",
+        type=str,
+        default=None,
+    )
+    add_profile_arguments(parser)
+
+
+def add_status_arguments(parser: argparse.ArgumentParser):
+    add_control_port_argument(parser)
+    parser.add_argument(
+        "--fx_rates_file",
+        dest="fx_rates_file",
+        help=f"Exchange rates cache file. '{FX_RATES_FILE}' is the default value",
+        type=str,
+        default=FX_RATES_FILE,
+    )
+    add_profile_arguments(parser)
+
+
+def add_build_index_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_index_file_argument(parser)
+    add_profile_arguments(parser)
+
+
+def add_backdate_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_index_file_argument(parser)
+    parser.add_argument(
+        "start_date",
+        help="First date to add a sheet for (YYYY-MM-DD)",
+        type=str,
+    )
+    parser.add_argument(
+        "--end_date",
+        dest="end_date",
+        help="Last date to add a sheet for (YYYY-MM-DD). Yesterday is the default value",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--values_only",
+        dest="values_only",
+        help="Only print the total value of the items on each date (e.g. what-if valuations), without changing the spreadsheet",
+        action="store_true",
+    )
+    add_profile_arguments(parser)
+
+
+def add_enqueue_arguments(parser: argparse.ArgumentParser):
+    add_excel_file_name_argument(parser)
+    add_profile_arguments(parser)
+
+
+def add_worker_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--batch_size",
+        dest="batch_size",
+        help=f"Amount of jobs claimed at once. {PRICING_JOB_BATCH_SIZE} is the default value",
+        type=int,
+        default=PRICING_JOB_BATCH_SIZE,
+    )
+    parser.add_argument(
+        "--lease_seconds",
+        dest="lease_seconds",
+        help=f"Seconds claimed jobs are held. Jobs of a worker that stopped are claimed by others once it expires, so it must be longer than pricing a batch takes. {PRICING_JOB_LEASE_SECONDS} is the default value",
+        type=int,
+        default=PRICING_JOB_LEASE_SECONDS,
+    )
+    add_price_source_argument(parser)
+    parser.add_argument(
+        "--fx_rates_file",
+        dest="fx_rates_file",
+        help=f"Exchange rates cache file, used to convert jobs not priced in {BASE_CURRENCY}. '{FX_RATES_FILE}' is the default value",
+        type=str,
+        default=FX_RATES_FILE,
+    )
+    parser.add_argument(
+        "--exit_when_empty",
+        dest="exit_when_empty",
+        help="Stop once there are no jobs left, instead of waiting for new ones",
+        action="store_true",
+    )
+    add_profile_arguments(parser)
+
+
+def add_serve_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--host",
+        dest="host",
+        help=f"Host to listen on. '{CONTROL_HOST}' (this machine only) is the default value",
+        type=str,
+        default=CONTROL_HOST,
+    )
+    parser.add_argument(
+        "--port",
+        dest="port",
+        help=f"Port to listen on. {READ_API_PORT} is the default value",
+        type=int,
+        default=READ_API_PORT,
+    )
+    parser.add_argument(
+        "--version_check_seconds",
+        dest="version_check_seconds",
+        help=f"Seconds responses are served from memory before checking if prices or lists changed. {READ_API_VERSION_CHECK_SECONDS} is the default value",
+        type=float,
+        default=READ_API_VERSION_CHECK_SECONDS,
+    )
+    add_profile_arguments(parser)
@@ -0,0 +1,70 @@
+import argparse
+import os
+from datetime import date, timedelta
+
+from data_exporters.pandas_excel_exporter import PandasExcelExporter
+from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
+from pricing.history_index import PriceHistoryIndex
+from scripts.arguments import BACKDATE_DESCRIPTION, add_backdate_arguments
+
+
+def main(excel_file_name: str, index_file: str, start_date: date, end_date: date, values_only: bool):
+    # get list of items and their price histories
+    excel_reader = ExcelReader(excel_file_name)
+    items = excel_reader.get_items()
+    price_history_index = PriceHistoryIndex(index_file)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    # only print each day's total value
+    if values_only:
+        for day in days:
+            print(f"{day.isoformat()}: {price_history_index.get_portfolio_value(items, day):.2f}")
+        return
+
+    # price items on each day and write all sheets at once
+    items_by_date = {day.isoformat(): price_history_index.value_items(items, day) for day in days}
+    excel_exporter = PandasExcelExporter(excel_file_name)
+    excel_exporter.export_dated_items(items_by_date)
+    print(f"Added {len(days)} back-dated sheets to {excel_file_name}")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_backdate_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    try:
+        start_date = date.fromisoformat(args.start_date)
+        end_date = date.fromisoformat(args.end_date) if args.end_date else date.today() - timedelta(days=1)
+    except ValueError:
+        print("Invalid date, use the YYYY-MM-DD format")
+        exit()
+    if start_date > end_date:
+        print("Start date must not be after end date")
+        exit()
+    if end_date >= date.today():
+        print("Back-dated sheets must be before today, use update_prices_spreadsheet.py to price today's sheet")
+        exit()
+    if not os.path.exists(args.index_file):
+        print(f"Price history index {args.index_file} not found, build it with build_price_history_index.py")
+        exit()
+
+    main(args.excel_file_name + ".xlsx", args.index_file, start_date, end_date, args.values_only)
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=BACKDATE_DESCRIPTION)
+    add_backdate_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
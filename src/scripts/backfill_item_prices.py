@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+from datetime import date
+
+from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
+from external_apis.steam.api import SteamAPI
+from pricing.backfill import backfill_items_price_history
+from scripts.arguments import BACKFILL_DESCRIPTION, add_backfill_arguments, validate_language
+
+
+async def main(excel_file_name: str, item_names_language: str, since: date | None):
+    # get list of items
+    excel_reader = ExcelReader(excel_file_name)
+    items = excel_reader.get_items()
+
+    # save each item's price history
+    async with SteamAPI() as steam_api:
+        saved_prices = await backfill_items_price_history(steam_api, items, item_names_language, since)
+    print(f"Saved {saved_prices} daily prices of {len(items)} items")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_backfill_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if not validate_language(args.item_names_language):
+        exit()
+    try:
+        since = date.fromisoformat(args.since) if args.since else None
+    except ValueError:
+        print("Invalid since date, use the YYYY-MM-DD format")
+        exit()
+
+    # start async loop
+    asyncio.run(main(args.excel_file_name + ".xlsx", args.item_names_language, since))
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=BACKFILL_DESCRIPTION)
+    add_backfill_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
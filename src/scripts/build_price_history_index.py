@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+
+from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
+from external_apis.steam.api import SteamAPI
+from pricing.history_index import build_price_history_index
+from scripts.arguments import BUILD_INDEX_DESCRIPTION, add_build_index_arguments
+
+
+async def main(excel_file_name: str, index_file: str):
+    # get list of items
+    excel_reader = ExcelReader(excel_file_name)
+    items = excel_reader.get_items()
+
+    # download each item's price history into the index
+    async with SteamAPI() as steam_api:
+        indexed_items = await build_price_history_index(steam_api, items, index_file)
+    print(f"Indexed the price history of {indexed_items} items at {index_file}")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_build_index_arguments)
+
+    :returns: nothing
+    """
+    # start async loop
+    asyncio.run(main(args.excel_file_name + ".xlsx", args.index_file))
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=BUILD_INDEX_DESCRIPTION)
+    add_build_index_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
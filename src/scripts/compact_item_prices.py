@@ -0,0 +1,60 @@
+import argparse
+from datetime import date
+
+from db.list_daily_value import rebuild_list_daily_values
+from db.retention import (
+    add_item_price_partitions,
+    apply_retention_policy,
+    compact_item_prices,
+)
+from diagnostics.profiler import profiled
+from scripts.arguments import COMPACT_DESCRIPTION, add_compact_arguments
+
+
+def main(full_resolution_days: int, weekly_resolution_days: int, skip_compaction: bool, rebuild_list_values: bool):
+    # make sure the current and next years have their own partition (MySQL only)
+    today = date.today()
+    add_item_price_partitions(today.year + 1)
+
+    # downsample old prices
+    dropped_amounts = apply_retention_policy(today, full_resolution_days, weekly_resolution_days)
+    print(f"Dropped {dropped_amounts['month']} prices into monthly medians")
+    print(f"Dropped {dropped_amounts['week']} prices into weekly medians")
+
+    # reclaim space of partitions that only hold downsampled prices
+    if not skip_compaction:
+        compact_item_prices(today.year - 1)
+
+    # recompute every list daily value from the remaining prices
+    if rebuild_list_values:
+        rebuild_list_daily_values()
+        print("Rebuilt every list daily value")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_compact_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if args.weekly_resolution_days < args.full_resolution_days:
+        print("Invalid retention, weekly_resolution_days must be greater than full_resolution_days")
+        exit()
+
+    main(args.full_resolution_days, args.weekly_resolution_days, args.skip_compaction, args.rebuild_list_values)
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=COMPACT_DESCRIPTION)
+    add_compact_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
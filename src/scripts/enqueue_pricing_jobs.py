@@ -0,0 +1,48 @@
+import argparse
+
+from data_readers.excel_reader import ExcelReader
+from db.jobs import enqueue_pricing_jobs, get_pricing_jobs_count
+from diagnostics.profiler import profiled
+from pricing.constants import BASE_CURRENCY
+from scripts.arguments import ENQUEUE_DESCRIPTION, add_enqueue_arguments
+
+
+def main(excel_file_name: str):
+    # get list of items
+    excel_reader = ExcelReader(excel_file_name)
+    items = excel_reader.get_items()
+
+    # enqueue one job per item, priced in the currency prices are saved in
+    # (items already waiting to be priced are skipped)
+    enqueued_jobs = enqueue_pricing_jobs(
+        [
+            {"app_id": item.app_id, "market_hash_name": item.market_hash_name, "currency": BASE_CURRENCY}
+            for item in items
+        ]
+    )
+    jobs_count = ", ".join(f"{count} {status}" for status, count in get_pricing_jobs_count().items())
+    print(f"Enqueued {enqueued_jobs} pricing jobs of {len(items)} items. Jobs: {jobs_count}")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_enqueue_arguments)
+
+    :returns: nothing
+    """
+    main(args.excel_file_name + ".xlsx")
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=ENQUEUE_DESCRIPTION)
+    add_enqueue_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
@@ -1,75 +1,104 @@
 import argparse
 import asyncio
+import os
 
-from data_exporters.pandas_excel_exporter import PandasExcelExporter
+from diagnostics.profiler import profiled
 from external_apis.steam.api import SteamAPI
-from models.items import Item
-
-
-async def main(steam_id: int, app_ids: list[int], item_names_language: str, excel_file_name: str):
-    # get user's inventory
-    steam_api = SteamAPI()
-    user_items: list[Item] = []
-    for app_id in app_ids:
-        app_items = await steam_api.inventory.get_user_app_items(steam_id, app_id, item_names_language)
-        user_items.extend(app_items)
-    sorted(user_items, key=lambda item: f"{item.app_id}-{item.name}")
-
-    # filter out unwanted items
-    user_filtered_items: list[Item] = []
-    for item in user_items[:3]:
-        add = input(
-            f"Would you like to add {item.name} (app {item.app_id}) to the spreadsheet?" "(answer with y or n) "
-        )
-        if add == "y":
-            user_filtered_items.append(item)
+from external_apis.steam.constants import CURRENCIES
+from models.items import ItemWithPrice
+from pricing.constants import BASE_CURRENCY
+from pricing.fx import get_currency_rates, get_workbook_currency
+from pricing.names import ItemNameResolver
+from pricing.pipeline import StreamingPricingPipeline, get_inventory_items
+from pricing.selection import SelectionRules, get_cached_items
+from pricing.sinks import DatabaseSink, ExcelSink, JsonLinesSink, PricedItemsSink
+from scripts.arguments import (
+    GENERATE_DESCRIPTION,
+    add_generate_arguments,
+    validate_currencies,
+    validate_language,
+    validate_list_id,
+)
 
-    # retrieve price for filtered items
-    user_filtered_items_with_price = await steam_api.items.add_items_price(user_filtered_items)
 
-    # export data
-    excel_exporter = PandasExcelExporter(excel_file_name)
-    excel_exporter.export_today_items(user_filtered_items_with_price)
+async def main(
+    steam_id: int,
+    app_ids: list[int],
+    item_names_language: str,
+    cache_item_names: bool,
+    excel_file_name: str,
+    rules_file: str | None,
+    currency: str,
+    currencies: list[str],
+    fx_rates_file: str,
+    stream_output: str | None,
+    save_to_database: bool,
+    list_id: int | None,
+):
+    # compile item selection rules once (items worth less than their min value are judged by their last price,
+    # and kept on the sheet at that price instead of being priced again)
+    selection_rules = SelectionRules.load(rules_file) if rules_file else None
+    cached_items = get_cached_items(excel_file_name) if selection_rules and selection_rules.min_value else {}
+    carried_items: list[ItemWithPrice] = []
 
+    async with SteamAPI() as steam_api:
+        # get exchange rates of extra currencies (cached, so usually no request is made)
+        currency_rates = await get_currency_rates(steam_api.items, currency, currencies, fx_rates_file)
 
-if __name__ == "__main__":
-    # creates an argparse object to parse command line option
-    parser = argparse.ArgumentParser(description="Build spreadsheet with an user's desired items")
-    parser.add_argument(
-        "steam_id",
-        help="Users's Steam id (search for 'ID Steam' on 'https://store.steampowered.com/account')",
-        type=int,
-    )
-    parser.add_argument(
-        "--app_ids",
-        dest="app_ids",
-        help="App ids to retrieve items from. CSGO is 730. Check all at 'https://steamdb.info/'",
-        nargs="+",
-        type=int,
-        default=[730],
-    )
-    parser.add_argument(
-        "--item_names_language",
-        dest="item_names_language",
-        help="Language to display item names ('portuguese' (default), 'english')",
-        type=str,
-        default="portuguese",
-    )
-    parser.add_argument(
-        "--excel_file_name",
-        dest="excel_file_name",
-        help="Which file name to use. Do not add extension to it, .xlxs will be used. 'prices' is the default value",
-        type=str,
-        default="prices",
-    )
+        # the Summary sheet values every date from the list daily values, converted from USD to the workbook currency
+        list_usd_rate = 1.0
+        if list_id is not None:
+            list_usd_rate = (await get_currency_rates(steam_api.items, BASE_CURRENCY, [currency], fx_rates_file))[
+                currency
+            ]
 
-    # waits for command line input
-    # (proceeds only if it is validated against the options set before)
-    args = parser.parse_args()
+        # set where priced items go, as soon as they are priced
+        sinks: list[PricedItemsSink] = [
+            ExcelSink(excel_file_name, currency_rates, carried_items, currency, list_id, list_usd_rate)
+        ]
+        if stream_output:
+            sinks.append(JsonLinesSink(stream_output))
+        if save_to_database:
+            usd_rates = await get_currency_rates(steam_api.items, currency, [BASE_CURRENCY], fx_rates_file)
+            sinks.append(DatabaseSink(item_names_language, usd_rate=usd_rates[BASE_CURRENCY]))
+
+        # stream user's inventory -> filter out unwanted items -> retrieve price (only in the workbook currency) -> sinks
+        name_resolver = ItemNameResolver(item_names_language) if cache_item_names else None
+        user_items = get_inventory_items(
+            steam_api,
+            steam_id,
+            app_ids,
+            item_names_language,
+            selection_rules,
+            cached_items,
+            name_resolver,
+            carried_items,
+        )
+        pipeline = StreamingPricingPipeline(steam_api, sinks, currency=CURRENCIES[currency])
+        await pipeline.run(user_items)
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
 
+    :param args: parsed command line arguments (see scripts.arguments.add_generate_arguments)
+
+    :returns: nothing
+    """
     # validate provided input
-    if args.item_names_language not in ["english", "portuguese"]:
-        print("Invalid chosen language, choose either 'english' or 'portuguese'")
+    if not validate_language(args.item_names_language) or not validate_currencies(args.currencies):
+        exit()
+    if not validate_list_id(args.list_id):
+        exit()
+    if args.rules_file and not os.path.exists(args.rules_file):
+        print(f"Rules file {args.rules_file} not found")
+        exit()
+    try:
+        currency = get_workbook_currency(args.excel_file_name + ".xlsx", args.currency)
+    except ValueError as exc:
+        print(exc)
         exit()
 
     # start async loop
@@ -78,6 +107,26 @@ if __name__ == "__main__":
             args.steam_id,
             args.app_ids,
             args.item_names_language,
+            args.cache_item_names,
             args.excel_file_name + ".xlsx",
+            args.rules_file,
+            currency,
+            args.currencies,
+            args.fx_rates_file,
+            args.stream_output,
+            args.save_to_database,
+            args.list_id,
         )
     )
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=GENERATE_DESCRIPTION)
+    add_generate_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import os
+
+from data_exporters.pandas_excel_exporter import PandasExcelExporter
+from diagnostics.profiler import profiled
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from models.batch import ItemBatch
+from models.items import ItemWithPrice
+from pricing.batch import add_users_items_price, get_users_items
+from pricing.fx import get_currency_rates, get_workbook_currency
+from pricing.names import ItemNameResolver
+from pricing.selection import SelectionRules, carry_cached_item, get_cached_items
+from scripts.arguments import (
+    GENERATE_BATCH_DESCRIPTION,
+    add_generate_batch_arguments,
+    validate_currencies,
+    validate_language,
+)
+
+
+async def main(
+    steam_id_to_app_ids: dict[int, list[int]],
+    item_names_language: str,
+    cache_item_names: bool,
+    excel_file_prefix: str,
+    rules_file: str | None,
+    currency: str,
+    currencies: list[str],
+    fx_rates_file: str,
+    market_search: bool,
+):
+    # compile item selection rules once
+    selection_rules = SelectionRules.load(rules_file) if rules_file else None
+
+    # get all users inventories
+    name_resolver = ItemNameResolver(item_names_language) if cache_item_names else None
+    async with SteamAPI() as steam_api:
+        steam_id_to_items = await get_users_items(
+            steam_api, steam_id_to_app_ids, item_names_language, selection_rules, name_resolver
+        )
+
+        # don't price items worth less than the rules min value, judged by their last price on the user's
+        # spreadsheet. they are kept on the sheet at that price, flagged as stale
+        steam_id_to_carried_items: dict[int, list[ItemWithPrice]] = {}
+        if selection_rules and selection_rules.min_value:
+            for steam_id, items in steam_id_to_items.items():
+                cached_items = get_cached_items(f"{excel_file_prefix}_{steam_id}.xlsx")
+                steam_id_to_items[steam_id] = [
+                    item for item in items if selection_rules.has_min_value(item, cached_items)
+                ]
+                steam_id_to_carried_items[steam_id] = [
+                    carry_cached_item(item, cached_items[item.market_hash_name])
+                    for item in items
+                    if not selection_rules.has_min_value(item, cached_items)
+                ]
+
+        # get exchange rates of extra currencies (cached, so usually no request is made)
+        currency_rates = await get_currency_rates(steam_api.items, currency, currencies, fx_rates_file)
+
+        # retrieve price of each distinct item once (only in the workbooks currency)
+        steam_id_to_items_with_price = await add_users_items_price(
+            steam_api,
+            steam_id_to_items,
+            currency=CURRENCIES[currency],
+            retrieve_mode="search" if market_search else "serialized",
+        )
+
+    # export each user's data
+    for steam_id, items_with_price in steam_id_to_items_with_price.items():
+        items_with_price = items_with_price + steam_id_to_carried_items.get(steam_id, [])
+        if not items_with_price:
+            print(f"User {steam_id} has no marketable items")
+            continue
+        excel_exporter = PandasExcelExporter(f"{excel_file_prefix}_{steam_id}.xlsx", currency)
+        excel_exporter.export_today_items(
+            ItemBatch.from_items(items_with_price).sort_by_app_and_name(), currency_rates=currency_rates
+        )
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_generate_batch_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if not validate_language(args.item_names_language) or not validate_currencies(args.currencies):
+        exit()
+    if args.rules_file and not os.path.exists(args.rules_file):
+        print(f"Rules file {args.rules_file} not found")
+        exit()
+    # items are priced once for all users, so all workbooks must be priced in the same currency
+    try:
+        workbook_currencies = {
+            get_workbook_currency(f"{args.excel_file_prefix}_{steam_id}.xlsx", args.currency)
+            for steam_id, _ in args.users
+        }
+    except ValueError as exc:
+        print(exc)
+        exit()
+    if len(workbook_currencies) > 1:
+        print(
+            f"Users workbooks are priced in {', '.join(sorted(workbook_currencies))}, generate them in separate batches"
+        )
+        exit()
+
+    # start async loop
+    asyncio.run(
+        main(
+            dict(args.users),
+            args.item_names_language,
+            args.cache_item_names,
+            args.excel_file_prefix,
+            args.rules_file,
+            workbook_currencies.pop(),
+            args.currencies,
+            args.fx_rates_file,
+            args.market_search,
+        )
+    )
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=GENERATE_BATCH_DESCRIPTION)
+    add_generate_batch_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
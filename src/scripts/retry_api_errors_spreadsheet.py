@@ -4,10 +4,14 @@ from datetime import datetime
 
 from data_exporters.pandas_excel_exporter import PandasExcelExporter
 from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
 from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from pricing.fx import get_currency_rates, get_workbook_currency
+from scripts.arguments import RETRY_ERRORS_DESCRIPTION, add_retry_errors_arguments, validate_currencies
 
 
-async def main(excel_file_name: str):
+async def main(excel_file_name: str, currency: str, currencies: list[str], fx_rates_file: str):
     # check if we can get prices for most recent sheet
     excel_reader = ExcelReader(excel_file_name)
     most_recent_sheet = excel_reader.get_most_recent_date_sheet_name()
@@ -30,8 +34,13 @@ async def main(excel_file_name: str):
 
     # retrieve price for items with error
     print(f"Retrying {len(items_with_api_error)} items that had API errors")
-    steam_api = SteamAPI()
-    items_with_api_error_with_price = await steam_api.items.add_items_price(items_with_api_error)
+    async with SteamAPI() as steam_api:
+        items_with_api_error_with_price = await steam_api.items.add_items_price(
+            items_with_api_error, currency=CURRENCIES[currency]
+        )
+
+        # get exchange rates of extra currencies (cached, so usually no request is made)
+        currency_rates = await get_currency_rates(steam_api.items, currency, currencies, fx_rates_file)
 
     # reconciliate items
     items_without_error = [item for item in items if item.api_error == "no"]
@@ -39,24 +48,39 @@ async def main(excel_file_name: str):
     updated_items_sorted = sorted(updated_items, key=lambda item: f"{item.app_id}-{item.name}")
 
     # export data
-    excel_exporter = PandasExcelExporter(excel_file_name)
-    excel_exporter.export_today_items(updated_items_sorted)
+    excel_exporter = PandasExcelExporter(excel_file_name, currency)
+    excel_exporter.export_today_items(updated_items_sorted, currency_rates=currency_rates)
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_retry_errors_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if not validate_currencies(args.currencies):
+        exit()
+    try:
+        currency = get_workbook_currency(args.excel_file_name + ".xlsx", args.currency)
+    except ValueError as exc:
+        print(exc)
+        exit()
+
+    # start async loop
+    asyncio.run(main(args.excel_file_name + ".xlsx", currency, args.currencies, args.fx_rates_file))
 
 
 if __name__ == "__main__":
     # creates an argparse object to parse command line option
-    parser = argparse.ArgumentParser(
-        description="Retry to get item prices for api error items. This script can only be run if the most recent spreadsheet is from today date"
-    )
-    parser.add_argument(
-        "excel_file_name",
-        help="Which file name to use. Do not add extension to it, .xlxs will be used. 'prices' is the default value",
-        type=str,
-    )
+    parser = argparse.ArgumentParser(description=RETRY_ERRORS_DESCRIPTION)
+    add_retry_errors_arguments(parser)
 
     # waits for command line input
     # (proceeds only if it is validated against the options set before)
     args = parser.parse_args()
 
-    # start async loop
-    asyncio.run(main(args.excel_file_name + ".xlsx"))
+    run(args)
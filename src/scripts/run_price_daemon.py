@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+from datetime import date
+
+from data_exporters.pandas_excel_exporter import PandasExcelExporter
+from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
+from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from models.items import ItemWithPrice
+from pricing.constants import BASE_CURRENCY
+from pricing.daemon import CONTROL_HOST, PriceRefreshDaemon
+from pricing.fx import get_currency_rates, get_workbook_currency
+from pricing.scheduler import PriceRefreshScheduler
+from pricing.sinks import DatabaseSink, JsonLinesSink, PricedItemsSink
+from scripts.arguments import (
+    DAEMON_DESCRIPTION,
+    add_daemon_arguments,
+    validate_currencies,
+    validate_language,
+    validate_list_id,
+)
+
+
+async def main(
+    excel_file_name: str,
+    currency: str,
+    currencies: list[str],
+    fx_rates_file: str,
+    stream_output: str | None,
+    save_to_database: bool,
+    item_names_language: str,
+    history_sheets: int,
+    price_source: str,
+    min_refresh_minutes: float,
+    export_interval_minutes: float,
+    port: int | None,
+    list_id: int | None,
+):
+    # get list of items and their recent prices (only once, the daemon keeps them in memory from now on)
+    excel_reader = ExcelReader(excel_file_name)
+    items = excel_reader.get_items()
+    items_price_history = excel_reader.get_items_price_history(history_sheets)
+
+    steam_api = SteamAPI()
+
+    # get exchange rates of extra currencies (cached, so usually no request is made)
+    currency_rates = await get_currency_rates(steam_api.items, currency, currencies, fx_rates_file)
+
+    # set where each refreshed item goes, as soon as it is refreshed
+    sinks: list[PricedItemsSink] = []
+    if stream_output:
+        sinks.append(JsonLinesSink(stream_output))
+    if save_to_database:
+        usd_rates = await get_currency_rates(steam_api.items, currency, [BASE_CURRENCY], fx_rates_file)
+        sinks.append(DatabaseSink(item_names_language, batch_size=10, usd_rate=usd_rates[BASE_CURRENCY]))
+
+    # the Summary sheet values every date from the list daily values, converted from USD to the workbook currency
+    list_usd_rate = 1.0
+    if list_id is not None:
+        list_usd_rate = (await get_currency_rates(steam_api.items, BASE_CURRENCY, [currency], fx_rates_file))[currency]
+
+    # the workbook is rewritten periodically with all current prices (exports run on a thread)
+    def export(updated_items: list[ItemWithPrice]):
+        summary = None
+        if list_id is not None:
+            # NOTE: imported here, so sqlalchemy is only imported when a list is provided
+            from db.queries import get_list_summary
+
+            summary = get_list_summary(list_id, None, date.today(), list_usd_rate)
+        # NOTE: a new exporter on each export, since exporting closes its writer and its date is set on creation
+        excel_exporter = PandasExcelExporter(excel_file_name, currency)
+        excel_exporter.export_today_items(updated_items, summary, currency_rates)
+
+    daemon = PriceRefreshDaemon(
+        steam_api,
+        items,
+        sinks,
+        scheduler=PriceRefreshScheduler(items_price_history),
+        currency=CURRENCIES[currency],
+        price_source=price_source,
+        min_refresh_minutes=min_refresh_minutes,
+        export=export,
+        export_interval_minutes=export_interval_minutes,
+    )
+    await daemon.run(CONTROL_HOST, port)
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_daemon_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if not validate_language(args.item_names_language) or not validate_currencies(args.currencies):
+        exit()
+    if not validate_list_id(args.list_id):
+        exit()
+    try:
+        currency = get_workbook_currency(args.excel_file_name + ".xlsx", args.currency)
+    except ValueError as exc:
+        print(exc)
+        exit()
+
+    # start async loop (Ctrl+C stops the daemon, flushing sinks and exporting the spreadsheet)
+    try:
+        asyncio.run(
+            main(
+                args.excel_file_name + ".xlsx",
+                currency,
+                args.currencies,
+                args.fx_rates_file,
+                args.stream_output,
+                args.save_to_database,
+                args.item_names_language,
+                args.history_sheets,
+                args.price_source,
+                args.min_refresh_minutes,
+                args.export_interval_minutes,
+                None if args.no_control_server else args.port,
+                args.list_id,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=DAEMON_DESCRIPTION)
+    add_daemon_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
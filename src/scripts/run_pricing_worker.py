@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+
+from diagnostics.profiler import profiled
+from external_apis.steam.api import SteamAPI
+from pricing.worker import PricingWorker
+from scripts.arguments import WORKER_DESCRIPTION, add_worker_arguments
+
+
+async def main(batch_size: int, lease_seconds: int, price_source: str, fx_rates_file: str, exit_when_empty: bool):
+    # each worker has its own steam egresses and rate limiter (see SteamAPI environment variables)
+    async with SteamAPI() as steam_api:
+        worker = PricingWorker(steam_api, batch_size, lease_seconds, price_source, fx_rates_file)
+        processed_jobs = await worker.run(exit_when_empty)
+    print(f"Processed {processed_jobs} pricing jobs")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_worker_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if args.batch_size < 1 or args.lease_seconds < 1:
+        print("Batch size and lease seconds must be positive")
+        exit()
+
+    # start async loop (until interrupted, unless it exits when there are no jobs left)
+    try:
+        asyncio.run(
+            main(args.batch_size, args.lease_seconds, args.price_source, args.fx_rates_file, args.exit_when_empty)
+        )
+    except KeyboardInterrupt:
+        print("Pricing worker stopped")
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=WORKER_DESCRIPTION)
+    add_worker_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+
+from diagnostics.profiler import profiled
+from read_api.server import ReadAPIServer
+from scripts.arguments import SERVE_DESCRIPTION, add_serve_arguments
+
+
+async def main(host: str, port: int, version_check_seconds: float):
+    server = ReadAPIServer(version_check_seconds)
+    await server.run(host, port)
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Run the script (until interrupted)
+
+    :param args: parsed command line arguments (see scripts.arguments.add_serve_arguments)
+
+    :returns: nothing
+    """
+    try:
+        asyncio.run(main(args.host, args.port, args.version_check_seconds))
+    except KeyboardInterrupt:
+        print("Read api stopped")
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=SERVE_DESCRIPTION)
+    add_serve_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
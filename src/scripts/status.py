@@ -0,0 +1,82 @@
+import argparse
+import json
+from datetime import datetime
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from diagnostics.profiler import profiled
+from pricing.constants import CONTROL_HOST
+from scripts.arguments import STATUS_DESCRIPTION, add_status_arguments
+
+# seconds to wait for the daemon to answer
+STATUS_TIMEOUT = 2
+
+
+def get_daemon_status(port: int) -> dict | None:
+    """
+    Get the status of the price daemon running on this machine
+
+    :param port: daemon control server port
+
+    :returns: daemon status, or None if the daemon is not running
+    """
+    try:
+        with urlopen(f"http://{CONTROL_HOST}:{port}/status", timeout=STATUS_TIMEOUT) as response:
+            return json.load(response)
+    except (URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def get_cached_fx_rates(fx_rates_file: str) -> dict | None:
+    """
+    Read the cached exchange rates (without validating them, to keep this command light)
+
+    :param fx_rates_file: exchange rates cache file
+
+    :returns: exchange rates file content, or None if there is no cache
+    """
+    try:
+        with open(fx_rates_file) as rates_file:
+            return json.load(rates_file)
+    except FileNotFoundError:
+        return None
+
+
+def main(port: int, fx_rates_file: str):
+    daemon_status = get_daemon_status(port)
+    if daemon_status is None:
+        print(f"Price daemon is not running on port {port}")
+    else:
+        print(f"Price daemon status:\n{json.dumps(daemon_status, indent=2)}")
+
+    fx_rates = get_cached_fx_rates(fx_rates_file)
+    if fx_rates is None:
+        print(f"No cached exchange rates at {fx_rates_file}")
+    else:
+        updated_at = datetime.fromtimestamp(fx_rates["updated_at"]).strftime("%Y-%m-%d %H:%M")
+        rates = ", ".join(f"{currency} {rate:.4f}" for currency, rate in fx_rates["rates"].items())
+        print(f"Exchange rates from 1 {fx_rates['base']} (updated at {updated_at}): {rates}")
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_status_arguments)
+
+    :returns: nothing
+    """
+    main(args.port, args.fx_rates_file)
+
+
+if __name__ == "__main__":
+    # creates an argparse object to parse command line option
+    parser = argparse.ArgumentParser(description=STATUS_DESCRIPTION)
+    add_status_arguments(parser)
+
+    # waits for command line input
+    # (proceeds only if it is validated against the options set before)
+    args = parser.parse_args()
+
+    run(args)
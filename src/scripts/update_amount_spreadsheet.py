@@ -1,126 +1,162 @@
 import argparse
 import asyncio
+from datetime import datetime
 
-import pandas as pd
-
-# replace with data exporter class
-# from scripts.common import format_workbook, set_items_df_column_order, set_summary_df_column_order
+from data_exporters.pandas_excel_exporter import PandasExcelExporter
+from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
 from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from external_apis.steam.snapshots import (
+    InventoryDiff,
+    InventorySnapshot,
+    diff_inventory_snapshots,
+    diff_items,
+    get_snapshot_path,
+)
+from models.items import Item, ItemWithPrice
+from pricing.fx import get_currency_rates, get_workbook_currency
+from pricing.scheduler import carry_stale_prices
+from scripts.arguments import (
+    UPDATE_AMOUNT_DESCRIPTION,
+    add_update_amount_arguments,
+    validate_currencies,
+    validate_language,
+)
+
+
+def apply_inventory_diff(
+    items: list[ItemWithPrice], inventory_diff: InventoryDiff, added_items_with_price: list[ItemWithPrice]
+) -> list[ItemWithPrice]:
+    """
+    Update spreadsheet items with what changed on the inventory
+
+    :param items: spreadsheet items
+    :param inventory_diff: inventory changes
+    :param added_items_with_price: added items, already priced
+
+    :returns: updated items, sorted by app and name
+    """
+    removed_item_names = {item.market_hash_name for item in inventory_diff.removed}
+    item_name_to_amount = {item.market_hash_name: item.amount for item in inventory_diff.changed}
+    updated_items = [
+        item.model_copy(update={"amount": item_name_to_amount.get(item.market_hash_name, item.amount)})
+        for item in items
+        if item.market_hash_name not in removed_item_names
+    ]
+    return sorted(updated_items + added_items_with_price, key=lambda item: f"{item.app_id}-{item.name}")
+
+
+async def main(
+    excel_file_name: str,
+    steam_id: int,
+    app_ids: list[int],
+    item_names_language: str,
+    snapshots_dir: str,
+    currency: str,
+    currencies: list[str],
+    fx_rates_file: str,
+):
+    # get spreadsheet items
+    excel_reader = ExcelReader(excel_file_name)
+    items = excel_reader.get_items()
+    app_ids = sorted({item.app_id for item in items} | set(app_ids))
+
+    async with SteamAPI() as steam_api:
+        # diff each app inventory against its last snapshot (or against the spreadsheet, on the first sync)
+        inventory_diff = InventoryDiff()
+        snapshots: list[InventorySnapshot] = []
+        for app_id in app_ids:
+            snapshot = await steam_api.inventory.get_user_app_snapshot(steam_id, app_id, item_names_language)
+            snapshots.append(snapshot)
+            previous_snapshot = InventorySnapshot.load(
+                get_snapshot_path(snapshots_dir, excel_file_name, steam_id, app_id)
+            )
+            if previous_snapshot is not None:
+                app_diff = diff_inventory_snapshots(previous_snapshot, snapshot)
+            else:
+                sheet_items = {
+                    item.market_hash_name: Item(
+                        app_id=item.app_id, name=item.name, amount=item.amount, market_hash_name=item.market_hash_name
+                    )
+                    for item in items
+                    if item.app_id == app_id
+                }
+                app_diff = diff_items(sheet_items, snapshot.get_items())
+            inventory_diff = inventory_diff.merge(app_diff)
+
+        if inventory_diff.is_empty():
+            print("Inventory did not change since the last sync")
+        else:
+            print(
+                f"{len(inventory_diff.added)} items added, {len(inventory_diff.removed)} removed"
+                f" and {len(inventory_diff.changed)} changed since the last sync"
+            )
+
+            # get exchange rates of extra currencies (cached, so usually no request is made)
+            currency_rates = await get_currency_rates(steam_api.items, currency, currencies, fx_rates_file)
+
+            # retrieve price of added items only (in the workbook currency)
+            added_items_with_price = await steam_api.items.add_items_price(
+                inventory_diff.added, currency=CURRENCIES[currency]
+            )
+
+            # items not priced today keep their last known price, flagged as stale
+            today_date = datetime.utcnow().strftime("%Y-%m-%d")
+            updated_items = apply_inventory_diff(items, inventory_diff, added_items_with_price)
+            fresh_items = [item for item in updated_items if item.price_date == today_date]
+            stale_items = carry_stale_prices(item for item in updated_items if item.price_date != today_date)
+            updated_items = sorted(fresh_items + stale_items, key=lambda item: f"{item.app_id}-{item.name}")
+
+            # export data
+            excel_exporter = PandasExcelExporter(excel_file_name, currency)
+            excel_exporter.export_today_items(updated_items, currency_rates=currency_rates)
+
+    # the spreadsheet is in sync with these snapshots now
+    for snapshot in snapshots:
+        snapshot.save(get_snapshot_path(snapshots_dir, excel_file_name, steam_id, snapshot.app_id))
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_update_amount_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if not validate_language(args.item_names_language) or not validate_currencies(args.currencies):
+        exit()
+    try:
+        currency = get_workbook_currency(args.excel_file_name + ".xlsx", args.currency)
+    except ValueError as exc:
+        print(exc)
+        exit()
 
-
-async def main(excel_file_name, steam_id):
-    # create empty dataframe for new summary
-    summary_df = pd.DataFrame()
-
-    # read provided excel file
-    excel_file = pd.ExcelFile(excel_file_name)
-
-    # get any date spreadsheet (to get items to update amount)
-    summary_sheet_index = excel_file.sheet_names.index("Summary")
-    any_date_sheet = excel_file.sheet_names[summary_sheet_index - 1]
-    any_date_items_df = excel_file.parse(any_date_sheet)
-
-    # get app ids on spreadsheet
-    app_ids = list(any_date_items_df["app_id"].unique())
-
-    # filter out row that are not numbers (the row '---' on summary line)
-    app_ids = list(filter(lambda app_id: isinstance(app_id, int), app_ids))
-
-    # get user's inventory for app ids present on spreadsheet
-    steam_api = SteamAPI()
-    user_items = {}
-    for app_id in app_ids:
-        user_items.update(await steam_api.inventory.get_user_app_indexed_items(steam_id, app_id))
-
-    # remove summary line from items data frame
-    number_of_lines = any_date_items_df.shape[0]
-    any_date_items_df = any_date_items_df.drop([number_of_lines - 1])
-
-    # set a one column df with the new amount of items
-    amount_df = pd.DataFrame({"amount": []})
-    removed_items_idx = []
-    for idx, item in any_date_items_df.iterrows():
-        # item not found on user inventory -> mark the item as removed and skip for the next one
-        if not user_items.get(item["market_hash_name"]):
-            removed_items_idx.append(idx)
-            continue
-
-        # item still in user inventory -> update item amount
-        new_row = {"amount": user_items[item["market_hash_name"]]["amount"]}
-        amount_df = pd.concat([amount_df, pd.DataFrame([new_row])], ignore_index=True)
-
-    amount_df["amount"] = amount_df["amount"].astype(int)
-
-    # get object to write into excel
-    excel_writer = pd.ExcelWriter(excel_file_name, engine="openpyxl")
-
-    # update amount, total price and summaries
-    summaries = []
-    excel_file.sheet_names.sort()  # guarantee days are ordered
-    for sheet_name in excel_file.sheet_names:
-        # summary sheet -> skip
-        if sheet_name == "Summary":
-            continue
-
-        # not summary sheet -> get summary line and drop it form day df
-        day_df = excel_file.parse(sheet_name)
-        number_of_lines = day_df.shape[0]
-        summary_row_index = number_of_lines - 1
-        summary_row = day_df.iloc[[summary_row_index]]
-        day_df = day_df.drop([summary_row_index])
-
-        # drop removed items and update amount
-        day_df = day_df.drop(removed_items_idx)
-        day_df["amount"] = amount_df
-
-        # update total price
-        day_df["price_total"] = day_df["price_unitary"] * day_df["amount"]
-
-        # update summary
-        summary_row.at[summary_row_index, "amount"] = day_df["amount"].sum()
-        summary_row.at[summary_row_index, "price_total"] = day_df["price_total"].sum()
-        day_df = pd.concat([day_df, pd.DataFrame([summary_row])], ignore_index=True)
-
-        # add day summary to new summary sheet
-        summaries.append(
-            {
-                "api_error": summary_row.at[summary_row_index, "api_error"],
-                "price_total": summary_row.at[summary_row_index, "price_total"],
-                "price_date": summary_row.at[summary_row_index, "price_date"],
-            }
+    # start async loop
+    asyncio.run(
+        main(
+            args.excel_file_name + ".xlsx",
+            args.steam_id,
+            args.app_ids,
+            args.item_names_language,
+            args.snapshots_dir,
+            currency,
+            args.currencies,
+            args.fx_rates_file,
         )
-
-        # write day's prices to excel exclusive sheet
-        day_df = set_items_df_column_order(day_df)
-        day_df.to_excel(excel_writer, index=False, sheet_name=sheet_name)
-
-    # write new summary sheet
-    summary_df = pd.DataFrame(summaries)
-    summary_df = set_summary_df_column_order(summary_df)
-    summary_df.to_excel(excel_writer, index=False, sheet_name="Summary")
-
-    # persis changes
-    format_workbook(excel_writer.book)
-    excel_writer.save()
+    )
 
 
 if __name__ == "__main__":
     # creates an argparse object to parse command line option
-    parser = argparse.ArgumentParser(description="Update ammount of each user item")
-    parser.add_argument(
-        "excel_file_name",
-        help="Which file name to use. Do not add extension to it, .xlxs will be used. 'prices' is the default value",
-        type=str,
-    )
-    parser.add_argument(
-        "steam_id",
-        help="Users's Steam id (search for 'ID Steam' on 'https://store.steampowered.com/account')",
-        type=int,
-    )
+    parser = argparse.ArgumentParser(description=UPDATE_AMOUNT_DESCRIPTION)
+    add_update_amount_arguments(parser)
 
     # waits for command line input
     # (proceeds only if it is validated against the options set before)
     args = parser.parse_args()
 
-    # start async loop
-    asyncio.run(main(args.excel_file_name + ".xlsx", args.steam_id))
+    run(args)
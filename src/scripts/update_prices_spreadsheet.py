@@ -1,39 +1,150 @@
 import argparse
 import asyncio
+from datetime import date
+from time import monotonic
 
 from data_exporters.pandas_excel_exporter import PandasExcelExporter
 from data_readers.excel_reader import ExcelReader
+from diagnostics.profiler import profiled
 from external_apis.steam.api import SteamAPI
+from external_apis.steam.constants import CURRENCIES
+from pricing.constants import BASE_CURRENCY
+from pricing.fx import get_currency_rates, get_workbook_currency
+from pricing.pipeline import StreamingPricingPipeline
+from pricing.scheduler import PriceRefreshScheduler, carry_stale_prices, get_request_budget
+from pricing.sinks import DatabaseSink, JsonLinesSink, PricedItemsSink
+from scripts.arguments import (
+    UPDATE_PRICES_DESCRIPTION,
+    add_update_prices_arguments,
+    validate_currencies,
+    validate_language,
+    validate_list_id,
+)
 
 
-async def main(excel_file_name: str):
-    # get list of items
+async def main(
+    excel_file_name: str,
+    currency: str,
+    currencies: list[str],
+    fx_rates_file: str,
+    stream_output: str | None,
+    save_to_database: bool,
+    item_names_language: str,
+    max_requests: int | None,
+    deadline_minutes: float | None,
+    history_sheets: int,
+    price_source: str,
+    market_search: bool,
+    list_id: int | None,
+):
+    deadline = monotonic() + deadline_minutes * 60 if deadline_minutes is not None else None
+
+    # get list of items and their recent prices
     excel_reader = ExcelReader(excel_file_name)
     items = excel_reader.get_items()
+    items_price_history = excel_reader.get_items_price_history(history_sheets)
+
+    async with SteamAPI() as steam_api:
+        # get exchange rates of extra currencies (cached, so usually no request is made)
+        currency_rates = await get_currency_rates(steam_api.items, currency, currencies, fx_rates_file)
+
+        # set where priced items go, as soon as they are priced
+        sinks: list[PricedItemsSink] = []
+        if stream_output:
+            sinks.append(JsonLinesSink(stream_output))
+        if save_to_database:
+            usd_rates = await get_currency_rates(steam_api.items, currency, [BASE_CURRENCY], fx_rates_file)
+            sinks.append(DatabaseSink(item_names_language, usd_rate=usd_rates[BASE_CURRENCY]))
+
+        # refresh the items with the highest impact on the portfolio value first, within the request budget
+        request_budget = get_request_budget(max_requests, deadline_minutes, steam_api.request_interval)
+        scheduler = PriceRefreshScheduler(items_price_history)
+        items_to_refresh, _ = scheduler.schedule(items, request_budget)
+        print(f"Refreshing {len(items_to_refresh)} of {len(items)} items")
+
+        # price as many items as possible with market search pages (100 items per request)
+        searched_items = []
+        if market_search:
+            searched_items = await steam_api.items.get_items_price_from_search(items_to_refresh, CURRENCIES[currency])
+            for sink in sinks:
+                await sink.write(searched_items)
+            searched_item_names = {item.market_hash_name for item in searched_items}
+            items_to_refresh = [item for item in items_to_refresh if item.market_hash_name not in searched_item_names]
 
-    # retrieve price for items
-    steam_api = SteamAPI()
-    items_with_price = await steam_api.items.add_items_price(items)
+        # retrieve price for items (only in the workbook currency) and send them to the sinks
+        pipeline = StreamingPricingPipeline(
+            steam_api, sinks, currency=CURRENCIES[currency], price_source=price_source, deadline=deadline
+        )
+        refreshed_items = searched_items + await pipeline.run(items_to_refresh)
+
+        # value every date from the list daily values, converted from USD to the workbook currency
+        summary = None
+        if list_id is not None:
+            # NOTE: imported here, so sqlalchemy is only imported when a list is provided
+            from db.queries import get_list_summary
+
+            list_usd_rate = (await get_currency_rates(steam_api.items, BASE_CURRENCY, [currency], fx_rates_file))[
+                currency
+            ]
+            summary = await asyncio.to_thread(get_list_summary, list_id, None, date.today(), list_usd_rate)
+
+    # items not refreshed keep their last known price, flagged as stale
+    refreshed_item_names = {item.market_hash_name for item in refreshed_items}
+    stale_items = carry_stale_prices(item for item in items if item.market_hash_name not in refreshed_item_names)
+    updated_items = sorted(refreshed_items + stale_items, key=lambda item: f"{item.app_id}-{item.name}")
 
     # export data
-    excel_exporter = PandasExcelExporter(excel_file_name)
-    excel_exporter.export_today_items(items_with_price)
+    excel_exporter = PandasExcelExporter(excel_file_name, currency)
+    excel_exporter.export_today_items(updated_items, summary, currency_rates)
+
+
+@profiled
+def run(args: argparse.Namespace):
+    """
+    Validate command line arguments and run the script
+
+    :param args: parsed command line arguments (see scripts.arguments.add_update_prices_arguments)
+
+    :returns: nothing
+    """
+    # validate provided input
+    if not validate_language(args.item_names_language) or not validate_currencies(args.currencies):
+        exit()
+    try:
+        currency = get_workbook_currency(args.excel_file_name + ".xlsx", args.currency)
+    except ValueError as exc:
+        print(exc)
+        exit()
+    if not validate_list_id(args.list_id):
+        exit()
+
+    # start async loop
+    asyncio.run(
+        main(
+            args.excel_file_name + ".xlsx",
+            currency,
+            args.currencies,
+            args.fx_rates_file,
+            args.stream_output,
+            args.save_to_database,
+            args.item_names_language,
+            args.max_requests,
+            args.deadline_minutes,
+            args.history_sheets,
+            args.price_source,
+            args.market_search,
+            args.list_id,
+        )
+    )
 
 
 if __name__ == "__main__":
     # creates an argparse object to parse command line option
-    parser = argparse.ArgumentParser(
-        description="Update today spreadsheet with most up to date prices or add a new spreadsheet if today date does not have it's own spreadsheet yet"
-    )
-    parser.add_argument(
-        "excel_file_name",
-        help="Which file name to use. Do not add extension to it, .xlxs will be used. 'prices' is the default value",
-        type=str,
-    )
+    parser = argparse.ArgumentParser(description=UPDATE_PRICES_DESCRIPTION)
+    add_update_prices_arguments(parser)
 
     # waits for command line input
     # (proceeds only if it is validated against the options set before)
     args = parser.parse_args()
 
-    # start async loop
-    asyncio.run(main(args.excel_file_name + ".xlsx"))
+    run(args)
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from time import monotonic
+
+from external_apis.steam.egress import EgressConfig, EgressPool
+
+# min seconds between requests through each stand-in proxy
+REQUEST_INTERVAL = 0.1
+
+# scheduling slack allowed when checking request spacing
+TOLERANCE = 0.01
+
+
+class StandInProxy:
+    """
+    Local http proxy stand-in: answers every proxied request itself, recording when it arrived
+    """
+
+    def __init__(self):
+        self.request_times: list[float] = []
+        self.server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while await reader.readline():
+                self.request_times.append(monotonic())
+                while (await reader.readline()).strip():
+                    pass
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+class EgressPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.proxies = [StandInProxy(), StandInProxy()]
+        for proxy in self.proxies:
+            await proxy.start()
+        configs = [
+            EgressConfig(name=f"proxy-{index}", proxy=proxy.url, request_interval=REQUEST_INTERVAL)
+            for index, proxy in enumerate(self.proxies)
+        ]
+        self.pool = EgressPool(configs, http2=False)
+
+    async def asyncTearDown(self):
+        await self.pool.aclose()
+        for proxy in self.proxies:
+            await proxy.stop()
+
+    async def test_requests_are_spread_across_egresses(self):
+        responses = await asyncio.gather(*[self.pool.get("http://steamcommunity.test/market") for _ in range(10)])
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual([len(proxy.request_times) for proxy in self.proxies], [5, 5])
+        self.assertEqual([status["requests"] for status in self.pool.get_status()], [5, 5])
+
+    async def test_each_egress_respects_its_rate_limit(self):
+        # open each egress connection first, so connecting doesn't delay the measured requests
+        await asyncio.gather(*[self.pool.get("http://steamcommunity.test/market") for _ in self.proxies])
+        await asyncio.sleep(REQUEST_INTERVAL)
+        for proxy in self.proxies:
+            proxy.request_times.clear()
+
+        started_at = monotonic()
+        await asyncio.gather(*[self.pool.get("http://steamcommunity.test/market") for _ in range(10)])
+        elapsed = monotonic() - started_at
+
+        for proxy in self.proxies:
+            intervals = [later - earlier for earlier, later in zip(proxy.request_times, proxy.request_times[1:])]
+            self.assertGreaterEqual(min(intervals), REQUEST_INTERVAL - TOLERANCE)
+        # both egresses are used at the same time, so 10 requests take about 5 intervals, not 10
+        self.assertLess(elapsed, 7 * REQUEST_INTERVAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from sqlalchemy.orm import sessionmaker
+
+from alembic import command
+from alembic.config import Config
+from db.list_daily_value import rebuild_list_daily_values
+from db.metadata import create_sip_engine
+from db.queries import get_list_daily_values, get_list_materialized_daily_values
+from db.retention import downsample_item_prices
+from db.utils import create_items, create_list, update_list_items, upsert_item_prices
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# range covering every price of the tests
+START_DATE = date(2000, 1, 1)
+END_DATE = date(2100, 1, 1)
+
+
+def get_prices(prices_by_date: dict[date, dict[str, float]]) -> list[dict]:
+    return [
+        {"item_id": item_id, "date": price_date, "price_usd": price_usd}
+        for price_date, item_prices in prices_by_date.items()
+        for item_id, price_usd in item_prices.items()
+    ]
+
+
+class ListDailyValueTestCase(unittest.TestCase):
+    """
+    The incrementally maintained list_daily_value rows must always equal both a full rebuild of the table
+    and the list values aggregated on the fly from item_price
+    """
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(self.temporary_dir.name, 'sip.db')}"
+
+        # create the schema with the migrations, as deployments do
+        config = Config(os.path.join(SRC_DIR, "alembic.ini"))
+        config.set_main_option("script_location", os.path.join(SRC_DIR, "alembic"))
+        with mock.patch.dict(os.environ, {"SIP_DATABASE_URL": url}):
+            command.upgrade(config, "head")
+
+        self.engine = create_sip_engine(url)
+        self.session = sessionmaker(self.engine)()
+        create_items(
+            [{"market_hash_name": name, "app_id": 730, "name_en": name} for name in ["A", "B", "C"]], self.session
+        )
+        self.list_ids = [create_list(1, name, self.session).id for name in ["first", "second"]]
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        self.temporary_dir.cleanup()
+
+    def get_values(self, get_daily_values) -> dict[int, list[tuple]]:
+        return {
+            list_id: [
+                (value["date"], round(value["price_total"], 6), value["items_priced"], value["items_total"])
+                for value in get_daily_values(list_id, START_DATE, END_DATE, session_external=self.session)
+            ]
+            for list_id in self.list_ids
+        }
+
+    def assert_values_consistent(self):
+        materialized_values = self.get_values(get_list_materialized_daily_values)
+        self.assertEqual(materialized_values, self.get_values(get_list_daily_values))
+
+        rebuild_list_daily_values(self.session)
+        self.session.commit()
+        self.assertEqual(self.get_values(get_list_materialized_daily_values), materialized_values)
+
+    def test_refresh_after_price_upserts_and_list_changes(self):
+        first_list_id, second_list_id = self.list_ids
+        upsert_item_prices(
+            get_prices(
+                {
+                    date(2026, 1, 5): {"A": 1.5, "B": 10.0},
+                    date(2026, 1, 6): {"A": 2.0, "B": 11.0, "C": 0.25},
+                }
+            ),
+            self.session,
+        )
+        update_list_items(first_list_id, [{"id": "A", "quantity": 2}, {"id": "B", "quantity": 1}], self.session)
+        update_list_items(second_list_id, [{"id": "B", "quantity": 3}, {"id": "C", "quantity": 4}], self.session)
+        self.session.commit()
+        self.assert_values_consistent()
+
+        # new prices of a valued date, and prices of a new date
+        upsert_item_prices(
+            get_prices({date(2026, 1, 6): {"B": 12.5}, date(2026, 1, 7): {"A": 2.5, "C": 0.5}}), self.session
+        )
+        self.session.commit()
+        self.assert_values_consistent()
+
+        # changed quantity, removed item and added item
+        update_list_items(first_list_id, [{"id": "A", "quantity": 5}, {"id": "C", "quantity": 1}], self.session)
+        self.session.commit()
+        self.assert_values_consistent()
+        self.assertEqual(
+            [value[:3] for value in self.get_values(get_list_materialized_daily_values)[first_list_id]],
+            [(date(2026, 1, 5), 7.5, 1), (date(2026, 1, 6), 10.25, 2), (date(2026, 1, 7), 13.0, 2)],
+        )
+
+    def test_refresh_after_downsampling(self):
+        first_list_id, _ = self.list_ids
+        upsert_item_prices(
+            get_prices(
+                {
+                    date(2026, 1, 5): {"A": 1.0, "B": 4.0},
+                    date(2026, 1, 12): {"A": 3.0},
+                    date(2026, 1, 19): {"A": 2.0, "B": 6.0},
+                    date(2026, 2, 2): {"A": 5.0},
+                }
+            ),
+            self.session,
+        )
+        update_list_items(first_list_id, [{"id": "A", "quantity": 1}, {"id": "B", "quantity": 2}], self.session)
+        self.session.commit()
+
+        # january prices are replaced by their monthly median, dated on the first day of the month
+        downsample_item_prices(None, date(2026, 2, 1), "month", self.session)
+        self.session.commit()
+        self.assert_values_consistent()
+        self.assertEqual(
+            [value[:3] for value in self.get_values(get_list_materialized_daily_values)[first_list_id]],
+            [(date(2026, 1, 1), 12.0, 2), (date(2026, 2, 2), 5.0, 1)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import os
+import unittest
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from external_apis.steam.items import SteamItemsAPI
+from models.items import Item
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# listing page of items not found on market search, with an hourly median price history
+LISTING_PAGE = b'<script>var line1=[["Oct 19 2026 01: +0",30.5,"12"]];</script>'
+
+
+def load_fixture(filename: str) -> dict:
+    with open(os.path.join(FIXTURES_DIR, filename)) as fixture_file:
+        return json.load(fixture_file)
+
+
+class MarketSearchTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.search_page = load_fixture("market_search_page.json")
+        self.requested_paths: list[str] = []
+
+        def handler(request: Request) -> Response:
+            self.requested_paths.append(request.url.path)
+            if request.url.path == "/market/search/render/":
+                return Response(200, json=self.search_page)
+            return Response(200, content=LISTING_PAGE)
+
+        self.steam_items_api = SteamItemsAPI(AsyncClient(transport=MockTransport(handler)), request_interval=0)
+
+    async def asyncTearDown(self):
+        await self.steam_items_api.session.aclose()
+
+    async def test_search_prices_are_sale_prices(self):
+        market_hash_names = {"Dreams & Nightmares Case", "AK-47 | Redline (Field-Tested)"}
+
+        prices = await self.steam_items_api.get_app_search_prices(730, market_hash_names, currency=1)
+
+        # sale prices (comparable to median prices), not the lowest asks (sell_price)
+        self.assertEqual(prices, {"Dreams & Nightmares Case": 1.25, "AK-47 | Redline (Field-Tested)": 33.2})
+
+    async def test_items_without_sale_price_are_priced_by_the_price_source(self):
+        items = [
+            Item(app_id=730, name="Sticker", amount=1, market_hash_name="Sticker | Recoil Case Key"),
+            Item(app_id=730, name="Case", amount=2, market_hash_name="Dreams & Nightmares Case"),
+        ]
+
+        items_with_price = await self.steam_items_api.add_items_price(items, currency=1, retrieve_mode="search")
+
+        self.assertEqual(
+            [item.market_hash_name for item in items_with_price], [item.market_hash_name for item in items]
+        )
+        self.assertEqual([item.price_unitary for item in items_with_price], [30.5, 1.25])
+        self.assertEqual(self.requested_paths.count("/market/search/render/"), 1)
+        self.assertIn("/market/listings/730/Sticker | Recoil Case Key", self.requested_paths)
+
+
+if __name__ == "__main__":
+    unittest.main()